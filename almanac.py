@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from panchanga import PanchangaCalculator, PanchangaData, EPHEM_EPOCH_JD, to_ephem_date
+from transitions import LIMBS, LIMB_SPECS, LimbPeriod, LimbTransitionFinder, jd_to_datetime
+
+
+SCHEMA_VERSION = 1
+
+# One row per limb period. The primary key serves "period containing t"
+# (latest start <= t) and range scans; periods_by_index serves "next period
+# of limb with index N after t".
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS periods (
+    limb TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    start_jd REAL NOT NULL,
+    end_jd REAL NOT NULL,
+    PRIMARY KEY (limb, start_jd)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS periods_by_index ON periods (limb, idx, start_jd);
+"""
+
+# Period of every limb containing ?1, one indexed seek per limb in a single statement
+_PERIODS_AT = " UNION ALL ".join(
+    f"SELECT * FROM (SELECT limb, idx, start_jd, end_jd FROM periods"
+    f" WHERE limb = '{limb}' AND start_jd <= ?1 ORDER BY start_jd DESC LIMIT 1)"
+    for limb in LIMBS)
+
+# Per-process finders keyed on (precision_seconds, chebyshev)
+_finders: Dict[Tuple[float, bool], LimbTransitionFinder] = {}
+
+
+def limb_chunk(task: Tuple[str, float, float, float, bool]) -> List[Tuple[int, float, float]]:
+    """Worker entry point: (index, start_jd, end_jd) of the periods of one limb over one chunk"""
+    limb, start_jd, end_jd, precision_seconds, chebyshev = task
+    finder = _finders.get((precision_seconds, chebyshev))
+    if finder is None:
+        calculator = None
+        if chebyshev:
+            from ephemeris import ChebyshevBackend
+            calculator = PanchangaCalculator(backend=ChebyshevBackend())
+        finder = _finders[(precision_seconds, chebyshev)] = LimbTransitionFinder(calculator, precision_seconds)
+    return [(p.index, p.start_jd, p.end_jd) for p in finder.limb_periods(limb, start_jd, end_jd)]
+
+
+def stitch_periods(chunks: Iterable[List[Tuple[int, float, float]]],
+                   precision: float) -> Iterator[Tuple[int, float, float]]:
+    """Join consecutive chunk results into one run of periods
+
+    Every chunk reports its first and last period with their full extent,
+    so the period spanning a chunk edge appears in both chunks; it is
+    emitted once, with the start found by the earlier chunk.
+    """
+    pending = None
+    for periods in chunks:
+        if not periods:
+            continue
+        periods = list(periods)
+        if pending is not None:
+            index, start_jd, end_jd = periods[0]
+            if start_jd < pending[2] - precision:
+                periods[0] = (index, pending[1], end_jd)
+            else:
+                yield pending
+        yield from periods[:-1]
+        pending = periods[-1]
+    if pending is not None:
+        yield pending
+
+
+def build_almanac(path: str, start, end, limbs: Sequence[str] = LIMBS,
+                  precision_seconds: float = 1.0, chebyshev: bool = False,
+                  workers: Optional[int] = None, chunk_days: float = 90.0) -> int:
+    """Precompute every transition of ``limbs`` over [start, end] into a SQLite file
+
+    The range is cut into ``chunk_days`` pieces per limb which are searched
+    with ``LimbTransitionFinder`` across ``workers`` processes (default: all
+    cores) and stitched back together in order. ``chebyshev`` samples the
+    positions through ``ephemeris.ChebyshevBackend``, which is much faster
+    and moves transitions by milliseconds. The file is written next to
+    ``path`` and moved into place when complete.
+
+    Returns:
+        int: number of periods written
+    """
+    for limb in limbs:
+        if limb not in LIMB_SPECS:
+            raise ValueError(f"Unknown limb: {limb}")
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be positive")
+    start_jd = to_ephem_date(start) + EPHEM_EPOCH_JD
+    end_jd = to_ephem_date(end) + EPHEM_EPOCH_JD
+    if end_jd <= start_jd:
+        raise ValueError("end must be after start")
+
+    edges = [start_jd]
+    while edges[-1] < end_jd:
+        edges.append(min(edges[-1] + chunk_days, end_jd))
+    tasks = {limb: [(limb, a, b, precision_seconds, chebyshev) for a, b in zip(edges, edges[1:])]
+             for limb in limbs}
+
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    executor = None
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+    count = 0
+    try:
+        db.executescript(SCHEMA)
+        for limb in limbs:
+            # Chunks come back in order while later ones are still being searched
+            chunks = executor.map(limb_chunk, tasks[limb]) if executor else map(limb_chunk, tasks[limb])
+            rows = ((limb, index, s, e) for index, s, e in
+                    stitch_periods(chunks, precision_seconds / 86400.0))
+            before = db.total_changes
+            db.executemany("INSERT INTO periods VALUES (?, ?, ?, ?)", rows)
+            count += db.total_changes - before
+            db.commit()
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", str(SCHEMA_VERSION)), ("start_jd", repr(start_jd)), ("end_jd", repr(end_jd)),
+            ("precision_seconds", repr(precision_seconds)), ("limbs", ",".join(limbs))])
+        db.commit()
+    finally:
+        db.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    os.replace(tmp_path, path)
+    return count
+
+
+class Almanac:
+    """Query layer over a file written by ``build_almanac``
+
+    Answers point lookups, range scans and next-occurrence queries from the
+    indexed periods table instead of recomputing positions. Its
+    ``limb_periods`` has the same contract as ``LimbTransitionFinder``'s, so
+    it can stand in for the transition finder (``MuhurthaFinder(almanac=)``),
+    and ``PanchangaCalculator(almanac=)`` answers ``calculate_panchanga``
+    from it. Ranges the file does not cover are passed to ``fallback``
+    (a live ``LimbTransitionFinder`` by default). Limbs are exact to the
+    precision the file was built with. One instance can be shared between
+    threads.
+    """
+
+    def __init__(self, path: str, fallback: Optional[LimbTransitionFinder] = None):
+        if not os.path.exists(path):
+            raise ValueError(f"{path} does not exist")
+        self.path = path
+        self._fallback = fallback
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            self._db.close()
+            raise ValueError(f"{path} is not a panchanga almanac") from None
+        if meta.get("version") != str(SCHEMA_VERSION):
+            self._db.close()
+            raise ValueError(f"{path} is not a panchanga almanac")
+        self.start_jd = float(meta["start_jd"])
+        self.end_jd = float(meta["end_jd"])
+        self.precision = float(meta["precision_seconds"]) / 86400.0
+        self.limbs = tuple(meta["limbs"].split(","))
+        # limb -> last period returned, so sequential lookups skip the query
+        self._recent: Dict[str, Tuple[int, float, float]] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "Almanac":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def fallback(self) -> LimbTransitionFinder:
+        if self._fallback is None:
+            self._fallback = LimbTransitionFinder()
+        return self._fallback
+
+    def covers(self, start_jd: float, end_jd: Optional[float] = None) -> bool:
+        end_jd = start_jd if end_jd is None else end_jd
+        return self.start_jd <= start_jd and end_jd <= self.end_jd
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _period_at(self, limb: str, jd: float) -> Tuple[int, float, float]:
+        recent = self._recent.get(limb)
+        if recent is not None and recent[1] <= jd < recent[2]:
+            return recent
+        rows = self._query("SELECT idx, start_jd, end_jd FROM periods"
+                           " WHERE limb = ? AND start_jd <= ? ORDER BY start_jd DESC LIMIT 1", (limb, jd))
+        if not rows or jd >= rows[0][2]:
+            raise ValueError(f"No {limb} period stored at JD {jd}")
+        self._recent[limb] = rows[0]
+        return rows[0]
+
+    def _check_limb(self, limb: str) -> None:
+        if limb not in self.limbs:
+            raise ValueError(f"Limb {limb} is not stored in {self.path}")
+
+    def limb_at(self, limb: str, date) -> LimbPeriod:
+        """Period of ``limb`` containing ``date`` (UTC datetime, ephem.Date or Julian date)"""
+        self._check_limb(limb)
+        jd = to_ephem_date(date) + EPHEM_EPOCH_JD
+        if not self.covers(jd):
+            raise ValueError(f"{jd_to_datetime(jd)} is outside the almanac's range")
+        return LimbPeriod(limb, *self._period_at(limb, jd))
+
+    def _all_periods_at(self, jd: float) -> Dict[str, Tuple[int, float, float]]:
+        """Period of every limb containing ``jd``, fetched in one query unless all are recent"""
+        recent = self._recent
+        periods = {}
+        for limb in LIMBS:
+            period = recent.get(limb)
+            if period is None or not period[1] <= jd < period[2]:
+                break
+            periods[limb] = period
+        else:
+            return periods
+        rows = self._query(_PERIODS_AT, (jd,))
+        periods = {limb: (index, start_jd, end_jd) for limb, index, start_jd, end_jd in rows
+                   if jd < end_jd}
+        if len(periods) < len(LIMBS):
+            raise ValueError(f"No complete set of periods stored at JD {jd}")
+        recent.update(periods)
+        return periods
+
+    def limbs_at(self, date) -> Optional[PanchangaData]:
+        """Panchanga at ``date`` read from the stored periods, None outside the almanac's range"""
+        jd = to_ephem_date(date) + EPHEM_EPOCH_JD
+        if not self.covers(jd) or not set(LIMBS) <= set(self.limbs):
+            return None
+        indices = {limb: period[0] for limb, period in self._all_periods_at(jd).items()}
+        # The paksha is moon phase < 180, which is exactly tithi index < 15
+        return PanchangaData(indices["tithi"], indices["tithi"] < 15, indices["nakshatra"],
+                             indices["yoga"], indices["karana"], indices["rashi"])
+
+    def limb_periods(self, limb: str, start, end) -> List[LimbPeriod]:
+        """All periods of ``limb`` overlapping [start, end], as ``LimbTransitionFinder.limb_periods``"""
+        start_jd = to_ephem_date(start) + EPHEM_EPOCH_JD
+        end_jd = to_ephem_date(end) + EPHEM_EPOCH_JD
+        if end_jd < start_jd:
+            raise ValueError("end must not be before start")
+        if limb not in self.limbs or not self.covers(start_jd, end_jd):
+            return self.fallback.limb_periods(limb, start_jd, end_jd)
+        first_start = self._period_at(limb, start_jd)[1]
+        rows = self._query("SELECT idx, start_jd, end_jd FROM periods"
+                           " WHERE limb = ? AND start_jd >= ? AND start_jd <= ? ORDER BY start_jd",
+                           (limb, first_start, end_jd))
+        return [LimbPeriod(limb, *row) for row in rows]
+
+    def next_occurrence(self, limb: str, target: Union[int, str], after) -> Optional[LimbPeriod]:
+        """First period of ``limb`` with index (or name) ``target`` starting after ``after``
+
+        A name matches every index with that name. Returns None if there is
+        none before the end of the almanac.
+        """
+        self._check_limb(limb)
+        names = LIMB_SPECS[limb].names
+        if isinstance(target, str):
+            indices = [i for i, name in enumerate(names) if name == target]
+            if not indices:
+                raise ValueError(f"Unknown {limb}: {target}")
+        else:
+            if not 0 <= target < len(names):
+                raise ValueError(f"{limb} index out of range: {target}")
+            indices = [target]
+        jd = to_ephem_date(after) + EPHEM_EPOCH_JD
+        placeholders = ", ".join("?" * len(indices))
+        rows = self._query(f"SELECT idx, start_jd, end_jd FROM periods"
+                           f" WHERE limb = ? AND idx IN ({placeholders}) AND start_jd > ?"
+                           f" ORDER BY start_jd LIMIT 1", (limb, *indices, jd))
+        return LimbPeriod(limb, *rows[0]) if rows else None
+
+
+def _parse_utc(value: str) -> datetime:
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value}. Use YYYY-MM-DD or 'YYYY-MM-DD HH:MM' (UTC).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build and query a precomputed almanac of limb transitions')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Precompute all limb transitions for a range of dates')
+    build.add_argument('path', help='SQLite file to write')
+    build.add_argument('--start', required=True, help='First date in YYYY-MM-DD format (UTC)')
+    build.add_argument('--end', required=True, help='Last date in YYYY-MM-DD format (UTC)')
+    build.add_argument('--precision', type=float, default=1.0, help='Transition precision in seconds (default: 1)')
+    build.add_argument('--chebyshev', action='store_true',
+                       help='Sample through the Chebyshev backend instead of live ephem (much faster)')
+    build.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+
+    at = commands.add_parser('at', help='Show the limbs in force at an instant')
+    at.add_argument('path', help='Almanac file')
+    at.add_argument('--date', required=True, help="UTC instant, 'YYYY-MM-DD HH:MM'")
+
+    next_ = commands.add_parser('next', help='Find the next period of a tithi, nakshatra, ...')
+    next_.add_argument('path', help='Almanac file')
+    next_.add_argument('--limb', required=True, choices=LIMBS)
+    next_.add_argument('--name', required=True, help='Name of the limb value, e.g. Ekadashi')
+    next_.add_argument('--after', help="UTC instant, 'YYYY-MM-DD HH:MM' (default: now)")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            start = _parse_utc(args.start)
+            end = _parse_utc(args.end) + timedelta(days=1)
+            count = build_almanac(args.path, start, end, precision_seconds=args.precision,
+                                  chebyshev=args.chebyshev, workers=args.workers)
+            size = os.path.getsize(args.path)
+            print(f"Wrote {count} periods ({size / 1e6:.1f} MB) to {args.path}")
+            return
+
+        with Almanac(args.path) as almanac:
+            if args.command == 'at':
+                date = _parse_utc(args.date)
+                for limb in almanac.limbs:
+                    period = almanac.limb_at(limb, date)
+                    print(f"{limb.capitalize():<10}: {period.name:<16} "
+                          f"{period.start_time:%Y-%m-%d %H:%M:%S} - {period.end_time:%Y-%m-%d %H:%M:%S}")
+            else:
+                after = _parse_utc(args.after) if args.after else datetime.utcnow()
+                period = almanac.next_occurrence(args.limb, args.name, after)
+                if period is None:
+                    print(f"No {args.name} after {after:%Y-%m-%d %H:%M} within the almanac")
+                else:
+                    print(f"{period.name}: {period.start_time:%Y-%m-%d %H:%M:%S} - "
+                          f"{period.end_time:%Y-%m-%d %H:%M:%S} UTC")
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
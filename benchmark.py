@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from monthly_panchanga import MonthlyPanchangaDisplay
+from muhurtha_finder import MuhurthaFinder
+from panchanga import PanchangaCalculator
+from planet_hours import VedicPlanetaryHours
+
+
+SEED = 20250101
+START = datetime(2025, 1, 1)
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> setup function returning (operation, number of items it processes)
+BENCHMARKS: Dict[str, Callable[[], Tuple[Callable[[], None], int]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _random_instants(count: int) -> List[datetime]:
+    rng = random.Random(SEED)
+    return [START + timedelta(seconds=rng.randrange(0, 366 * 86400)) for _ in range(count)]
+
+
+@benchmark("panchanga.scalar")
+def bench_panchanga_scalar():
+    calculator = PanchangaCalculator()
+    dates = _random_instants(2000)
+    return lambda: [calculator.calculate_panchanga(d) for d in dates], len(dates)
+
+
+@benchmark("panchanga.batch")
+def bench_panchanga_batch():
+    calculator = PanchangaCalculator()
+    dates = _random_instants(2000)
+    return lambda: calculator.calculate_panchanga_batch(dates), len(dates)
+
+
+@benchmark("monthly.render")
+def bench_monthly_render():
+    def render():
+        with redirect_stdout(io.StringIO()):
+            MonthlyPanchangaDisplay(2025, 1, 3.5).display()
+    return render, 1
+
+
+def _muhurtha(days: int, mode: str = "sample"):
+    finder = MuhurthaFinder()
+    end = START + timedelta(days=days)
+    return lambda: finder.find_muhurtha(START, end, "marriage", check_interval_hours=1.0, mode=mode), 1
+
+
+@benchmark("muhurtha.7d")
+def bench_muhurtha_7():
+    return _muhurtha(7)
+
+
+@benchmark("muhurtha.30d")
+def bench_muhurtha_30():
+    return _muhurtha(30)
+
+
+@benchmark("muhurtha.365d")
+def bench_muhurtha_365():
+    return _muhurtha(365)
+
+
+@benchmark("muhurtha.365d.interval")
+def bench_muhurtha_365_interval():
+    return _muhurtha(365, mode="interval")
+
+
+@benchmark("muhurtha.365d.multi")
+def bench_muhurtha_365_multi():
+    finder = MuhurthaFinder()
+    end = START + timedelta(days=365)
+    actions = list(finder.action_rules)
+    return lambda: finder.find_muhurtha_multi(START, end, actions, check_interval_hours=1.0), len(actions)
+
+
+@benchmark("muhurtha.365d.parallel")
+def bench_muhurtha_365_parallel():
+    finder = MuhurthaFinder()
+    end = START + timedelta(days=365)
+    return lambda: list(finder.find_muhurtha_parallel(START, end, "marriage", check_interval_hours=1.0)), 1
+
+
+@benchmark("hora.day")
+def bench_hora_day():
+    dates = [START + timedelta(days=i) for i in range(30)]
+    return lambda: [VedicPlanetaryHours(d, 35.6892, 51.3890, "+03:30").calculate_horas()
+                    for d in dates], len(dates)
+
+
+def _cli(*args: str):
+    command = [sys.executable, *args]
+    # Time a cold start even when a panchanga_daemon.py is running
+    env = dict(os.environ, PANCHANGA_SOCKET="")
+
+    def run():
+        subprocess.run(command, cwd=HERE, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return run, 1
+
+
+@benchmark("cli.daily")
+def bench_cli_daily():
+    return _cli("daily_panchanga.py", "-d", "01/01/2025", "-t", "12:00", "-z", "+03:30")
+
+
+@benchmark("cli.monthly")
+def bench_cli_monthly():
+    return _cli("monthly_panchanga.py", "--month", "1", "--year", "2025", "-z", "+03:30")
+
+
+@benchmark("cli.hora")
+def bench_cli_hora():
+    return _cli("planet_hours.py", "--date", "2025-01-01", "--lat", "35.6892", "--lon", "51.3890",
+                "--tz", "+03:30")
+
+
+def run_benchmarks(names: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        operation, items = BENCHMARKS[name]()
+        operation()  # warm up imports and caches outside the timed runs
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            operation()
+            timings.append(time.perf_counter() - t0)
+        median = statistics.median(timings)
+        results[name] = {
+            "median": median,
+            "min": min(timings),
+            "repeat": repeat,
+            "items": items,
+            "per_item": median / items,
+        }
+        print(f"{name:<26} {median * 1000:10.2f} ms  ({median / items * 1e6:10.1f} us/item)")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Names of benchmarks whose median is slower than baseline by more than ``tolerance``"""
+    regressions = []
+    print(f"\n{'Benchmark':<26} {'Baseline':>12} {'Current':>12} {'Ratio':>8}")
+    print("-" * 62)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<26} {'-':>12} {result['median'] * 1000:10.2f}ms {'new':>8}")
+            continue
+        ratio = result["median"] / base["median"]
+        status = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            status = "  REGRESSION"
+        print(f"{name:<26} {base['median'] * 1000:10.2f}ms {result['median'] * 1000:10.2f}ms "
+              f"{ratio:7.2f}x{status}")
+    return regressions
+
+
+def metadata() -> Dict[str, str]:
+    try:
+        import ephem
+        ephem_version = ephem.__version__
+    except (ImportError, AttributeError):
+        ephem_version = "unknown"
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ephem": ephem_version,
+        "seed": SEED,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Panchanga benchmark suite')
+    parser.add_argument('--output', default=os.path.join(tempfile.gettempdir(), 'benchmark_results.json'),
+                        help='Where to write the results JSON (default: benchmark_results.json in the temp directory)')
+    parser.add_argument('--baseline', help='Results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown against the baseline as a fraction (default: 0.25)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (median is reported)')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Run only these benchmarks (prefix match)')
+    parser.add_argument('--list', action='store_true', help='List the available benchmarks')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return
+
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [name for name in names if any(name.startswith(prefix) for prefix in args.only)]
+        if not names:
+            print(f"Error: no benchmark matches {' '.join(args.only)}")
+            sys.exit(1)
+
+    baseline: Optional[Dict] = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: cannot read baseline {args.baseline}: {e}")
+            sys.exit(1)
+
+    results = run_benchmarks(names, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump({"metadata": metadata(), "results": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
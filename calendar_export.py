@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import heapq
+import io
+import json
+import os
+import re
+import sys
+from collections import deque
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Callable, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+
+from almanac import limb_chunk, stitch_periods
+from instrumentation import stats
+from panchanga import PanchangaCalculator
+from timezones import EPOCH, ZoneSpec, ZoneTable, resolve_zone
+from transitions import LIMBS, LIMB_SPECS, LimbPeriod
+
+UNIX_EPOCH_JD = 2440587.5
+PERIOD_FIELDS = ("zone", "limb", "name", "start", "end", "start_utc", "end_utc")
+EVENT_KINDS = ("periods", "daily")
+FORMATS = ("ics", "jsonl", "csv")
+# Formatted text is handed to the output in pieces of about this size
+BUFFER_BYTES = 1 << 16
+# Days of daily summaries evaluated per batch call
+DAILY_BATCH_DAYS = 366
+
+
+def _bounded_map(function: Callable, tasks: Iterable, executor, window: int) -> Iterator:
+    """``map(function, tasks)`` in order with at most ``window`` tasks in flight on ``executor``"""
+    if executor is None:
+        yield from map(function, tasks)
+        return
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(function, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _chunk_edges(start_jd: float, end_jd: float, chunk_days: float) -> Iterator[Tuple[float, float]]:
+    edge = start_jd
+    while edge < end_jd:
+        yield edge, min(edge + chunk_days, end_jd)
+        edge += chunk_days
+
+
+def limb_period_stream(limbs: Sequence[str], start_jd: float, end_jd: float,
+                       transitions=None, executor=None, window: int = 4,
+                       chunk_days: float = 30.0) -> Iterator[LimbPeriod]:
+    """Periods of ``limbs`` overlapping [start_jd, end_jd] in order of start
+
+    Each limb is searched ``chunk_days`` at a time, on ``executor`` with at
+    most ``window`` chunks ahead when one is given, or through
+    ``transitions`` (e.g. an ``almanac.Almanac``) in this process. Chunks
+    are stitched as ``build_almanac`` does, so only a few chunks per limb are
+    held at any time whatever the length of the range.
+    """
+    def one_limb(limb: str) -> Iterator[LimbPeriod]:
+        edges = _chunk_edges(start_jd, end_jd, chunk_days)
+        if transitions is not None:
+            chunks = ([(p.index, p.start_jd, p.end_jd) for p in transitions.limb_periods(limb, a, b)]
+                      for a, b in edges)
+            precision = transitions.precision
+        else:
+            tasks = ((limb, a, b, 1.0, False) for a, b in edges)
+            chunks = _bounded_map(limb_chunk, tasks, executor, window)
+            precision = 1.0 / 86400.0
+        for index, start, end in stitch_periods(chunks, precision):
+            yield LimbPeriod(limb, index, start, end)
+
+    # Periods are ordered by start to the second, as they are written, then
+    # by limb, so the order does not depend on where chunks were cut
+    rank = {limb: i for i, limb in enumerate(limbs)}
+    return heapq.merge(*(one_limb(limb) for limb in limbs),
+                       key=lambda period: (round(_jd_posix(period.start_jd)), rank[period.limb]))
+
+
+def _local_bounds(zone: ZoneTable, start: date, end: date) -> Tuple[float, float]:
+    """UTC POSIX seconds of local midnight starting ``start`` and ending ``end``"""
+    first = (datetime.combine(start, datetime.min.time()) - EPOCH).total_seconds()
+    last = (datetime.combine(end + timedelta(days=1), datetime.min.time()) - EPOCH).total_seconds()
+    return first - zone.local_offset_at(first), last - zone.local_offset_at(last)
+
+
+def _posix_jd(ts: float) -> float:
+    return ts / 86400.0 + UNIX_EPOCH_JD
+
+
+def _jd_posix(jd: float) -> float:
+    return (jd - UNIX_EPOCH_JD) * 86400.0
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="seconds")
+
+
+def period_records(periods: Iterable[LimbPeriod], zones: Sequence[ZoneTable],
+                   start: date, end: date) -> Iterator[dict]:
+    """One record per period and zone whose local date range the period overlaps"""
+    bounds = [_local_bounds(zone, start, end) for zone in zones]
+    for period in periods:
+        start_ts, end_ts = _jd_posix(period.start_jd), _jd_posix(period.end_jd)
+        start_utc = EPOCH + timedelta(seconds=round(start_ts))
+        end_utc = EPOCH + timedelta(seconds=round(end_ts))
+        for zone, (lo, hi) in zip(zones, bounds):
+            if end_ts <= lo or start_ts >= hi:
+                continue
+            yield {"zone": zone.name, "limb": period.limb, "name": period.name,
+                   "start": _iso(zone.to_local(start_utc)), "end": _iso(zone.to_local(end_utc)),
+                   "start_utc": _iso(start_utc), "end_utc": _iso(end_utc)}
+
+
+def daily_fields(limbs: Sequence[str]) -> Tuple[str, ...]:
+    names = []
+    for limb in limbs:
+        names.append(limb)
+        if limb == "tithi":
+            names.append("paksha")
+    return ("zone", "date") + tuple(names)
+
+
+def daily_records(zones: Sequence[ZoneTable], start: date, end: date, limbs: Sequence[str],
+                  calculator: Optional[PanchangaCalculator] = None) -> Iterator[dict]:
+    """Panchanga at local midnight of every date, as ``monthly_panchanga.py``, ordered by date then zone
+
+    Every zone is evaluated ``DAILY_BATCH_DAYS`` at a time with one batch
+    call.
+    """
+    calculator = calculator or PanchangaCalculator()
+    fields = daily_fields(limbs)[2:]
+
+    def one_zone(zone: ZoneTable) -> Iterator[dict]:
+        import numpy as np
+        first = start
+        while first <= end:
+            count = min(DAILY_BATCH_DAYS, (end - first).days + 1)
+            midnight = (datetime.combine(first, datetime.min.time()) - EPOCH).total_seconds()
+            utc_midnights = zone.local_to_utc_array(midnight + 86400.0 * np.arange(count))
+            batch = calculator.calculate_panchanga_batch(
+                np.round(utc_midnights).astype('int64').astype('datetime64[s]'))
+            for i in range(count):
+                pdata = batch[i]
+                record = {"zone": zone.name, "date": (first + timedelta(days=i)).isoformat()}
+                for name in fields:
+                    record[name] = getattr(pdata, name)
+                yield record
+            first += timedelta(days=count)
+
+    return heapq.merge(*(one_zone(zone) for zone in zones), key=lambda record: record["date"])
+
+
+# -- formats -----------------------------------------------------------------
+
+def _ics_text(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\n", "\\n"))
+
+
+def _ics_line(line: str) -> str:
+    """Fold a content line to 75 octets as RFC 5545 requires"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, limit = [], 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1  # keep multi-byte characters whole
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_uid(*parts: str) -> str:
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", "-".join(parts)) + "@panchanga"
+
+
+def _ics_stamp(text: str) -> str:
+    return text.replace("-", "").replace(":", "") + "Z"
+
+
+class _IcsFormat:
+    def __init__(self, out: io.StringIO, kind: str, fields: Tuple[str, ...]):
+        self.out = out
+        self.kind = kind
+        self.fields = fields
+        self.stamp = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    def header(self) -> None:
+        for line in ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Panchanga//Calendar Export//EN",
+                     "CALSCALE:GREGORIAN"):
+            self.out.write(line + "\r\n")
+
+    def record(self, record: dict) -> None:
+        if self.kind == "periods":
+            title = f"{record['limb'].capitalize()}: {record['name']}"
+            details = f"{record['start']} to {record['end']} ({record['zone']})"
+            lines = [f"UID:{_ics_uid(record['limb'], record['start_utc'], record['zone'])}",
+                     f"DTSTART:{_ics_stamp(record['start_utc'])}",
+                     f"DTEND:{_ics_stamp(record['end_utc'])}",
+                     f"DESCRIPTION:{_ics_text(details)}"]
+        else:
+            day = date.fromisoformat(record["date"])
+            title = ", ".join(record[name] for name in self.fields[2:])
+            details = "\n".join(f"{name.capitalize()}: {record[name]}" for name in self.fields[2:])
+            details += f"\nZone: {record['zone']}"
+            lines = [f"UID:{_ics_uid(record['date'], record['zone'])}",
+                     f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+                     f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+                     f"DESCRIPTION:{_ics_text(details)}"]
+        write = self.out.write
+        write("BEGIN:VEVENT\r\n")
+        write(f"DTSTAMP:{self.stamp}\r\n")
+        for line in lines:
+            write(_ics_line(line))
+        write(_ics_line(f"SUMMARY:{_ics_text(title)}"))
+        write("END:VEVENT\r\n")
+
+    def footer(self) -> None:
+        self.out.write("END:VCALENDAR\r\n")
+
+
+class _JsonlFormat:
+    def __init__(self, out: io.StringIO, kind: str, fields: Tuple[str, ...]):
+        self.out = out
+
+    def header(self) -> None:
+        pass
+
+    def record(self, record: dict) -> None:
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def footer(self) -> None:
+        pass
+
+
+class _CsvFormat:
+    def __init__(self, out: io.StringIO, kind: str, fields: Tuple[str, ...]):
+        self.writer = csv.DictWriter(out, fieldnames=fields)
+
+    def header(self) -> None:
+        self.writer.writeheader()
+
+    def record(self, record: dict) -> None:
+        self.writer.writerow(record)
+
+    def footer(self) -> None:
+        pass
+
+
+_FORMATTERS = {"ics": _IcsFormat, "jsonl": _JsonlFormat, "csv": _CsvFormat}
+
+
+def write_records(records: Iterable[dict], output: TextIO, fmt: str, kind: str,
+                  fields: Tuple[str, ...]) -> int:
+    """Format ``records`` into ``output`` in ``BUFFER_BYTES`` pieces; returns the record count"""
+    if fmt not in _FORMATTERS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    buffer = io.StringIO()
+    formatter = _FORMATTERS[fmt](buffer, kind, fields)
+
+    def drain() -> None:
+        output.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+
+    formatter.header()
+    count = 0
+    for record in records:
+        formatter.record(record)
+        count += 1
+        if buffer.tell() >= BUFFER_BYTES:
+            drain()
+    formatter.footer()
+    drain()
+    return count
+
+
+def export_calendar(output: TextIO, start: date, end: date, zones: Sequence[ZoneSpec],
+                    limbs: Sequence[str] = LIMBS, kind: str = "periods", fmt: str = "jsonl",
+                    almanac=None, workers: Optional[int] = None, chunk_days: float = 30.0) -> int:
+    """Stream a calendar of limb periods or daily summaries from ``start`` through ``end``
+
+    ``kind="periods"`` writes one event per period of each limb and zone,
+    ``kind="daily"`` one summary per local date and zone. Records are
+    computed, formatted and written as a pipeline: limb searches run on
+    ``workers`` processes (default: all cores) a few chunks ahead of the
+    writer, or are read from ``almanac``, and memory stays bounded for any
+    length of range. Returns the number of records written.
+    """
+    if end < start:
+        raise ValueError("end must not be before start")
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"Unknown event kind: {kind}")
+    if fmt not in _FORMATTERS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    for limb in limbs:
+        if limb not in LIMB_SPECS:
+            raise ValueError(f"Unknown limb: {limb}")
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be positive")
+    zones = [resolve_zone(zone) for zone in zones]
+    if not zones:
+        raise ValueError("At least one zone is needed")
+
+    if kind == "daily":
+        return write_records(daily_records(zones, start, end, limbs), output, fmt, kind,
+                             daily_fields(limbs))
+
+    bounds = [_local_bounds(zone, start, end) for zone in zones]
+    start_jd = _posix_jd(min(lo for lo, _ in bounds))
+    end_jd = _posix_jd(max(hi for _, hi in bounds))
+    workers = workers or os.cpu_count() or 1
+    executor = None
+    if almanac is None and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        periods = limb_period_stream(limbs, start_jd, end_jd, almanac, executor,
+                                     window=2 * workers, chunk_days=chunk_days)
+        return write_records(period_records(periods, zones, start, end), output, fmt, kind,
+                             PERIOD_FIELDS)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export Panchanga limb periods or daily summaries as a calendar')
+    parser.add_argument('--start', required=True, help='First local date in YYYY-MM-DD format')
+    parser.add_argument('--end', required=True, help='Last local date in YYYY-MM-DD format')
+    parser.add_argument('--tz', nargs='+', default=['+00:00'], help='Timezone names or offsets (default: UTC)')
+    parser.add_argument('--limbs', nargs='+', default=list(LIMBS), choices=LIMBS, help='Limbs to export')
+    parser.add_argument('--events', default='periods', choices=EVENT_KINDS,
+                        help='One event per limb period, or one summary per local date')
+    parser.add_argument('--format', default='ics', choices=FORMATS, help='Output format')
+    parser.add_argument('--output', default='-', metavar='PATH', help='Output file (default: stdout)')
+    parser.add_argument('--almanac', metavar='PATH', help='Read limb periods from an almanac file')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-days', type=float, default=30.0, help='Days per limb search task')
+    parser.add_argument('--profile', action='store_true', help='Print stage timings and call counts to stderr')
+
+    args = parser.parse_args(argv)
+    if args.profile:
+        stats.enable()
+
+    try:
+        start = datetime.strptime(args.start, '%Y-%m-%d').date()
+        end = datetime.strptime(args.end, '%Y-%m-%d').date()
+        almanac = None
+        if args.almanac:
+            from almanac import Almanac
+            almanac = Almanac(args.almanac)
+        with stats.stage("export.total"):
+            if args.output == '-':
+                export_calendar(sys.stdout, start, end, args.tz, args.limbs, args.events, args.format,
+                                almanac, args.workers, args.chunk_days)
+            else:
+                with open(args.output, 'w', encoding='utf-8', newline='') as output:
+                    export_calendar(output, start, end, args.tz, args.limbs, args.events, args.format,
+                                    almanac, args.workers, args.chunk_days)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.profile:
+        stats.print_summary()
+
+
+if __name__ == "__main__":
+    main()
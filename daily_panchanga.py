@@ -1,41 +1,73 @@
-from datetime import datetime, timedelta
+import sys
+
+if __name__ == "__main__" and not any(arg.startswith('--bulk') for arg in sys.argv[1:]):
+    # Let a running panchanga_daemon.py answer before the imports below;
+    # bulk runs stream stdin and stay local
+    from panchanga_daemon import forward
+    status = forward("daily_panchanga", sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+from datetime import datetime
 import argparse
+from instrumentation import stats
 from panchanga import PanchangaCalculator
 
-try:
-    from jdatetime import datetime as jdatetime
-except ImportError:
-    jdatetime = None
+from timezones import resolve_zone
+from utils import parse_time
+
+
+def parse_local_datetime(date_str: str, time_str: str, zone_str: str,
+                         calendar: str = 'gregorian') -> datetime:
+    """Convert a DD/MM/YYYY date, HH:MM time and zone ([+/-]HH:MM or a name such as Asia/Tehran) to UTC"""
+    dd, mm, yy = map(int, date_str.split('/'))
+    hr = parse_time(time_str)
+    zone = resolve_zone(zone_str)
 
-from utils import parse_timezone, parse_time
+    if calendar == 'jalali':
+        try:
+            from jdatetime import datetime as jdatetime
+        except ImportError:
+            raise ValueError("jdatetime library is not installed. Install it using 'pip install jdatetime' to use Jalali dates.") from None
+        jalali_date = jdatetime(yy, mm, dd)
+        gregorian_date = jalali_date.togregorian()
+        date = datetime(gregorian_date.year, gregorian_date.month, gregorian_date.day, int(hr), int((hr % 1) * 60))
+    else:
+        date = datetime(yy, mm, dd, int(hr), int((hr % 1) * 60))
 
+    local_time = date
+    return zone.to_utc(local_time)
 
-def main():
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Calculate Panchanga with high precision')
-    parser.add_argument('-d', '--date', required=True, help='Date in DD/MM/YYYY format')
-    parser.add_argument('-t', '--time', required=True, help='Time in HH:MM 24-hour format')
-    parser.add_argument('-z', '--zone', required=True, help='Zone with respect to GMT in [+/-]HH:MM format')
+    parser.add_argument('-d', '--date', help='Date in DD/MM/YYYY format')
+    parser.add_argument('-t', '--time', help='Time in HH:MM 24-hour format')
+    parser.add_argument('-z', '--zone', help='Zone with respect to GMT in [+/-]HH:MM format, or a zone name such as Asia/Tehran')
     parser.add_argument('--calendar', default='gregorian', choices=['gregorian', 'jalali'], help='Calendar type of the input date')
+    parser.add_argument('--profile', action='store_true', help='Print stage timings and call counts to stderr')
+    parser.add_argument('--bulk', nargs='?', const='-', metavar='PATH',
+                        help='Read date/time/zone records from PATH (default: stdin) and stream the results to stdout')
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help='Bulk record format (default: from the file extension, csv for stdin)')
+    parser.add_argument('--workers', type=int, default=None, help='Bulk worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=512, help='Bulk records per worker task')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.bulk is None:
+        missing = [flag for flag, value in (('-d/--date', args.date), ('-t/--time', args.time),
+                                            ('-z/--zone', args.zone)) if value is None]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    if args.profile:
+        stats.enable()
 
-    try:
-        dd, mm, yy = map(int, args.date.split('/'))
-        hr = parse_time(args.time)
-        z_hr = parse_timezone(args.zone)
-
-        if args.calendar == 'jalali':
-            if jdatetime is None:
-                print("Error: jdatetime library is not installed. Install it using 'pip install jdatetime' to use Jalali dates.")
-                exit(1)
-            jalali_date = jdatetime(yy, mm, dd)
-            gregorian_date = jalali_date.togregorian()
-            date = datetime(gregorian_date.year, gregorian_date.month, gregorian_date.day, int(hr), int((hr % 1) * 60))
-        else:
-            date = datetime(yy, mm, dd, int(hr), int((hr % 1) * 60))
+    if args.bulk is not None:
+        run_bulk_cli(args)
+        return
 
-        local_time = date
-        utc_time = local_time - timedelta(hours=z_hr)
+    try:
+        utc_time = parse_local_datetime(args.date, args.time, args.zone, args.calendar)
         observer = PanchangaCalculator.setup_observer(utc_time)
         calculator = PanchangaCalculator()
         pdata = calculator.calculate_panchanga(observer.date)
@@ -48,7 +80,31 @@ def main():
 
     except ValueError as e:
         print(f"Error: {str(e)}")
-        exit(1)
+        sys.exit(1)
+
+    if args.profile:
+        stats.print_summary()
+
+
+def run_bulk_cli(args) -> None:
+    from panchanga_bulk import detect_format, run_bulk
+
+    fmt = args.format or ('csv' if args.bulk == '-' else detect_format(args.bulk))
+    try:
+        if args.bulk == '-':
+            failed = run_bulk(sys.stdin, sys.stdout, fmt, args.calendar, args.workers, args.chunk_size)
+        else:
+            with open(args.bulk, newline='', encoding='utf-8') as source:
+                failed = run_bulk(source, sys.stdout, fmt, args.calendar, args.workers, args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.profile:
+        stats.print_summary()
+    if failed:
+        print(f"{failed} record(s) failed", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
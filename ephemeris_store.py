@@ -0,0 +1,198 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import ephem
+
+from panchanga import PanchangaCalculator, EPHEM_EPOCH_JD, to_ephem_date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# File layout (little endian):
+#   header  magic 8s, version u32, fields u32, start f64, step f64, count u64
+#   records count x fields float32: adjusted sun longitude, adjusted moon
+#           longitude, moon phase
+# The header is the time index: record i holds the positions at ephem date
+# start + i * step, so a lookup is one multiplication and an offset.
+MAGIC = b"PNCHEPH\0"
+VERSION = 1
+FIELDS = 3
+HEADER = struct.Struct("<8sIIddQ")
+RECORD = struct.Struct("<3f")
+
+
+def build_store(path: str, start: datetime, end: datetime, step_minutes: float = 30.0,
+                calculator: Optional[PanchangaCalculator] = None,
+                chunk_size: int = 50000) -> int:
+    """Write a precomputed ephemeris table covering [start, end]
+
+    Positions are computed in chunks with ``calculate_panchanga_batch`` (pass
+    a calculator with a backend to build faster) and written straight to
+    disk, so memory use does not depend on the range.
+
+    Returns:
+        int: number of records written
+    """
+    if np is None:
+        raise ImportError("numpy is required to build an ephemeris store. Install it using 'pip install numpy'.")
+    if step_minutes <= 0:
+        raise ValueError("step_minutes must be positive")
+    calculator = calculator or PanchangaCalculator()
+
+    step = step_minutes / 1440.0
+    # One extra record on each side keeps the whole range interpolable
+    first = to_ephem_date(start) - step
+    count = int((to_ephem_date(end) - first) / step) + 3
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, FIELDS, first, step, count))
+        for offset in range(0, count, chunk_size):
+            ephem_dates = first + step * np.arange(offset, min(offset + chunk_size, count))
+            batch = calculator.calculate_panchanga_batch(ephem_dates + EPHEM_EPOCH_JD)
+            records = np.column_stack([batch.sun_long, batch.moon_long, batch.moon_phase])
+            out.write(records.astype("<f4").tobytes())
+    os.replace(tmp_path, path)
+    return count
+
+
+class MappedEphemeris:
+    """Ephemeris backend reading a table written by ``build_store``
+
+    The file is mapped read-only, so every process using the same table
+    shares one copy through the page cache and opening it costs nothing
+    up front. Positions are interpolated with a 4-point Lagrange polynomial;
+    at the default 30-minute resolution the error stays below 1e-3 degrees
+    of Moon longitude. Instants outside the table are computed by
+    ``fallback`` (live ephem by default).
+    """
+
+    def __init__(self, path: str, fallback: Optional[PanchangaCalculator] = None):
+        self.path = path
+        self.fallback = fallback or PanchangaCalculator()
+        with open(path, "rb") as f:
+            # Shorter than a header (including empty, which mmap refuses)
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is not a panchanga ephemeris store")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, fields, start, step, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or fields != FIELDS:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a panchanga ephemeris store")
+        if len(self._mmap) < HEADER.size + count * RECORD.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+
+        self.start = start
+        self.step = step
+        self.count = count
+        self._values = memoryview(self._mmap)[HEADER.size:HEADER.size + count * RECORD.size].cast("f")
+        self._array = None
+
+    def close(self) -> None:
+        self._values.release()
+        self._array = None
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedEphemeris":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def end(self) -> float:
+        return self.start + (self.count - 1) * self.step
+
+    def sidereal_positions(self, d: float) -> Tuple[float, float, float]:
+        """Adjusted Sun longitude, adjusted Moon longitude and Moon phase at ephem date ``d``"""
+        position = (d - self.start) / self.step
+        i = int(position)
+        if position < 1 or i + 2 >= self.count:
+            return self.fallback.sidereal_positions(ephem.Date(d))
+
+        u = position - i
+        weights = (-u * (u - 1) * (u - 2) / 6, (u + 1) * (u - 1) * (u - 2) / 2,
+                   -(u + 1) * u * (u - 2) / 2, (u + 1) * u * (u - 1) / 6)
+        values = self._values
+        base = (i - 1) * FIELDS
+        result = []
+        for field in range(FIELDS):
+            anchor = values[base + FIELDS + field]
+            total = 0.0
+            for k in range(4):
+                delta = values[base + k * FIELDS + field] - anchor
+                if field < 2:
+                    delta = (delta + 180.0) % 360.0 - 180.0
+                total += weights[k] * delta
+            result.append(anchor + total)
+        return (PanchangaCalculator.normalize_degrees(result[0]),
+                PanchangaCalculator.normalize_degrees(result[1]),
+                result[2])
+
+    def sidereal_positions_array(self, ds) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Vectorized ``sidereal_positions`` over an array of ephem dates"""
+        if self._array is None:
+            self._array = np.frombuffer(self._mmap, dtype="<f4", count=self.count * FIELDS,
+                                        offset=HEADER.size).reshape(self.count, FIELDS)
+        ds = np.asarray(ds, dtype=float)
+        position = (ds - self.start) / self.step
+        inside = (position >= 1) & (position < self.count - 2)
+        i = np.where(inside, position, 1).astype(np.int64)
+        u = (position - i)[:, None]
+        weights = (-u * (u - 1) * (u - 2) / 6, (u + 1) * (u - 1) * (u - 2) / 2,
+                   -(u + 1) * u * (u - 2) / 2, (u + 1) * u * (u - 1) / 6)
+
+        anchor = self._array[i].astype(float)
+        result = anchor.copy()
+        for k, weight in enumerate(weights):
+            delta = self._array[i + k - 1] - anchor
+            delta[:, :2] = (delta[:, :2] + 180.0) % 360.0 - 180.0
+            result += weight * delta
+        result[:, :2] -= np.floor(result[:, :2] / 360.0) * 360.0
+
+        for j in np.flatnonzero(~inside):
+            result[j] = self.fallback.sidereal_positions(ephem.Date(ds[j]))
+        return result[:, 0], result[:, 1], result[:, 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a precomputed ephemeris store for PanchangaCalculator')
+    parser.add_argument('output', help='Path of the store to write')
+    parser.add_argument('--start', required=True, help='First date in YYYY-MM-DD format (UTC)')
+    parser.add_argument('--end', required=True, help='Last date in YYYY-MM-DD format (UTC)')
+    parser.add_argument('--step', type=float, default=30.0, help='Resolution in minutes (default: 30)')
+    parser.add_argument('--chebyshev', action='store_true',
+                        help='Sample through the Chebyshev backend instead of live ephem (much faster)')
+    args = parser.parse_args()
+
+    try:
+        start = datetime.strptime(args.start, '%Y-%m-%d')
+        end = datetime.strptime(args.end, '%Y-%m-%d') + timedelta(days=1)
+        if end <= start:
+            raise ValueError("End date must not be before start date")
+
+        calculator = None
+        if args.chebyshev:
+            from ephemeris import ChebyshevBackend
+            calculator = PanchangaCalculator(backend=ChebyshevBackend())
+
+        count = build_store(args.output, start, end, args.step, calculator)
+        size = os.path.getsize(args.output)
+        print(f"Wrote {count} records ({size / 1e6:.1f} MB) to {args.output}")
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, Optional, TextIO
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+@dataclass
+class ProfileStats:
+    """Snapshot of the counters and stage timers collected so far"""
+    wall_seconds: float = 0.0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [f"Profile ({self.wall_seconds * 1000:.1f} ms wall)",
+                 f"{'Stage':<24} {'Calls':>9} {'Total ms':>10} {'Mean us':>10} {'Wall %':>7}",
+                 "-" * 64]
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            mean = stage.seconds / stage.calls * 1e6 if stage.calls else 0.0
+            share = stage.seconds / self.wall_seconds * 100 if self.wall_seconds else 0.0
+            lines.append(f"{name:<24} {stage.calls:>9} {stage.seconds * 1000:>10.2f} {mean:>10.1f} {share:>6.1f}%")
+        if self.counters:
+            lines.append("")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<24} {value:>9}")
+        return "\n".join(lines)
+
+class _Stage:
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner: "Instrumentation", name: str):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+        return False
+
+_NULL_STAGE = nullcontext()
+
+class Instrumentation:
+    """Stage timers and event counters shared by the calculators
+
+    Collection is off by default. Instrumented code checks ``enabled``
+    before doing anything, so the disabled cost is one attribute lookup per
+    site. Stage times are inclusive: a stage running inside another is
+    counted in both.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._stages: Dict[str, StageStats] = {}
+        self._counters: Dict[str, int] = {}
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._started = time.perf_counter()
+            self._stages = {}
+            self._counters = {}
+
+    def stage(self, name: str):
+        """Context manager timing one stage, a no-op while disabled"""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def record(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = StageStats()
+            stage.calls += calls
+            stage.seconds += seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self) -> ProfileStats:
+        with self._lock:
+            wall = time.perf_counter() - self._started if self._started is not None else 0.0
+            return ProfileStats(wall,
+                                {name: StageStats(s.calls, s.seconds) for name, s in self._stages.items()},
+                                dict(self._counters))
+
+    def print_summary(self, stream: TextIO = None) -> None:
+        print(self.snapshot().summary(), file=stream or sys.stderr)
+
+
+stats = Instrumentation()
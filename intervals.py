@@ -0,0 +1,92 @@
+from typing import Iterable, Iterator, List, Tuple
+
+
+class IntervalSet:
+    """A set of half-open intervals [start, end) on the real line
+
+    Intervals are kept sorted and disjoint; touching intervals are merged.
+    The set operations are linear sweeps over both operands.
+    """
+    __slots__ = ("_intervals",)
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]] = ()):
+        self._intervals = self._normalize(intervals)
+
+    @staticmethod
+    def _normalize(intervals: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        merged: List[Tuple[float, float]] = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    @classmethod
+    def _from_normalized(cls, intervals: List[Tuple[float, float]]) -> "IntervalSet":
+        result = cls.__new__(cls)
+        result._intervals = intervals
+        return result
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return iter(self._intervals)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IntervalSet) and self._intervals == other._intervals
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self._intervals!r})"
+
+    def __contains__(self, point: float) -> bool:
+        return any(start <= point < end for start, end in self._intervals)
+
+    def total_length(self) -> float:
+        return sum(end - start for start, end in self._intervals)
+
+    def union(self, other: "IntervalSet") -> "IntervalSet":
+        return IntervalSet(self._intervals + other._intervals)
+
+    def intersection(self, other: "IntervalSet") -> "IntervalSet":
+        result = []
+        a, b = self._intervals, other._intervals
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            end = min(a[i][1], b[j][1])
+            if start < end:
+                result.append((start, end))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return self._from_normalized(result)
+
+    def difference(self, other: "IntervalSet") -> "IntervalSet":
+        result = []
+        b = other._intervals
+        j = 0
+        for start, end in self._intervals:
+            while j < len(b) and b[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(b) and b[k][0] < end:
+                if b[k][0] > start:
+                    result.append((start, b[k][0]))
+                start = max(start, b[k][1])
+                k += 1
+            if start < end:
+                result.append((start, end))
+        return self._from_normalized(result)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
@@ -1,27 +1,94 @@
 #!/usr/bin/env python3
 
-from datetime import datetime, timedelta
+import sys
+
+if __name__ == "__main__":
+    # Let a running panchanga_daemon.py answer before the imports below
+    from panchanga_daemon import forward
+    status = forward("monthly_panchanga", sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+from datetime import datetime
 import argparse
-from typing import List
+from typing import Dict, List, Optional
 
-from calendar import monthcalendar
-import sys
+from calendar import monthcalendar, monthrange
+from instrumentation import stats
 from panchanga import PanchangaCalculator, PanchangaData, AstronomicalConstants
-from utils import parse_timezone
+from timezones import EPOCH, ZoneSpec, resolve_zone
+
+class MonthlyPanchangaModel:
+    """Panchanga of every day of a month, computed once at local midnight
+
+    The model is independent of any output format; renderers read ``weeks``
+    and ``day()`` as often as they like without recomputing anything.
+    ``timezone`` is hours east of UTC, an offset string or a zone name; a
+    named zone gives each day the offset in force at its own midnight.
+    """
+
+    def __init__(self, year: int, month: int, timezone: ZoneSpec,
+                 calculator: Optional[PanchangaCalculator] = None):
+        self.year = year
+        self.month = month
+        self.timezone = timezone
+        self.zone = resolve_zone(timezone)
+        self.calculator = calculator or PanchangaCalculator()
+        self.weeks = monthcalendar(year, month)
+        with stats.stage("monthly.compute"):
+            self.days = self._compute_days()
+
+    def _utc_midnight(self, day: int) -> datetime:
+        return self.zone.to_utc(datetime(self.year, self.month, day, 0, 0))
+
+    def _compute_days(self) -> Dict[int, Optional[PanchangaData]]:
+        """Compute each day once, in a single batch call when possible"""
+        day_numbers = list(range(1, monthrange(self.year, self.month)[1] + 1))
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            first = (datetime(self.year, self.month, 1) - EPOCH).total_seconds()
+            local_midnights = first + 86400.0 * np.arange(len(day_numbers))
+            utc_midnights = self.zone.local_to_utc_array(local_midnights)
+            batch = self.calculator.calculate_panchanga_batch(
+                np.round(utc_midnights).astype('int64').astype('datetime64[s]'))
+            return {day: batch[i] for i, day in enumerate(day_numbers)}
+
+        days = {}
+        for day in day_numbers:
+            try:
+                days[day] = self.calculator.calculate_panchanga(self._utc_midnight(day))
+            except Exception:
+                days[day] = None
+        return days
+
+    def day(self, day: int) -> Optional[PanchangaData]:
+        """Panchanga at local midnight of ``day``, or None if it could not be computed"""
+        return self.days.get(day)
+
 
 class MonthlyPanchangaDisplay:
-    def __init__(self, year: int, month: int, timezone: float):
+    def __init__(self, year: int, month: int, timezone: ZoneSpec,
+                 model: Optional[MonthlyPanchangaModel] = None):
         self.year = year
         self.month = month
         self.timezone = timezone
-        self.calculator = PanchangaCalculator()
+        self.model = model or MonthlyPanchangaModel(year, month, timezone)
+        self.calculator = self.model.calculator
 
     def get_day_panchanga(self, day: int) -> PanchangaData:
-        date = datetime(self.year, self.month, day, 0, 0)
-        utc_time = date - timedelta(hours=self.timezone)
-        return self.calculator.calculate_panchanga(utc_time)
+        pdata = self.model.day(day)
+        if pdata is None:
+            raise ValueError(f"Panchanga unavailable for day {day}")
+        return pdata
 
     def display(self):
+        with stats.stage("monthly.render"):
+            self._display()
+
+    def _display(self):
         # Header
         month_name = AstronomicalConstants.MONTHS[self.month - 1]
         header = f"{month_name} {self.year}"
@@ -34,55 +101,52 @@ class MonthlyPanchangaDisplay:
         print("-" * 80)
 
         # Calendar content
-        cal = monthcalendar(self.year, self.month)
-        for week in cal:
+        for week in self.model.weeks:
             self.display_week(week)
 
     def display_week(self, week: List[int]):
         # Day and Tithi
         week_str = ""
         for day in week:
-            if day == 0:
+            pdata = self.model.day(day) if day else None
+            if pdata is None:
                 week_str += "           "
             else:
-                try:
-                    pdata = self.get_day_panchanga(day)
-                    day_info = f"{day:2d}-{pdata.tithi[:3]}"
-                    week_str += f"{day_info:<11}"
-                except:
-                    week_str += "           "
+                day_info = f"{day:2d}-{pdata.tithi[:3]}"
+                week_str += f"{day_info:<11}"
         print(week_str)
 
         # Display additional information
         for info_type in ["Nakshatra", "Yoga", "Karana"]:
             week_str = ""
             for day in week:
-                if day == 0:
+                pdata = self.model.day(day) if day else None
+                if pdata is None:
                     week_str += "           "
                 else:
-                    try:
-                        pdata = self.get_day_panchanga(day)
-                        if info_type == "Nakshatra":
-                            info = pdata.nakshatra[:3]
-                        elif info_type == "Yoga":
-                            info = pdata.yoga[:3]
-                        else:
-                            info = pdata.karana[:3]
-                        week_str += f"{info:11}"
-                    except:
-                        week_str += "           "
+                    if info_type == "Nakshatra":
+                        info = pdata.nakshatra[:3]
+                    elif info_type == "Yoga":
+                        info = pdata.yoga[:3]
+                    else:
+                        info = pdata.karana[:3]
+                    week_str += f"{info:11}"
             print(week_str)
         print("-" * 80)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Generate Monthly Panchanga Calendar')
     parser.add_argument('--month', type=int, help='Month number (1-12)')
     parser.add_argument('--year', type=int, help='Year')
     parser.add_argument('-z', '--zone', required=True, 
-                        help='Timezone offset from UTC (e.g., +5:30 or +5.5)')
+                        help='Timezone offset from UTC (e.g., +5:30 or +5.5) or zone name (e.g., Asia/Tehran)')
+    parser.add_argument('--profile', action='store_true', help='Print stage timings and call counts to stderr')
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    if args.profile:
+        stats.enable()
 
     try:
         # Use current month/year if not specified
@@ -93,8 +157,8 @@ def main():
         if not (1 <= month <= 12):
             raise ValueError("Month must be between 1 and 12")
 
-        timezone = parse_timezone(args.zone)
-        
+        timezone = resolve_zone(args.zone)
+
         display = MonthlyPanchangaDisplay(year, month, timezone)
         display.display()
 
@@ -102,5 +166,8 @@ def main():
         print(f"Error: {str(e)}")
         sys.exit(1)
 
+    if args.profile:
+        stats.print_summary()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,26 @@
+import sys
+
+if __name__ == "__main__":
+    # Let a running panchanga_daemon.py answer before the imports below
+    from panchanga_daemon import forward
+    status = forward("muhurtha_finder", sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+import argparse
+import heapq
+import math
+import os
+import time
 from datetime import datetime, timedelta
-from typing import List
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 from dataclasses import dataclass
-from panchanga import PanchangaData, PanchangaCalculator
+from functools import partial
+from itertools import islice
+from panchanga import PanchangaData, PanchangaCalculator, AstronomicalConstants, EPHEM_EPOCH_JD, to_ephem_date
+from instrumentation import stats
+from intervals import IntervalSet
+from transitions import LimbTransitionFinder, jd_to_datetime
 
 
 @dataclass
@@ -11,11 +30,86 @@ class MuhurthaTimeRange:
     quality: str
     explanation: str
 
+    @classmethod
+    def lazy(cls, start_time: datetime, end_time: datetime, quality: str,
+             explain: Callable[[], str]) -> "MuhurthaTimeRange":
+        """A range whose explanation is written by ``explain`` on first access
+
+        ``explanation`` is absent from the instance until first read, when
+        ``__getattr__`` fills it in; equality, ``dataclasses.replace`` and
+        ``asdict``, assignment and pickling all see an ordinary field.
+        """
+        time_range = cls.__new__(cls)
+        time_range.start_time = start_time
+        time_range.end_time = end_time
+        time_range.quality = quality
+        time_range._explain = explain
+        return time_range
+
+    def __getattr__(self, name: str):
+        # Only reached while a lazy explanation has not been written yet
+        explain = self.__dict__.pop("_explain", None) if name == "explanation" else None
+        if explain is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self.explanation = explain()
+        return self.explanation
+
+    def __getstate__(self) -> dict:
+        # Write the explanation before the range is copied or leaves the process
+        self.explanation
+        return self.__dict__
+
+
+_MICROSECOND = timedelta(microseconds=1)
+_DAY_MICROSECONDS = 86400 * 10**6
+
+# Rank of each quality for find_best_muhurtha; higher is better
+QUALITY_RANK = {"Neutral": 0, "Good": 1}
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """An action's rules as index sets matched against PanchangaData indices"""
+    nakshatras: FrozenSet[int]
+    avoid_tithis: FrozenSet[int]
+    weekdays: FrozenSet[int]
+
+    def matches(self, weekday: int, pdata: PanchangaData) -> bool:
+        return (pdata.nakshatra_index in self.nakshatras and
+                pdata.tithi_index not in self.avoid_tithis and
+                weekday in self.weekdays)
+
+
+@dataclass(frozen=True)
+class RuleMasks:
+    """The rules of several actions as bitmask tables
+
+    Bit ``k`` stands for ``actions[k]``. ``nakshatra[i]`` has the bits of
+    the actions for which nakshatra ``i`` is good, ``tithi[i]`` those for
+    which tithi ``i`` is not avoided and ``weekday[w]`` those for which
+    weekday ``w`` (Monday = 0) is good, so the actions suitable at an
+    instant are three lookups and two ANDs.
+    """
+    actions: Tuple[str, ...]
+    nakshatra: Tuple[int, ...]
+    tithi: Tuple[int, ...]
+    weekday: Tuple[int, ...]
+
+    def suitable(self, weekday: int, pdata: PanchangaData) -> int:
+        return self.nakshatra[pdata.nakshatra_index] & self.tithi[pdata.tithi_index] & self.weekday[weekday]
 
 
 class MuhurthaFinder:
-    def __init__(self):
-        self.panchanga = PanchangaCalculator()
+    def __init__(self, calculator: Optional[PanchangaCalculator] = None, almanac=None):
+        """
+        Args:
+            calculator: Panchanga source for sampled searches
+            almanac: optional ``almanac.Almanac``; interval searches read
+                limb periods from it and, without ``calculator``, sampled
+                searches read the limbs from it too
+        """
+        self.panchanga = calculator or PanchangaCalculator(almanac=almanac)
+        self.transitions = almanac or LimbTransitionFinder(self.panchanga)
         
         # Expand action rules with meeting-specific criteria
         self.action_rules = {
@@ -36,6 +130,8 @@ class MuhurthaFinder:
             }
             # Add more action types and their rules as needed
         }
+        # action -> CompiledRules, refreshed whenever a search starts
+        self._compiled_rules: Dict[str, CompiledRules] = {}
 
 
     def _get_weekday_name(self, dt: datetime) -> str:
@@ -44,6 +140,10 @@ class MuhurthaFinder:
 
     def _generate_explanation(self, dt: datetime, pdata: PanchangaData, action_type: str) -> str:
         """Generate an explanation for why this time is suitable"""
+        with stats.stage("muhurtha.explanation"):
+            return self._explanation_text(dt, pdata, action_type)
+
+    def _explanation_text(self, dt: datetime, pdata: PanchangaData, action_type: str) -> str:
         rules = self.action_rules[action_type]
         
         explanations = [
@@ -68,54 +168,412 @@ class MuhurthaFinder:
                       start_date: datetime,
                       end_date: datetime,
                       action_type: str,
-                      check_interval_hours: float = 1.0) -> List[MuhurthaTimeRange]:
+                      check_interval_hours: float = 1.0,
+                      mode: str = "sample") -> List[MuhurthaTimeRange]:
+        """Find time ranges suitable for ``action_type`` between two instants
+
+        ``mode="sample"`` evaluates the Panchanga every ``check_interval_hours``
+        and reports range edges at sample times. ``mode="interval"`` builds
+        the limb timeline once and returns exact range edges, see
+        ``find_muhurtha_intervals``.
+        """
         if action_type not in self.action_rules:
             raise ValueError(f"Unknown action type: {action_type}")
+        if mode == "interval":
+            return self.find_muhurtha_intervals(start_date, end_date, action_type)
+        if mode != "sample":
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.compile_rules(action_type)
+        with stats.stage("muhurtha.search"):
+            return self._find_muhurtha_sampled(start_date, end_date, action_type, check_interval_hours)
 
-        suitable_ranges = []
-        current_time = start_date
+    def iter_muhurtha(self,
+                      start_date: datetime,
+                      end_date: Optional[datetime],
+                      action_type: str,
+                      check_interval_hours: float = 1.0,
+                      limit: Optional[int] = None) -> Iterator[MuhurthaTimeRange]:
+        """Yield the sample-mode ranges of ``find_muhurtha`` one at a time
+
+        Each range is yielded as soon as its end is sampled, and sampling
+        stops after ``limit`` ranges. ``end_date=None`` searches without an
+        end, so it needs a ``limit`` or a caller that stops iterating.
+        Explanations are written when first read.
+        """
+        if action_type not in self.action_rules:
+            raise ValueError(f"Unknown action type: {action_type}")
+        if limit is not None and limit < 1:
+            return iter(())
+        self.compile_rules(action_type)
+        ranges = self._iter_sampled(start_date, end_date, action_type, check_interval_hours)
+        return ranges if limit is None else islice(ranges, limit)
+
+    def find_best_muhurtha(self,
+                           start_date: datetime,
+                           end_date: Optional[datetime],
+                           action_type: str,
+                           k: int = 1,
+                           check_interval_hours: float = 1.0) -> List[MuhurthaTimeRange]:
+        """The ``k`` best ranges, best first
+
+        Ranges rank by ``QUALITY_RANK`` of their quality, earlier first among
+        equals. Only the ``k`` best seen so far are kept, in a heap, and the
+        scan stops once all of them have the top rank since no later range
+        can displace them.
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        top = max(QUALITY_RANK.values())
+        heap = []
+        for order, found in enumerate(self.iter_muhurtha(start_date, end_date, action_type,
+                                                         check_interval_hours)):
+            # The heap root is the worst kept range: lowest rank, then latest
+            entry = (QUALITY_RANK.get(found.quality, 0), -order, found)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+            if len(heap) == k and heap[0][0] == top:
+                break
+        return [found for _, _, found in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def _find_muhurtha_sampled(self, start_date: datetime, end_date: datetime,
+                               action_type: str, check_interval_hours: float) -> List[MuhurthaTimeRange]:
+        return list(self._iter_sampled(start_date, end_date, action_type, check_interval_hours))
+
+    def _iter_sampled(self, start_date: datetime, end_date: Optional[datetime],
+                      action_type: str, check_interval_hours: float) -> Iterator[MuhurthaTimeRange]:
+        rules = self._compiled_rules.get(action_type) or self.compile_rules(action_type)
+        calculate = self.panchanga.calculate_panchanga_ephem
+        step = timedelta(hours=check_interval_hours)
         range_start = None
         current_quality = None
-        current_explanation = None
+        start_pdata = None
+        k = -1
 
-        while current_time <= end_date:
-            pdata = self.panchanga.calculate_panchanga(current_time)
-            is_suitable = self._is_time_suitable(current_time, pdata, action_type)
-            quality = self._evaluate_quality(current_time, pdata, action_type)
+        for k, d, weekday in self._sample_axis(start_date, end_date, step):
+            pdata = calculate(d)
+            if stats.enabled:
+                rules_start = time.perf_counter()
+            is_suitable = rules.matches(weekday, pdata)
+            if stats.enabled:
+                stats.record("muhurtha.rules", time.perf_counter() - rules_start)
 
             if is_suitable:
                 if range_start is None:
-                    range_start = current_time
-                    current_quality = quality
-                    current_explanation = self._generate_explanation(current_time, pdata, action_type)
-            else:
-                if range_start is not None:
-                    suitable_ranges.append(
-                        MuhurthaTimeRange(
-                            start_time=range_start,
-                            end_time=current_time,
-                            quality=current_quality,
-                            explanation=current_explanation
-                        )
-                    )
-                    range_start = None
-                    current_quality = None
-                    current_explanation = None
-
-            current_time += timedelta(hours=check_interval_hours)
+                    range_start = start_date + k * step
+                    current_quality = self._evaluate_quality(range_start, pdata, action_type)
+                    start_pdata = pdata
+            elif range_start is not None:
+                yield self._lazy_range(range_start, start_date + k * step, current_quality,
+                                       start_pdata, action_type)
+                range_start = None
+                current_quality = None
+                start_pdata = None
 
         if range_start is not None:
+            yield self._lazy_range(range_start, start_date + (k + 1) * step, current_quality,
+                                   start_pdata, action_type)
+
+    def _lazy_range(self, start_time: datetime, end_time: datetime, quality: str,
+                    pdata: PanchangaData, action_type: str) -> MuhurthaTimeRange:
+        return MuhurthaTimeRange.lazy(start_time, end_time, quality,
+                                      partial(self._generate_explanation, start_time, pdata, action_type))
+
+    @staticmethod
+    def _sample_axis(start_date: datetime, end_date: Optional[datetime],
+                     step: timedelta) -> Iterator[Tuple[int, float, int]]:
+        """(k, ephem day number, weekday) of each sample ``start_date + k * step``
+
+        Day numbers and weekdays come from integer microsecond offsets, so
+        the scan builds no datetime per sample; callers convert ``k`` back
+        to a datetime only at range edges.
+        """
+        if step <= timedelta(0):
+            raise ValueError("check_interval_hours must be positive")
+        step_us = step // _MICROSECOND
+        first = to_ephem_date(start_date)
+        day_us = (start_date - start_date.replace(hour=0, minute=0, second=0, microsecond=0)) // _MICROSECOND
+        weekday = start_date.weekday()
+        count = None if end_date is None else (end_date - start_date) // step + 1
+        k = 0
+        while count is None or k < count:
+            offset = k * step_us
+            yield k, first + offset / _DAY_MICROSECONDS, (weekday + (day_us + offset) // _DAY_MICROSECONDS) % 7
+            k += 1
+
+    def find_muhurtha_parallel(self,
+                               start_date: datetime,
+                               end_date: datetime,
+                               action_type: str,
+                               check_interval_hours: float = 1.0,
+                               workers: Optional[int] = None,
+                               shards: Optional[int] = None) -> Iterator[MuhurthaTimeRange]:
+        """Sample-mode ``find_muhurtha`` split into shards across worker processes
+
+        The sample instants are cut into ``shards`` runs (default: four per
+        worker) that are searched on ``workers`` processes (default: all
+        cores; ``workers=1`` stays in this process). A range still open at the
+        end of a shard is joined with the range the next shard opens on its
+        first instant, so the ranges are exactly those of the serial search.
+        They are yielded in time order as soon as every earlier shard is done.
+        Workers rebuild this finder's calculator from its backend, cache
+        settings and almanac file, so the backend must be picklable; their
+        ranges arrive with the explanation already written and compare
+        equal to the serial ones.
+        """
+        if action_type not in self.action_rules:
+            raise ValueError(f"Unknown action type: {action_type}")
+        step = timedelta(hours=check_interval_hours)
+        if step <= timedelta(0):
+            raise ValueError("check_interval_hours must be positive")
+        if end_date < start_date:
+            return iter(())
+        workers = workers or os.cpu_count() or 1
+        samples = (end_date - start_date) // step + 1
+        shards = max(1, min(shards or workers * 4, samples))
+        # Shard i searches sample instants [bounds[i], bounds[i + 1])
+        bounds = [samples * i // shards for i in range(shards + 1)]
+        tasks = [(start_date + bounds[i] * step, start_date + (bounds[i + 1] - 1) * step,
+                  action_type, self.action_rules[action_type], check_interval_hours)
+                 for i in range(shards)]
+        return self._stitch_shards(tasks, workers)
+
+    def _calculator_config(self) -> dict:
+        """Picklable settings that rebuild this finder's calculator in a worker process"""
+        calculator = self.panchanga
+        cache, almanac = calculator.cache, calculator.almanac
+        return {
+            "backend": calculator.backend,
+            "cache_size": cache.maxsize if cache is not None else 0,
+            "cache_quantum": cache.quantum * 86400.0 if cache is not None else 1.0,
+            "almanac_path": almanac.path if almanac is not None else None,
+        }
+
+    def _search_shard(self, task: tuple) -> List[MuhurthaTimeRange]:
+        """Sampled search over the instants of one shard"""
+        first, last, action_type, rules, check_interval_hours = task
+        self.action_rules[action_type] = rules
+        self.compile_rules(action_type)
+        return self._find_muhurtha_sampled(first, last, action_type, check_interval_hours)
+
+    def _stitch_shards(self, tasks: list, workers: int) -> Iterator[MuhurthaTimeRange]:
+        executor = None
+        if workers > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                           initargs=(self._calculator_config(),))
+        try:
+            if executor is None:
+                results = (self._search_shard(task) for task in tasks)
+            else:
+                futures = [executor.submit(_sampled_shard, task) for task in tasks]
+                results = (future.result() for future in futures)
+            pending = None
+            for (shard_start, *_), ranges in zip(tasks, results):
+                if (pending is not None and ranges and pending.end_time == shard_start
+                        and ranges[0].start_time == shard_start):
+                    # Open across the boundary: one range of the serial search
+                    pending.end_time = ranges[0].end_time
+                    ranges = ranges[1:]
+                    if not ranges:
+                        continue
+                if pending is not None:
+                    yield pending
+                yield from ranges[:-1]
+                pending = ranges[-1] if ranges else None
+            if pending is not None:
+                yield pending
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def find_muhurtha_intervals(self,
+                                start_date: datetime,
+                                end_date: datetime,
+                                action_type: str) -> List[MuhurthaTimeRange]:
+        """Find suitable time ranges by interval algebra instead of sampling
+
+        The range is first restricted to the good weekdays, the nakshatra
+        timeline is built only inside those days and intersected with the
+        good nakshatras, and the avoided tithis are subtracted last. Range
+        edges are exact to the transition finder's precision.
+        """
+        if action_type not in self.action_rules:
+            raise ValueError(f"Unknown action type: {action_type}")
+        with stats.stage("muhurtha.search"):
+            return self._find_muhurtha_intervals(start_date, end_date, action_type)
+
+    def _find_muhurtha_intervals(self, start_date: datetime, end_date: datetime,
+                                 action_type: str) -> List[MuhurthaTimeRange]:
+        rules = self.compile_rules(action_type)
+
+        start_jd = to_ephem_date(start_date) + EPHEM_EPOCH_JD
+        end_jd = to_ephem_date(end_date) + EPHEM_EPOCH_JD
+        search = IntervalSet([(start_jd, end_jd)])
+
+        candidates = search & self._weekday_intervals(start_jd, end_jd, rules.weekdays)
+        candidates &= self._limb_intervals("nakshatra", rules.nakshatras, candidates)
+        if rules.avoid_tithis:
+            candidates -= self._limb_intervals("tithi", rules.avoid_tithis, candidates)
+        return self._interval_ranges(candidates, action_type)
+
+    def _interval_ranges(self, candidates: IntervalSet, action_type: str) -> List[MuhurthaTimeRange]:
+        suitable_ranges = []
+        for start_jd, end_jd in candidates:
             suitable_ranges.append(
-                MuhurthaTimeRange(
-                    start_time=range_start,
-                    end_time=current_time,
-                    quality=current_quality,
-                    explanation=current_explanation
+                MuhurthaTimeRange.lazy(
+                    start_time=jd_to_datetime(start_jd),
+                    end_time=jd_to_datetime(end_jd),
+                    quality="Good",
+                    explain=partial(self._explain_interval, start_jd, end_jd, action_type)
                 )
             )
-
         return suitable_ranges
 
+    def _explain_interval(self, start_jd: float, end_jd: float, action_type: str) -> str:
+        # Describe the range just inside its start edge
+        probe = min(start_jd + self.transitions.precision, (start_jd + end_jd) / 2)
+        pdata = self.panchanga.calculate_panchanga(jd_to_datetime(probe))
+        return self._generate_explanation(jd_to_datetime(start_jd), pdata, action_type)
+
+    def compile_rules(self, action_type: str) -> CompiledRules:
+        """Translate the named rules of ``action_type`` into index sets
+
+        A rule name matches every table entry with that name, so the index
+        sets accept exactly what the string membership tests did. Searches
+        call this on entry, so edits to ``action_rules`` take effect on the
+        next search.
+        """
+        rules = self.action_rules[action_type]
+        compiled = CompiledRules(
+            nakshatras=frozenset(self._rule_indices(rules["good_nakshatras"], AstronomicalConstants.NAKSHATRA)),
+            avoid_tithis=frozenset(self._rule_indices(rules["avoid_tithis"], AstronomicalConstants.TITHI)),
+            weekdays=frozenset(rules["good_weekdays"]),
+        )
+        self._compiled_rules[action_type] = compiled
+        return compiled
+
+    def compile_masks(self, action_types: Sequence[str]) -> RuleMasks:
+        """Compile the rules of ``action_types`` into one set of bitmask tables"""
+        nakshatra = [0] * len(AstronomicalConstants.NAKSHATRA)
+        tithi = [0] * len(AstronomicalConstants.TITHI)
+        weekday = [0] * 7
+        for bit, action_type in enumerate(action_types):
+            rules = self.compile_rules(action_type)
+            for table, indices in ((nakshatra, rules.nakshatras), (weekday, rules.weekdays),
+                                   (tithi, set(range(len(tithi))) - rules.avoid_tithis)):
+                for i in indices:
+                    table[i] |= 1 << bit
+        return RuleMasks(tuple(action_types), tuple(nakshatra), tuple(tithi), tuple(weekday))
+
+    def find_muhurtha_multi(self,
+                            start_date: datetime,
+                            end_date: datetime,
+                            action_types: Sequence[str],
+                            check_interval_hours: float = 1.0,
+                            mode: str = "sample") -> Dict[str, List[MuhurthaTimeRange]]:
+        """``find_muhurtha`` for several action types in one pass
+
+        The Panchanga of each instant (sample mode) or the nakshatra and
+        tithi timelines (interval mode) are computed once and shared by all
+        actions, and the rules are matched through ``RuleMasks``. Returns
+        the ranges of each action keyed by action type: the same ranges
+        ``find_muhurtha`` returns for it in sample mode, and the same to
+        within the transition finder's precision in interval mode.
+        """
+        action_types = list(dict.fromkeys(action_types))
+        for action_type in action_types:
+            if action_type not in self.action_rules:
+                raise ValueError(f"Unknown action type: {action_type}")
+        if mode not in ("sample", "interval"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        masks = self.compile_masks(action_types)
+        with stats.stage("muhurtha.search"):
+            if mode == "interval":
+                return self._find_muhurtha_multi_intervals(start_date, end_date, masks)
+            return self._find_muhurtha_multi_sampled(start_date, end_date, masks, check_interval_hours)
+
+    def _find_muhurtha_multi_sampled(self, start_date: datetime, end_date: datetime,
+                                     masks: RuleMasks, check_interval_hours: float) -> Dict[str, List[MuhurthaTimeRange]]:
+        actions = masks.actions
+        results: Dict[str, List[MuhurthaTimeRange]] = {action: [] for action in actions}
+        # action bit -> (range start, Panchanga there) of the range being built
+        open_ranges: Dict[int, Tuple[datetime, PanchangaData]] = {}
+        calculate = self.panchanga.calculate_panchanga_ephem
+        step = timedelta(hours=check_interval_hours)
+        previous = 0
+        k = -1
+
+        for k, d, weekday in self._sample_axis(start_date, end_date, step):
+            pdata = calculate(d)
+            suitable = masks.suitable(weekday, pdata)
+            changed = suitable ^ previous
+            while changed:
+                bit = (changed & -changed).bit_length() - 1
+                changed &= changed - 1
+                if suitable >> bit & 1:
+                    open_ranges[bit] = (start_date + k * step, pdata)
+                else:
+                    range_start, start_pdata = open_ranges.pop(bit)
+                    results[actions[bit]].append(self._lazy_range(
+                        range_start, start_date + k * step, "Good", start_pdata, actions[bit]))
+            previous = suitable
+
+        end_time = start_date + (k + 1) * step
+        for bit, (range_start, start_pdata) in sorted(open_ranges.items()):
+            results[actions[bit]].append(self._lazy_range(
+                range_start, end_time, "Good", start_pdata, actions[bit]))
+        return results
+
+    def _find_muhurtha_multi_intervals(self, start_date: datetime, end_date: datetime,
+                                       masks: RuleMasks) -> Dict[str, List[MuhurthaTimeRange]]:
+        start_jd = to_ephem_date(start_date) + EPHEM_EPOCH_JD
+        end_jd = to_ephem_date(end_date) + EPHEM_EPOCH_JD
+        search = IntervalSet([(start_jd, end_jd)])
+        any_weekday = {w for w in range(7) if masks.weekday[w]}
+        days = search & self._weekday_intervals(start_jd, end_jd, any_weekday)
+        # Both timelines are built once over the days any action can use
+        nakshatras = [period for s, e in days for period in self.transitions.limb_periods("nakshatra", s, e)]
+        tithis = [period for s, e in days for period in self.transitions.limb_periods("tithi", s, e)]
+
+        results = {}
+        for bit, action_type in enumerate(masks.actions):
+            weekdays = {w for w in range(7) if masks.weekday[w] >> bit & 1}
+            candidates = days & self._weekday_intervals(start_jd, end_jd, weekdays)
+            candidates &= IntervalSet((p.start_jd, p.end_jd) for p in nakshatras
+                                      if masks.nakshatra[p.index] >> bit & 1)
+            candidates -= IntervalSet((p.start_jd, p.end_jd) for p in tithis
+                                      if not masks.tithi[p.index] >> bit & 1)
+            results[action_type] = self._interval_ranges(candidates, action_type)
+        return results
+
+    @staticmethod
+    def _rule_indices(names: Iterable[str], table: List[str]) -> Set[int]:
+        """Indices of every entry of ``table`` whose name appears in ``names``"""
+        names = set(names)
+        return {i for i, name in enumerate(table) if name in names}
+
+    @staticmethod
+    def _weekday_intervals(start_jd: float, end_jd: float, weekdays: Set[int]) -> IntervalSet:
+        """Whole days between two Julian dates whose weekday is in ``weekdays``"""
+        day = math.floor(start_jd - 0.5) + 0.5  # midnight at or before start
+        spans = []
+        while day < end_jd:
+            if int(day + 0.5) % 7 in weekdays:
+                spans.append((day, day + 1))
+            day += 1
+        return IntervalSet(spans)
+
+    def _limb_intervals(self, limb: str, indices: Set[int], within: IntervalSet) -> IntervalSet:
+        """Periods of ``limb`` with an index in ``indices`` overlapping ``within``"""
+        spans = []
+        for start_jd, end_jd in within:
+            for period in self.transitions.limb_periods(limb, start_jd, end_jd):
+                if period.index in indices:
+                    spans.append((period.start_jd, period.end_jd))
+        return IntervalSet(spans)
+
     def format_duration(self, duration_hours: float) -> str:
         """Convert duration from hours to hours and minutes format"""
         total_minutes = int(duration_hours * 60)
@@ -134,14 +592,8 @@ class MuhurthaFinder:
                           dt: datetime,
                           pdata: PanchangaData,
                           action_type: str) -> bool:
-        rules = self.action_rules[action_type]
-        
-        if (pdata.nakshatra in rules["good_nakshatras"] and
-            pdata.tithi not in rules["avoid_tithis"] and
-            dt.weekday() in rules["good_weekdays"]):
-            return True
-            
-        return False
+        rules = self._compiled_rules.get(action_type) or self.compile_rules(action_type)
+        return rules.matches(dt.weekday(), pdata)
 
     def _evaluate_quality(self,
                           dt: datetime,
@@ -150,7 +602,34 @@ class MuhurthaFinder:
         # A more sophisticated evaluation can be implemented here.
         return "Good" if self._is_time_suitable(dt, pdata, action_type) else "Neutral"
 
-if __name__ == "__main__":
+
+_shard_finder: Optional[MuhurthaFinder] = None
+
+
+def _init_shard_worker(config: dict) -> None:
+    """Worker initializer: build the finder from the parent's ``_calculator_config``"""
+    global _shard_finder
+    almanac = None
+    if config["almanac_path"] is not None:
+        from almanac import Almanac
+        almanac = Almanac(config["almanac_path"])
+    calculator = PanchangaCalculator(config["backend"], config["cache_size"],
+                                     config["cache_quantum"], almanac)
+    _shard_finder = MuhurthaFinder(calculator)
+
+
+def _sampled_shard(task: tuple) -> List[MuhurthaTimeRange]:
+    """Worker entry point: sampled search over the instants of one shard"""
+    return _shard_finder._search_shard(task)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find auspicious time ranges for the coming week')
+    parser.add_argument('--profile', action='store_true', help='Print stage timings and call counts to stderr')
+    args = parser.parse_args(argv)
+    if args.profile:
+        stats.enable()
+
     finder = MuhurthaFinder()
     start = datetime.now()
     end = start + timedelta(days=7) # change days for your range
@@ -174,4 +653,10 @@ if __name__ == "__main__":
         print("\nAstrological Factors:")
         print(result.explanation)
         print("-" * 50)
-        print()
\ No newline at end of file
+        print()
+
+    if args.profile:
+        stats.print_summary()
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,126 @@
 import ephem
 import math
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from instrumentation import stats
+
+# numpy is only needed by the batch API and takes longer to import than
+# everything else combined, so it is loaded by the first batch call
+np = None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("numpy is required for batch calculations. Install it using 'pip install numpy'.") from None
+        np = numpy
+    return np
 
 
 # Constants
 D2R = math.pi / 180.0
 R2D = 180.0 / math.pi
+EPHEM_EPOCH_JD = 2415020.0  # Julian date of ephem's day zero (1899/12/31 12:00 UTC)
 
-@dataclass
 class PanchangaData:
-    tithi: str = ""
-    paksha: str = ""
-    nakshatra: str = ""
-    yoga: str = ""
-    karana: str = ""
-    rashi: str = ""
+    """Panchanga limbs of one instant, stored as small integer indices
+
+    ``tithi_index``, ``nakshatra_index``, ``yoga_index``, ``karana_index``
+    and ``rashi_index`` index the matching ``AstronomicalConstants`` list and
+    ``shukla`` holds the paksha. The names (``tithi``, ``paksha``, ...) are
+    looked up when read, so an instance is six slots and no strings.
+    """
+    __slots__ = ("tithi_index", "shukla", "nakshatra_index", "yoga_index", "karana_index", "rashi_index")
+
+    def __init__(self, tithi_index: int = 0, shukla: bool = True, nakshatra_index: int = 0,
+                 yoga_index: int = 0, karana_index: int = 0, rashi_index: int = 0):
+        self.tithi_index = tithi_index
+        self.shukla = shukla
+        self.nakshatra_index = nakshatra_index
+        self.yoga_index = yoga_index
+        self.karana_index = karana_index
+        self.rashi_index = rashi_index
+
+    @property
+    def tithi(self) -> str:
+        return AstronomicalConstants.TITHI[self.tithi_index]
+
+    @property
+    def paksha(self) -> str:
+        return "Shukla" if self.shukla else "Krishna"
+
+    @property
+    def nakshatra(self) -> str:
+        return AstronomicalConstants.NAKSHATRA[self.nakshatra_index]
+
+    @property
+    def yoga(self) -> str:
+        return AstronomicalConstants.YOGA[self.yoga_index]
+
+    @property
+    def karana(self) -> str:
+        return AstronomicalConstants.KARAN[self.karana_index]
+
+    @property
+    def rashi(self) -> str:
+        return AstronomicalConstants.RASHI[self.rashi_index]
+
+    def indices(self) -> Tuple[int, bool, int, int, int, int]:
+        return (self.tithi_index, self.shukla, self.nakshatra_index,
+                self.yoga_index, self.karana_index, self.rashi_index)
+
+    def copy(self) -> "PanchangaData":
+        return PanchangaData(*self.indices())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PanchangaData):
+            return NotImplemented
+        return self.indices() == other.indices()
+
+    def __hash__(self) -> int:
+        return hash(self.indices())
+
+    def __repr__(self) -> str:
+        return (f"PanchangaData(tithi={self.tithi!r}, paksha={self.paksha!r}, "
+                f"nakshatra={self.nakshatra!r}, yoga={self.yoga!r}, "
+                f"karana={self.karana!r}, rashi={self.rashi!r})")
+
+@dataclass
+class PanchangaBatch:
+    """Columnar Panchanga results for an array of instants
+
+    Every attribute is a NumPy array with one entry per input timestamp. The
+    limb attributes hold int8 indices into the matching
+    ``AstronomicalConstants`` list and ``shukla`` is boolean, so a limb costs
+    one byte per instant; use ``batch[i]`` to get a ``PanchangaData`` for
+    one instant.
+    """
+    jd: "np.ndarray"
+    ayanamsa: "np.ndarray"
+    sun_long: "np.ndarray"
+    moon_long: "np.ndarray"
+    moon_phase: "np.ndarray"
+    tithi: "np.ndarray"
+    shukla: "np.ndarray"
+    nakshatra: "np.ndarray"
+    yoga: "np.ndarray"
+    karana: "np.ndarray"
+    rashi: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.jd)
+
+    def __getitem__(self, i: int) -> PanchangaData:
+        return PanchangaData(int(self.tithi[i]), bool(self.shukla[i]), int(self.nakshatra[i]),
+                             int(self.yoga[i]), int(self.karana[i]), int(self.rashi[i]))
 
 class AstronomicalConstants:
     MONTHS = ["January", "February", "March", "April", "May", "June",
@@ -46,7 +151,128 @@ class AstronomicalConstants:
                  "Poorva Ashada", "Uttara Ashada", "Sravana", "Dhanishta", "Shatabisha",
                  "Poorva Bhadra", "Uttara Bhadra", "Revathi"]
 
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+class PanchangaCache:
+    """Thread-safe LRU cache of Panchanga results keyed on quantized UTC time
+
+    Instants falling into the same ``quantum_seconds`` bucket share one
+    entry. An entry holds the limbs in force over the whole bucket, or
+    ``STRADDLED`` when a limb changes inside it; see
+    ``PanchangaCalculator.calculate_panchanga_ephem``.
+    """
+
+    # Entry of a bucket in which some limb changes
+    STRADDLED = object()
+
+    def __init__(self, maxsize: int = 4096, quantum_seconds: float = 1.0):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        if quantum_seconds <= 0:
+            raise ValueError("Cache quantum must be positive")
+        self.maxsize = maxsize
+        self.quantum = quantum_seconds / 86400.0
+        self._entries: "OrderedDict[int, PanchangaData]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def key(self, ephem_date: float) -> int:
+        return round(ephem_date / self.quantum)
+
+    def bounds(self, key: int) -> Tuple[float, float]:
+        """First and last ephem date of a key's bucket"""
+        return (key - 0.5) * self.quantum, (key + 0.5) * self.quantum
+
+    def get(self, key: int) -> Optional[PanchangaData]:
+        with self._lock:
+            pdata = self._entries.get(key)
+            if pdata is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return pdata
+
+    def put(self, key: int, pdata: PanchangaData) -> None:
+        with self._lock:
+            self._entries[key] = pdata
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._entries), self.maxsize)
+
+class EphemObjects(threading.local):
+    """Observer, Sun and Moon owned by the current thread
+
+    ``ephem`` bodies and observers are mutable, so sharing them between
+    threads races; allocating them per call is what made every calculation
+    pay for three new objects. Each thread gets its own set on first use
+    and reuses it afterwards.
+    """
+
+    def __init__(self):
+        self.observer = ephem.Observer()
+        self.observer.lat = '0'
+        self.observer.lon = '0'
+        self.observer.elevation = 0
+        self.observer.pressure = 0
+        self.observer.horizon = '-0:34'
+        self.sun = ephem.Sun()
+        self.moon = ephem.Moon()
+
+ephem_objects = EphemObjects()
+
+def to_ephem_date(value) -> float:
+    """Convert a datetime, ephem.Date or Julian date to an ephem day number
+
+    Plain numbers are taken as Julian dates; anything else ``ephem.Date``
+    understands (datetimes, ephem dates, "YYYY/MM/DD" strings) is passed
+    through it.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, ephem.Date):
+        return float(value) - EPHEM_EPOCH_JD
+    return float(ephem.Date(value))
+
 class PanchangaCalculator:
+    def __init__(self, backend=None, cache_size: int = 0, cache_quantum: float = 1.0, almanac=None):
+        """
+        Args:
+            backend: optional position source used instead of live ephem, such
+                as ``ephemeris.ChebyshevBackend``. It must provide
+                ``sidereal_positions(d)`` for an ephem day number and may
+                provide ``sidereal_positions_array(ds)`` for batches.
+            cache_size: number of ``calculate_panchanga`` results to keep in
+                an LRU cache; 0 disables caching
+            cache_quantum: cache key resolution in seconds
+            almanac: optional ``almanac.Almanac``; ``calculate_panchanga``
+                reads instants it covers from its stored transitions
+        """
+        self.backend = backend
+        self.almanac = almanac
+        self.cache = PanchangaCache(cache_size, cache_quantum) if cache_size else None
+
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Hit/miss/eviction counters of the result cache, None when disabled"""
+        return self.cache.stats() if self.cache is not None else None
+
     @staticmethod
     def normalize_degrees(angle: float) -> float:
         """Normalize angle to range [0, 360)"""
@@ -79,78 +305,268 @@ class PanchangaCalculator:
     @staticmethod
     def setup_observer(date: datetime) -> ephem.Observer:
         """Setup observer with default parameters"""
-        observer = ephem.Observer()
-        observer.date = ephem.Date(date)
-        observer.lat = '0'
-        observer.lon = '0'
-        observer.elevation = 0
-        observer.pressure = 0
-        observer.horizon = '-0:34'
+        with stats.stage("setup_observer"):
+            observer = ephem.Observer()
+            observer.date = ephem.Date(date)
+            observer.lat = '0'
+            observer.lon = '0'
+            observer.elevation = 0
+            observer.pressure = 0
+            observer.horizon = '-0:34'
         return observer
 
-    def calculate_panchanga(self, date: datetime) -> PanchangaData:
-        """Calculate all Panchanga elements for given date and time"""
-        pdata = PanchangaData()
-        
-        # Initialize celestial objects and observer
-        observer = self.setup_observer(date)
-        sun = ephem.Sun()
-        moon = ephem.Moon()
+    def sidereal_positions(self, date) -> Tuple[float, float, float]:
+        """Calculate sidereal Sun and Moon longitudes and the Moon phase
+
+        Args:
+            date: UTC datetime or ephem.Date
+
+        Returns:
+            Tuple[float, float, float]: adjusted Sun longitude, adjusted Moon
+            longitude (both in degrees, [0, 360)) and Moon phase
+        """
+        if self.backend is not None:
+            if stats.enabled:
+                with stats.stage("backend.evaluate"):
+                    return self.backend.sidereal_positions(to_ephem_date(date))
+            return self.backend.sidereal_positions(to_ephem_date(date))
+
+        # Reuse this thread's celestial objects and observer
+        objects = ephem_objects
+        observer = objects.observer
+        observer.date = ephem.Date(date)
+        sun = objects.sun
+        moon = objects.moon
         
-        # Compute positions
+        # Compute positions; ephem evaluates them when the attributes are read
+        if stats.enabled:
+            start = time.perf_counter()
         sun.compute(observer)
         moon.compute(observer)
+        sun_ra = sun.ra
+        moon_ra = moon.ra
+        moon_phase = moon.phase
+        if stats.enabled:
+            stats.record("ephem.compute", time.perf_counter() - start)
         
         # Calculate base values
         jd = ephem.julian_date(observer.date)
         ayanamsa = self.calculate_ayanamsa(jd)
-        sun_long = math.degrees(sun.ra) * 15
-        moon_long = math.degrees(moon.ra) * 15
-        moon_phase = moon.phase
+        sun_long = math.degrees(sun_ra) * 15
+        moon_long = math.degrees(moon_ra) * 15
         
         # Calculate adjusted longitudes
         moon_long_adjusted = self.normalize_degrees(moon_long + ayanamsa)
         sun_long_adjusted = self.normalize_degrees(sun_long + ayanamsa)
+        return sun_long_adjusted, moon_long_adjusted, moon_phase
+
+    def calculate_panchanga(self, date: datetime) -> PanchangaData:
+        """Calculate all Panchanga elements for given date and time
+
+        ``date`` is anything ``ephem.Date`` accepts, so a plain number is an
+        ephem day number as before; use ``calculate_panchanga_jd`` for a
+        Julian date.
+        """
+        return self.calculate_panchanga_ephem(float(ephem.Date(date)))
+
+    def calculate_panchanga_jd(self, jd: float) -> PanchangaData:
+        """``calculate_panchanga`` for a Julian date, as ``calculate_panchanga_batch`` reads floats"""
+        return self.calculate_panchanga_ephem(jd - EPHEM_EPOCH_JD)
+
+    def calculate_panchanga_ephem(self, d: float) -> PanchangaData:
+        """``calculate_panchanga`` for an ephem day number, for loops that step in days
+
+        Day numbers keep sub-microsecond resolution, where a Julian date near
+        2.4 million only resolves about 40 microseconds.
+
+        With a cache, a miss evaluates both ends of the instant's bucket. When
+        they agree no limb changes inside it (limbs only move forward and none
+        comes back to the same index within a day, far longer than any
+        sensible quantum), so the bucket's entry is exact for every instant
+        in it. When they differ the bucket is marked and its instants are
+        computed one by one, so cached results always equal uncached ones;
+        a miss costs two evaluations instead of one.
+        """
+        if self.almanac is not None:
+            pdata = self.almanac.limbs_at(d + EPHEM_EPOCH_JD)
+            if pdata is not None:
+                return pdata
+        if self.cache is None:
+            return self._calculate_panchanga(ephem.Date(d))
+
+        key = self.cache.key(d)
+        pdata = self.cache.get(key)
+        if stats.enabled:
+            stats.count("cache.misses" if pdata is None else "cache.hits")
+        if pdata is None:
+            first, last = self.cache.bounds(key)
+            pdata = self._calculate_panchanga(ephem.Date(first))
+            if pdata != self._calculate_panchanga(ephem.Date(last)):
+                pdata = PanchangaCache.STRADDLED
+            self.cache.put(key, pdata)
+        if pdata is PanchangaCache.STRADDLED:
+            return self._calculate_panchanga(ephem.Date(d))
+        # Hand out a copy so callers cannot modify the cached entry
+        return pdata.copy()
+
+    def _calculate_panchanga(self, date) -> PanchangaData:
+        sun_long_adjusted, moon_long_adjusted, moon_phase = self.sidereal_positions(date)
 
         # Calculate all panchanga elements
-        self._calculate_tithi(moon_phase, pdata)
-        self._calculate_nakshatra(moon_long_adjusted, pdata)
-        self._calculate_yoga(moon_long_adjusted, sun_long_adjusted, pdata)
-        self._calculate_karana(moon_phase, pdata)
-        self._calculate_rashi(moon_long_adjusted, pdata)
+        if stats.enabled:
+            start = time.perf_counter()
+        pdata = PanchangaData(
+            self.tithi_index(moon_phase),
+            moon_phase < 180,
+            self.nakshatra_index(moon_long_adjusted),
+            self.yoga_index(moon_long_adjusted, sun_long_adjusted),
+            self.karana_index(moon_phase),
+            self.rashi_index(moon_long_adjusted),
+        )
+        if stats.enabled:
+            stats.record("panchanga.limbs", time.perf_counter() - start)
         
         return pdata
 
-    def _calculate_tithi(self, moon_phase: float, pdata: PanchangaData) -> None:
-        """Calculate Tithi from moon phase"""
-        tithi_num = int(moon_phase / 12)
-        pdata.tithi = AstronomicalConstants.TITHI[tithi_num]
-        pdata.paksha = "Shukla" if moon_phase < 180 else "Krishna"
-
-    def _calculate_nakshatra(self, moon_long_adjusted: float, pdata: PanchangaData) -> None:
-        """Calculate Nakshatra from adjusted moon longitude"""
-        nak_index = int(moon_long_adjusted * 27 / 360)
-        pdata.nakshatra = AstronomicalConstants.NAKSHATRA[nak_index]
-
-    def _calculate_yoga(self, moon_long_adjusted: float, sun_long_adjusted: float, 
-                       pdata: PanchangaData) -> None:
-        """Calculate Yoga from adjusted sun and moon longitudes"""
-        yoga_angle = self.normalize_degrees(moon_long_adjusted + sun_long_adjusted)
-        yoga_index = int(yoga_angle * 27 / 360)
-        pdata.yoga = AstronomicalConstants.YOGA[yoga_index]
-
-    def _calculate_karana(self, moon_phase: float, pdata: PanchangaData) -> None:
-        """Calculate Karana from moon phase"""
+    def calculate_panchanga_batch(self, dates: Iterable) -> PanchangaBatch:
+        """Calculate Panchanga elements for many instants at once
+
+        ``dates`` may be a sequence of UTC datetimes or ``ephem.Date`` values,
+        or a sequence/NumPy array of Julian dates (floats). A ``datetime64``
+        array is also accepted. Live ephem is evaluated with one reused
+        observer and one Sun/Moon pair, a backend through its vectorized
+        ``sidereal_positions_array`` when it has one; everything downstream
+        of the positions is computed on whole arrays and matches
+        ``calculate_panchanga`` element for element.
+
+        Args:
+            dates: UTC timestamps or Julian dates
+
+        Returns:
+            PanchangaBatch: columnar results in input order
+        """
+        _import_numpy()
+        with stats.stage("panchanga.batch"):
+            return self._calculate_panchanga_batch(dates)
+
+    def calculate_panchanga_range(self, start, end, step_minutes: float = 60.0) -> PanchangaBatch:
+        """Panchanga every ``step_minutes`` from ``start`` through ``end``
+
+        Range scans stay columnar: the result is one ``PanchangaBatch``
+        holding a byte per limb and instant instead of one object per
+        sample. ``start`` and ``end`` are UTC datetimes, ``ephem.Date``
+        values or Julian dates.
+        """
+        _import_numpy()
+        if step_minutes <= 0:
+            raise ValueError("step_minutes must be positive")
+        start_jd = to_ephem_date(start) + EPHEM_EPOCH_JD
+        end_jd = to_ephem_date(end) + EPHEM_EPOCH_JD
+        if end_jd < start_jd:
+            raise ValueError("end must not be before start")
+        step = step_minutes / 1440.0
+        count = math.floor((end_jd - start_jd) / step + 1e-9) + 1
+        return self.calculate_panchanga_batch(start_jd + step * np.arange(count))
+
+    def _calculate_panchanga_batch(self, dates: Iterable) -> PanchangaBatch:
+        if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+            offsets = (dates - np.datetime64('2000-01-01T12:00:00')) / np.timedelta64(1, 'D')
+            ephem_dates = offsets.astype(float) + (2451545.0 - EPHEM_EPOCH_JD)
+        elif isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.number):
+            ephem_dates = dates.astype(float) - EPHEM_EPOCH_JD
+        else:
+            ephem_dates = np.fromiter((to_ephem_date(d) for d in dates), dtype=float)
+
+        jd = ephem_dates + EPHEM_EPOCH_JD
+        t = (jd - 2451545.0) / 36525
+        ayanamsa = 23.452294 - 0.0130125 * t - 0.00000164 * t * t + 0.000000503 * t * t * t
+
+        if self.backend is not None and hasattr(self.backend, "sidereal_positions_array"):
+            with stats.stage("backend.evaluate_array"):
+                sun_long_adjusted, moon_long_adjusted, moon_phase = \
+                    self.backend.sidereal_positions_array(ephem_dates)
+        elif self.backend is not None:
+            start = time.perf_counter()
+            positions = np.array([self.backend.sidereal_positions(d) for d in ephem_dates]).reshape(-1, 3)
+            if stats.enabled:
+                stats.record("backend.evaluate", time.perf_counter() - start, calls=len(ephem_dates))
+            sun_long_adjusted, moon_long_adjusted, moon_phase = positions.T
+        else:
+            count = len(ephem_dates)
+            sun_long = np.empty(count)
+            moon_long = np.empty(count)
+            moon_phase = np.empty(count)
+
+            objects = ephem_objects
+            observer, sun, moon = objects.observer, objects.sun, objects.moon
+            degrees = math.degrees
+            start = time.perf_counter()
+            for i, d in enumerate(ephem_dates):
+                observer.date = d
+                sun.compute(observer)
+                moon.compute(observer)
+                sun_long[i] = degrees(sun.ra) * 15
+                moon_long[i] = degrees(moon.ra) * 15
+                moon_phase[i] = moon.phase
+            if stats.enabled:
+                stats.record("ephem.compute", time.perf_counter() - start, calls=count)
+
+            moon_long_adjusted = self._normalize_array(moon_long + ayanamsa)
+            sun_long_adjusted = self._normalize_array(sun_long + ayanamsa)
+        yoga_angle = self._normalize_array(moon_long_adjusted + sun_long_adjusted)
+
+        karana = ((moon_phase % 12) / 6).astype(int)
+        karana = np.where(karana == 0, 10, np.where(karana >= 57, karana - 50, karana))
+        index = np.int8
+
+        return PanchangaBatch(
+            jd=jd,
+            ayanamsa=ayanamsa,
+            sun_long=sun_long_adjusted,
+            moon_long=moon_long_adjusted,
+            moon_phase=moon_phase,
+            tithi=(moon_phase / 12).astype(index),
+            shukla=moon_phase < 180,
+            nakshatra=(moon_long_adjusted * 27 / 360).astype(index),
+            yoga=(yoga_angle * 27 / 360).astype(index),
+            karana=(karana % len(AstronomicalConstants.KARAN)).astype(index),
+            rashi=(self._normalize_array(moon_long_adjusted) / 30).astype(index),
+        )
+
+    @staticmethod
+    def _normalize_array(angles: "np.ndarray") -> "np.ndarray":
+        """Normalize an array of angles to range [0, 360)"""
+        return angles - np.floor(angles / 360.0) * 360.0
+
+    @staticmethod
+    def tithi_index(moon_phase: float) -> int:
+        """Index into AstronomicalConstants.TITHI for a moon phase"""
+        return int(moon_phase / 12)
+
+    @staticmethod
+    def nakshatra_index(moon_long_adjusted: float) -> int:
+        """Index into AstronomicalConstants.NAKSHATRA for an adjusted moon longitude"""
+        return int(moon_long_adjusted * 27 / 360)
+
+    @classmethod
+    def yoga_index(cls, moon_long_adjusted: float, sun_long_adjusted: float) -> int:
+        """Index into AstronomicalConstants.YOGA for adjusted sun and moon longitudes"""
+        yoga_angle = cls.normalize_degrees(moon_long_adjusted + sun_long_adjusted)
+        return int(yoga_angle * 27 / 360)
+
+    @staticmethod
+    def karana_index(moon_phase: float) -> int:
+        """Index into AstronomicalConstants.KARAN for a moon phase"""
         lunar_day_progress = moon_phase % 12
         karana_num = int(lunar_day_progress / 6)
         if karana_num == 0:
             karana_num = 10
         elif karana_num >= 57:
             karana_num -= 50
-        pdata.karana = AstronomicalConstants.KARAN[karana_num % len(AstronomicalConstants.KARAN)]
+        return karana_num % len(AstronomicalConstants.KARAN)
 
-    def _calculate_rashi(self, moon_long_adjusted: float, pdata: PanchangaData) -> None:
-        """Calculate Rashi from adjusted moon longitude"""
-        rashi_long = self.normalize_degrees(moon_long_adjusted)
-        rashi_index = int(rashi_long / 30)
-        pdata.rashi = AstronomicalConstants.RASHI[rashi_index]
+    @classmethod
+    def rashi_index(cls, moon_long_adjusted: float) -> int:
+        """Index into AstronomicalConstants.RASHI for an adjusted moon longitude"""
+        rashi_long = cls.normalize_degrees(moon_long_adjusted)
+        return int(rashi_long / 30)
@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+from daily_panchanga import parse_local_datetime
+from panchanga import PanchangaCalculator
+
+
+INPUT_FIELDS = ("date", "time", "zone")
+RESULT_FIELDS = ("tithi", "paksha", "nakshatra", "yoga", "karana", "rashi")
+
+# A record is a CSV row (dict) or a raw JSON Lines line (str); JSON is
+# parsed in the worker so malformed lines become inline errors too
+Record = Union[Dict[str, str], str]
+
+_calculator: Optional[PanchangaCalculator] = None
+
+
+def compute_record(record: Record, calendar: str = 'gregorian') -> Dict[str, str]:
+    """Input fields of ``record`` followed by its Panchanga, or by an ``error`` message"""
+    global _calculator
+    if _calculator is None:
+        _calculator = PanchangaCalculator()
+
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError as e:
+            return {"error": f"Invalid JSON: {e}"}
+        if not isinstance(record, dict):
+            return {"error": "Each line must be a JSON object"}
+
+    result = dict(record)
+    result.pop("error", None)
+    try:
+        missing = [name for name in INPUT_FIELDS if not record.get(name)]
+        if missing:
+            raise ValueError(f"Missing field(s): {', '.join(missing)}")
+        utc_time = parse_local_datetime(str(record["date"]), str(record["time"]), str(record["zone"]),
+                                        record.get("calendar") or calendar)
+        pdata = _calculator.calculate_panchanga(utc_time)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    for name in RESULT_FIELDS:
+        result[name] = getattr(pdata, name)
+    return result
+
+
+def compute_chunk(records: List[Record], calendar: str = 'gregorian') -> List[Dict[str, str]]:
+    return [compute_record(record, calendar) for record in records]
+
+
+def compute_stream(records: Iterable[Record], calendar: str = 'gregorian',
+                   workers: Optional[int] = None, chunk_size: int = 512) -> Iterator[List[Dict[str, str]]]:
+    """Compute an unbounded stream of records, yielding result chunks in input order
+
+    Records are read ``chunk_size`` at a time and spread over ``workers``
+    processes (default: all cores). At most two chunks per worker are in
+    flight, so memory use does not grow with the input. ``workers=1``
+    computes in this process.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    iterator = iter(records)
+    chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunks:
+            yield compute_chunk(chunk, calendar)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(compute_chunk, chunk, calendar))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def detect_format(path: str) -> str:
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def run_bulk(source: TextIO, output: TextIO, fmt: str = "csv", calendar: str = 'gregorian',
+             workers: Optional[int] = None, chunk_size: int = 512) -> int:
+    """Stream records from ``source`` to ``output`` in the same format
+
+    CSV input needs a header with ``date``, ``time`` and ``zone`` columns (an
+    optional ``calendar`` column overrides ``calendar`` per row). JSON Lines
+    input holds one object with the same keys per line. Every input record
+    produces one output record in the same position: its input fields, the
+    Panchanga limbs and, when it could not be computed, an ``error``.
+
+    Returns:
+        int: number of records that failed
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(source)
+        fieldnames = list(reader.fieldnames or [])
+        missing = [name for name in INPUT_FIELDS if name not in fieldnames]
+        if missing:
+            raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+        fieldnames += [name for name in RESULT_FIELDS + ("error",) if name not in fieldnames]
+        writer = csv.DictWriter(output, fieldnames=fieldnames, restval="", extrasaction="ignore")
+        writer.writeheader()
+        records = reader
+    elif fmt == "jsonl":
+        records = (line for line in source if line.strip())
+    else:
+        raise ValueError(f"Unknown bulk format: {fmt}")
+
+    failed = 0
+    for chunk in compute_stream(records, calendar, workers, chunk_size):
+        for result in chunk:
+            if result.get("error"):
+                failed += 1
+            if fmt == "csv":
+                writer.writerow(result)
+            else:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+    return failed
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+import os
+import socket
+import stat
+import sys
+from typing import List, Optional, Tuple
+
+PROGRAMS = ("daily_panchanga", "monthly_panchanga", "planet_hours", "muhurtha_finder")
+
+
+def socket_path() -> str:
+    """Socket the daemon listens on
+
+    ``$PANCHANGA_SOCKET`` if set, otherwise ``daemon.sock`` in the private
+    directory ``panchanga-<uid>`` under ``$XDG_RUNTIME_DIR`` (or /tmp). An
+    empty ``PANCHANGA_SOCKET`` disables forwarding, so the tools always run
+    locally.
+    """
+    path = os.environ.get("PANCHANGA_SOCKET")
+    if path is not None:
+        return path
+    return os.path.join(private_dir(), "daemon.sock")
+
+
+def private_dir() -> str:
+    """Per-user directory that holds the default socket"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(runtime_dir, f"panchanga-{os.getuid()}")
+
+
+def make_private_dir(path: str) -> None:
+    """Create ``path`` with mode 0700, refusing one another user could write to"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"{path} is not a private directory owned by this user")
+
+
+def trusted_socket(path: str) -> bool:
+    """True when ``path`` is a socket that only this user could have put there
+
+    The socket must be ours and not writable by group or others, and its
+    directory must not let anyone else replace it: owned by us or root and
+    not group/world writable, or sticky like /tmp.
+    """
+    try:
+        st = os.lstat(path)
+        parent = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    uid = os.getuid()
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != uid or st.st_mode & 0o022:
+        return False
+    if parent.st_mode & stat.S_ISVTX:
+        return True
+    return parent.st_uid in (uid, 0) and not parent.st_mode & 0o022
+
+
+def forward(program: str, argv: List[str]) -> Optional[int]:
+    """Run ``program`` with ``argv`` in the daemon and replay its output
+
+    The tools call this before importing anything heavy, so with a daemon
+    running an invocation costs interpreter startup plus one round trip.
+    Returns the exit status, or None when no trusted daemon is listening
+    and the caller should run the command itself.
+    """
+    path = socket_path()
+    if not path or not trusted_socket(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(path)
+            conn.sendall(encode_request(program, os.getcwd(), argv))
+            conn.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        # Stale socket file or a daemon that went away mid-request
+        return None
+    if not chunks:
+        return None
+    status, stdout, stderr = decode_response(b"".join(chunks))
+    sys.stdout.write(stdout)
+    sys.stdout.flush()
+    sys.stderr.write(stderr)
+    return status
+
+
+# Wire format, kept to plain bytes so the client side imports nothing heavy:
+#   request   program, cwd and each argument, NUL separated
+#   response  b"<status> <stdout bytes> <stderr bytes>\n", then both streams
+def encode_request(program: str, cwd: str, argv: List[str]) -> bytes:
+    return "\0".join([program, cwd, *argv]).encode("utf-8", "surrogateescape")
+
+
+def decode_request(data: bytes) -> Tuple[str, str, List[str]]:
+    program, cwd, *argv = data.decode("utf-8", "surrogateescape").split("\0")
+    return program, cwd, argv
+
+
+def encode_response(status: int, stdout: str, stderr: str) -> bytes:
+    out = stdout.encode("utf-8")
+    err = stderr.encode("utf-8")
+    return f"{status} {len(out)} {len(err)}\n".encode("ascii") + out + err
+
+
+def decode_response(data: bytes) -> Tuple[int, str, str]:
+    header, _, body = data.partition(b"\n")
+    status, out_len, err_len = map(int, header.split())
+    return (status, body[:out_len].decode("utf-8"),
+            body[out_len:out_len + err_len].decode("utf-8"))
+
+
+def run_program(program: str, argv: List[str], cwd: Optional[str] = None) -> Tuple[int, str, str]:
+    """Run one CLI ``main()`` in this process, capturing its output and exit status"""
+    import importlib
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+    from instrumentation import stats
+
+    if program not in PROGRAMS:
+        return 2, "", f"Error: unknown program {program}\n"
+    module = importlib.import_module(program)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_cwd, previous_argv = os.getcwd(), sys.argv
+    status = 0
+    try:
+        if cwd:
+            os.chdir(cwd)
+        # argparse names the program after sys.argv[0] in usage and errors
+        sys.argv = [f"{program}.py", *argv]
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                module.main(argv)
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                    status = 1
+                else:
+                    status = e.code or 0
+            except Exception as e:
+                print(f"Error: {str(e)}", file=sys.stderr)
+                status = 1
+    finally:
+        os.chdir(previous_cwd)
+        sys.argv = previous_argv
+        # --profile switches collection on for the whole process
+        stats.disable()
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def serve(path: str) -> None:
+    """Serve requests on ``path`` one at a time until SIGINT/SIGTERM"""
+    import signal
+    import socketserver
+
+    if os.path.dirname(os.path.abspath(path)) == os.path.abspath(private_dir()):
+        make_private_dir(private_dir())
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # left behind by a daemon that did not shut down cleanly
+        else:
+            probe.close()
+            raise OSError(f"A daemon is already listening on {path}")
+
+    # Load every tool and warm up the ephemeris before taking requests
+    for program in PROGRAMS:
+        __import__(program)
+    from datetime import datetime
+    from panchanga import PanchangaCalculator
+    PanchangaCalculator().calculate_panchanga(datetime(2000, 1, 1))
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                program, cwd, argv = decode_request(self.rfile.read())
+            except ValueError as e:
+                response = (2, "", f"Error: malformed request: {e}\n")
+            else:
+                response = run_program(program, argv, cwd)
+            self.wfile.write(encode_response(*response))
+
+    # Requests run one at a time: the tools print to the process-wide stdout
+    # Bind under a restrictive umask so the socket is never reachable by others
+    previous_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, Handler)
+    finally:
+        os.umask(previous_umask)
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"Listening on {path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the Panchanga command line tools from one warm process')
+    parser.add_argument('--socket', default=None, help='Socket path (default: $PANCHANGA_SOCKET or a per-user path)')
+    args = parser.parse_args()
+
+    try:
+        serve(args.socket or socket_path())
+    except OSError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from daily_panchanga import parse_local_datetime
+from monthly_panchanga import MonthlyPanchangaModel
+from panchanga import PanchangaCalculator, PanchangaData
+from planet_hours import VedicPlanetaryHours, validate_timezone
+from timezones import resolve_zone
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def panchanga_json(pdata: PanchangaData) -> Dict[str, str]:
+    return {
+        "tithi": pdata.tithi,
+        "paksha": pdata.paksha,
+        "nakshatra": pdata.nakshatra,
+        "yoga": pdata.yoga,
+        "karana": pdata.karana,
+        "rashi": pdata.rashi,
+    }
+
+
+class MicroBatcher:
+    """Coalesce concurrent Panchanga requests into one batch computation
+
+    Requests arriving within ``window`` seconds of the first pending one (or
+    until ``max_batch`` are queued) are computed together with
+    ``calculate_panchanga_batch`` on ``executor``, keeping the event loop
+    free while the ephemeris runs.
+    """
+
+    def __init__(self, calculator: PanchangaCalculator, executor: ThreadPoolExecutor,
+                 window: float = 0.005, max_batch: int = 256):
+        self.calculator = calculator
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[datetime, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, utc_time: datetime) -> PanchangaData:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((utc_time, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(pending))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    def _compute(self, dates: List[datetime]) -> List[PanchangaData]:
+        try:
+            batch = self.calculator.calculate_panchanga_batch(dates)
+        except ImportError:
+            return [self.calculator.calculate_panchanga(d) for d in dates]
+        return [batch[i] for i in range(len(batch))]
+
+    async def _run(self, pending: List[Tuple[datetime, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        self.requests += len(pending)
+        try:
+            results = await loop.run_in_executor(self.executor, self._compute,
+                                                 [utc_time for utc_time, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), pdata in zip(pending, results):
+            if not future.done():
+                future.set_result(pdata)
+
+    async def drain(self) -> None:
+        """Compute everything still queued and wait for running batches"""
+        self.flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+
+class PanchangaServer:
+    """Minimal asyncio HTTP/1.1 server exposing Panchanga endpoints as JSON
+
+    GET /panchanga?date=DD/MM/YYYY&time=HH:MM&zone=+05:30[&calendar=jalali]
+    GET /monthly?month=MM&year=YYYY&zone=+05:30
+    GET /hora?date=YYYY-MM-DD&lat=..&lon=..&tz=Asia/Kolkata
+    GET /health
+
+    At most ``max_concurrency`` requests are handled at once; further
+    requests wait for a slot. A slot is taken only once the request line and
+    headers have been read, and a client that takes longer than
+    ``header_timeout`` seconds to send them gets a 408, so idle connections
+    cannot hold slots. ``stop()`` closes the listening socket and lets
+    in-flight requests finish before the executor is shut down.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080,
+                 max_concurrency: int = 256, workers: int = 4,
+                 batch_window: float = 0.005, max_batch: int = 256,
+                 calculator: Optional[PanchangaCalculator] = None,
+                 header_timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.calculator = calculator or PanchangaCalculator()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.batcher = MicroBatcher(self.calculator, self.executor, batch_window, max_batch)
+        self.max_concurrency = max_concurrency
+        self.header_timeout = header_timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 asks the OS for a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        self._stopping = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Compute whatever is queued now instead of waiting out the window
+        self.batcher.flush()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=timeout)
+        await self.batcher.drain()
+        self.executor.shutdown(wait=True)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stop_requested = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_requested.set)
+            except NotImplementedError:
+                pass
+        print(f"Serving on http://{self.host}:{self.port}")
+        await stop_requested.wait()
+        print("Shutting down...")
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            try:
+                method, target = await asyncio.wait_for(self._read_request(reader), self.header_timeout)
+            except asyncio.TimeoutError:
+                status, body = 408, {"error": "Timed out reading the request"}
+            except HTTPError as e:
+                status, body = e.status, {"error": str(e)}
+            else:
+                async with self._slots:
+                    status, body = await self._respond(method, target)
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode("ascii") + payload)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str]:
+        """Method and target of the request, with the headers read and skipped"""
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HTTPError(400, "Malformed request line")
+        return parts[0], parts[1]
+
+    async def _respond(self, method: str, target: str) -> Tuple[int, object]:
+        try:
+            if method != "GET":
+                raise HTTPError(405, "Only GET is supported")
+            if self._stopping:
+                raise HTTPError(503, "Server is shutting down")
+
+            url = urlsplit(target)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            route = self.routes().get(url.path)
+            if route is None:
+                raise HTTPError(404, f"Unknown endpoint: {url.path}")
+            return 200, await route(params)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (ValueError, KeyError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    def routes(self):
+        return {
+            "/panchanga": self.panchanga,
+            "/monthly": self.monthly,
+            "/hora": self.hora,
+            "/health": self.health,
+        }
+
+    @staticmethod
+    def _require(params: Dict[str, str], *names: str) -> List[str]:
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise HTTPError(400, f"Missing parameter(s): {', '.join(missing)}")
+        return [params[name] for name in names]
+
+    async def panchanga(self, params: Dict[str, str]) -> Dict[str, str]:
+        date, time, zone = self._require(params, "date", "time", "zone")
+        utc_time = parse_local_datetime(date, time, zone, params.get("calendar", "gregorian"))
+        pdata = await self.batcher.submit(utc_time)
+        return {"utc": utc_time.isoformat(), **panchanga_json(pdata)}
+
+    async def monthly(self, params: Dict[str, str]) -> Dict[str, object]:
+        month, year, zone = self._require(params, "month", "year", "zone")
+        month, year = int(month), int(year)
+        if not (1 <= month <= 12):
+            raise ValueError("Month must be between 1 and 12")
+        timezone = resolve_zone(zone)
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(
+            self.executor, MonthlyPanchangaModel, year, month, timezone, self.calculator)
+        days = [{"day": day, **panchanga_json(pdata)}
+                for day, pdata in sorted(model.days.items()) if pdata is not None]
+        return {"year": year, "month": month, "zone": zone, "days": days}
+
+    async def hora(self, params: Dict[str, str]) -> Dict[str, object]:
+        date, lat, lon, tz = self._require(params, "date", "lat", "lon", "tz")
+        if not validate_timezone(tz):
+            raise ValueError(f"Invalid timezone: {tz}")
+        day = datetime.strptime(date, '%Y-%m-%d')
+        loop = asyncio.get_running_loop()
+        horas = await loop.run_in_executor(
+            self.executor,
+            lambda: VedicPlanetaryHours(day, float(lat), float(lon), tz).calculate_horas())
+        return {
+            "date": date,
+            "tz": tz,
+            "horas": [{**hora, "start": hora["start"].isoformat(), "end": hora["end"].isoformat()}
+                      for hora in horas],
+        }
+
+    async def health(self, params: Dict[str, str]) -> Dict[str, object]:
+        return {"status": "ok", "batches": self.batcher.batches, "requests": self.batcher.requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve Panchanga, monthly and hora calculations over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--workers', type=int, default=4, help='Threads running the computations')
+    parser.add_argument('--max-concurrency', type=int, default=256,
+                        help='Maximum number of requests handled at once')
+    parser.add_argument('--batch-window', type=float, default=5.0,
+                        help='Milliseconds to wait for more requests before computing a batch')
+    parser.add_argument('--max-batch', type=int, default=256, help='Largest batch computed at once')
+    parser.add_argument('--header-timeout', type=float, default=10.0,
+                        help='Seconds a client may take to send its request line and headers')
+    args = parser.parse_args()
+
+    server = PanchangaServer(args.host, args.port, args.max_concurrency, args.workers,
+                             args.batch_window / 1000.0, args.max_batch,
+                             header_timeout=args.header_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except OSError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import heapq
+import inspect
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from planet_hours import EPOCH, HoraTimeline, VedicPlanetaryHours
+from timezones import resolve_zone
+from transitions import LIMBS, LimbTransitionFinder
+
+UNIX_EPOCH_JD = 2440587.5
+# Longest single sleep; waking this often keeps the watcher on time across
+# wall clock adjustments and suspend/resume at no measurable cost
+MAX_SLEEP_SECONDS = 300.0
+
+
+@dataclass
+class LiveEvent:
+    """A limb or hora that has just started
+
+    ``kind`` is a limb name ("tithi", "nakshatra", ...) or "hora". ``start``
+    and ``end`` are the naive UTC bounds of the new period; ``previous`` is
+    the name of the period that ended, None for the initial state.
+    """
+    kind: str
+    name: str
+    previous: Optional[str]
+    start: datetime
+    end: datetime
+
+    def to_json(self) -> str:
+        return json.dumps({"kind": self.kind, "name": self.name, "previous": self.previous,
+                           "start": self.start.isoformat(), "end": self.end.isoformat()})
+
+
+def _posix_to_datetime(ts: float) -> datetime:
+    return EPOCH + timedelta(seconds=ts)
+
+
+class PanchangaWatcher:
+    """Emit an event whenever a limb or the hora changes, sleeping in between
+
+    The watcher keeps the current period of every watched limb (and of the
+    hora when a location is given) with its end time in a heap, sleeps
+    until the earliest end, emits a ``LiveEvent`` for it and computes the
+    next period of that limb only. Nothing runs between transitions except
+    a wake-up every ``MAX_SLEEP_SECONDS`` to re-read the wall clock.
+
+    ``transitions`` is anything with ``limb_periods`` and ``precision``: a
+    ``LimbTransitionFinder`` (default) or an ``almanac.Almanac``. Searches
+    run in a worker thread so the event loop stays responsive.
+    """
+
+    def __init__(self, limbs: Sequence[str] = LIMBS, transitions=None,
+                 location: Optional[Tuple[float, float, str]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.limbs = tuple(limbs)
+        self.transitions = transitions or LimbTransitionFinder()
+        self.location = location
+        self.clock = clock
+        self._callbacks: List[Callable] = []
+        self._queues: List[asyncio.Queue] = []
+        self._stopped: Optional[asyncio.Event] = None
+        self._timeline: Optional[HoraTimeline] = None
+        # kind -> (name, start, end) of the period in force, end as POSIX seconds
+        self.current: Dict[str, Tuple[str, float, float]] = {}
+
+    def add_callback(self, callback: Callable[[LiveEvent], object]) -> None:
+        """Call ``callback(event)`` for every event; coroutine functions are awaited"""
+        self._callbacks.append(callback)
+
+    def queue(self, maxsize: int = 0) -> asyncio.Queue:
+        """A new queue receiving every event"""
+        queue = asyncio.Queue(maxsize)
+        self._queues.append(queue)
+        return queue
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def _limb_period(self, limb: str, ts: float) -> Tuple[str, float, float]:
+        jd = ts / 86400.0 + UNIX_EPOCH_JD
+        period = self.transitions.limb_periods(limb, jd, jd)[-1]
+        return (period.name, (period.start_jd - UNIX_EPOCH_JD) * 86400.0,
+                (period.end_jd - UNIX_EPOCH_JD) * 86400.0)
+
+    def _hora_period(self, ts: float) -> Tuple[str, float, float]:
+        timeline = self._timeline
+        i = timeline.index_at(ts) if timeline is not None else None
+        if i is None:
+            latitude, longitude, zone = self.location
+            # Start a day early: before sunrise the hora belongs to yesterday's night
+            local_day = resolve_zone(zone).to_local(_posix_to_datetime(ts)) - timedelta(days=1)
+            hours = VedicPlanetaryHours(local_day.replace(hour=0, minute=0, second=0, microsecond=0),
+                                        latitude, longitude, zone)
+            timeline = self._timeline = hours.hora_timeline(days=3)
+            i = timeline.index_at(ts)
+            if i is None:
+                raise ValueError("No hora timeline around the current time at this location")
+        planet = HoraTimeline.CHALDEAN_ORDER[timeline.planets[i]]
+        return planet, timeline.boundaries[i], timeline.boundaries[i + 1]
+
+    def _period(self, kind: str, ts: float) -> Tuple[str, float, float]:
+        return self._hora_period(ts) if kind == "hora" else self._limb_period(kind, ts)
+
+    def _next_period(self, kind: str, end: float) -> Tuple[str, float, float]:
+        """Period that follows one ending at ``end``"""
+        if kind == "hora":
+            return self._hora_period(end)
+        # A limb's end is the first instant of the next period to within the
+        # search precision; probe just past it
+        return self._limb_period(kind, end + self.transitions.precision * 86400.0)
+
+    async def _emit(self, event: LiveEvent) -> None:
+        for queue in self._queues:
+            await queue.put(event)
+        for callback in self._callbacks:
+            result = callback(event)
+            if inspect.isawaitable(result):
+                await result
+
+    def _event(self, kind: str, period: Tuple[str, float, float], previous: Optional[str]) -> LiveEvent:
+        name, start, end = period
+        return LiveEvent(kind, name, previous, _posix_to_datetime(start), _posix_to_datetime(end))
+
+    async def run(self, emit_initial: bool = True) -> None:
+        """Watch until ``stop()`` is called or the task is cancelled"""
+        self._stopped = asyncio.Event()
+        kinds = list(self.limbs) + (["hora"] if self.location is not None else [])
+        now = self.clock()
+        heap = []
+        for kind in kinds:
+            period = await asyncio.to_thread(self._period, kind, now)
+            self.current[kind] = period
+            heapq.heappush(heap, (period[2], kind))
+            if emit_initial:
+                await self._emit(self._event(kind, period, None))
+
+        while not self._stopped.is_set():
+            end, kind = heap[0]
+            delay = end - self.clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), min(delay, MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(heap)
+            previous = self.current[kind]
+            period = await asyncio.to_thread(self._next_period, kind, end)
+            self.current[kind] = period
+            heapq.heappush(heap, (period[2], kind))
+            await self._emit(self._event(kind, period, previous[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print an event whenever a Panchanga limb or the hora changes')
+    parser.add_argument('--limbs', nargs='+', default=list(LIMBS), choices=LIMBS, help='Limbs to watch')
+    parser.add_argument('--lat', type=float, help='Latitude for hora events')
+    parser.add_argument('--lon', type=float, help='Longitude for hora events')
+    parser.add_argument('--tz', help='Timezone name or offset for hora events')
+    parser.add_argument('--almanac', metavar='PATH', help='Read transitions from an almanac file')
+    parser.add_argument('--format', default='text', choices=['text', 'jsonl'], help='Event output format')
+    args = parser.parse_args(argv)
+
+    location = None
+    if args.lat is not None or args.lon is not None or args.tz is not None:
+        if args.lat is None or args.lon is None or args.tz is None:
+            parser.error("hora events need --lat, --lon and --tz together")
+        location = (args.lat, args.lon, args.tz)
+
+    def show(event: LiveEvent) -> None:
+        if args.format == 'jsonl':
+            print(event.to_json(), flush=True)
+        else:
+            change = f"{event.previous} -> {event.name}" if event.previous else event.name
+            print(f"{event.start:%Y-%m-%d %H:%M:%S} UTC  {event.kind:<10} {change}"
+                  f" (until {event.end:%Y-%m-%d %H:%M:%S})", flush=True)
+
+    try:
+        transitions = None
+        if args.almanac:
+            from almanac import Almanac
+            transitions = Almanac(args.almanac)
+        if location is not None:
+            resolve_zone(location[2])
+        watcher = PanchangaWatcher(args.limbs, transitions, location)
+        watcher.add_callback(show)
+        asyncio.run(watcher.run())
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
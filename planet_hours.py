@@ -1,10 +1,26 @@
-from datetime import datetime, timedelta
-import ephem
+import sys
+
+if __name__ == "__main__":
+    # Let a running panchanga_daemon.py answer before the imports below
+    from panchanga_daemon import forward
+    status = forward("planet_hours", sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 import argparse
-from typing import List, Tuple
-import pytz
-import re
-from zoneinfo import ZoneInfo
+import time
+from typing import List, Optional
+
+from instrumentation import stats
+from sunrise import SunCycle, SunriseCache, compute_sun_cycle_batch, sun_cycle_after
+from timezones import ZoneTable, is_valid_zone, resolve_zone, zone_names
+
+EPOCH = datetime(1970, 1, 1)
+# Two rising searches from different instants agree far better than this on one event
+_SAME_EVENT = timedelta(minutes=1)
 
 class VedicPlanetaryHours:
     # Chaldean order of planets based on their speed through zodiac
@@ -40,74 +56,31 @@ class VedicPlanetaryHours:
         "Saturn": {"sanskrit": "Shani", "symbol": "♄"}
     }
 
-    def __init__(self, date: datetime, latitude: float, longitude: float, timezone: str):
+    def __init__(self, date: datetime, latitude: float, longitude: float, timezone: str,
+                 sunrise_cache: Optional[SunriseCache] = None):
         self.latitude = latitude
         self.longitude = longitude
+        self.sunrise_cache = sunrise_cache
         self.original_timezone = timezone  # Store the original timezone string
         
         # Handle both timezone formats: "Asia/Tehran" or "+03:30"
-        if re.match(r'^[+-]\d{2}:?\d{2}$', timezone):
-            # Convert "+03:30" format to hours offset
-            sign = 1 if timezone[0] == '+' else -1
-            hours = int(timezone[1:3])
-            minutes = int(timezone[-2:])
-            self.tz_offset = timedelta(hours=sign * hours, minutes=minutes)
-            self.timezone = f"UTC{timezone}"
-            self.is_offset = True
-        else:
-            self.timezone = timezone
-            self.is_offset = False
-            tz = ZoneInfo(timezone)
-            # Get the offset for the specific date
-            sample_dt = date.replace(tzinfo=tz)
-            self.tz_offset = sample_dt.utcoffset()
-
-        # Convert input date to timezone-aware datetime
+        self.zone = resolve_zone(timezone)
+        self.timezone = self.zone.name
+        self.is_offset = self.zone.is_fixed
+        # Offset on the input date; horas look up the offset of each instant
+        local_date = date if isinstance(date, datetime) else datetime.combine(date, datetime.min.time())
+        self.tz_offset = self.zone.utcoffset(local_date.replace(tzinfo=None))
+
+        # A naive date is the local date; an aware one is converted to the zone
         if isinstance(date, datetime):
-            if date.tzinfo is None:
-                self.date = date + self.tz_offset
-            else:
-                self.date = date
+            self.date = self.zone.to_local(date) if date.tzinfo is not None else date
         else:
-            self.date = datetime.combine(date, datetime.min.time()) + self.tz_offset
+            self.date = datetime.combine(date, datetime.min.time())
             
         # Calculate local mean time adjustment
         self.lmt_adjustment = self._calculate_lmt_adjustment()
 
 
-    def get_current_time(self) -> datetime:
-        """Get current time in the proper timezone"""
-        now = datetime.utcnow()
-        if self.is_offset:
-            return now + self.tz_offset
-        else:
-            return now.replace(tzinfo=pytz.UTC).astimezone(ZoneInfo(self.timezone))
-
-
-    def _calculate_sunrise_sunset(self) -> Tuple[datetime, datetime]:
-        """Calculate sunrise and sunset times"""
-        observer = ephem.Observer()
-        observer.lat = str(self.latitude)
-        observer.lon = str(self.longitude)
-        observer.date = self.date.strftime('%Y/%m/%d')
-        observer.horizon = '-0:34'
-        
-        observer.epoch = '2000'
-        ephem.Delta_T = 0
-        ephem.ayanamsa_name = 'Lahiri'
-        
-        sun = ephem.Sun()
-        
-        # Get UTC sunrise/sunset
-        sunrise_utc = observer.next_rising(sun).datetime()
-        sunset_utc = observer.next_setting(sun).datetime()
-        
-        # Apply timezone offset
-        sunrise = sunrise_utc + self.tz_offset + timedelta(hours=self.lmt_adjustment)
-        sunset = sunset_utc + self.tz_offset + timedelta(hours=self.lmt_adjustment)
-        
-        return sunrise, sunset
-    
     def _calculate_lmt_adjustment(self) -> float:
         """Calculate adjustment for Local Mean Time based on longitude"""
         standard_meridian = round(self.longitude / 15) * 15
@@ -115,105 +88,27 @@ class VedicPlanetaryHours:
         return time_adjustment
 
 
-    def _get_hora_sequence(self, weekday: int) -> List[str]:
-        """Generate the sequence of planetary rulers based on weekday and Chaldean order"""
-        # Base Chaldean sequence
-        chaldean = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
-        
-        # Adjust sequence based on weekday
-        weekday_name = self.date.strftime('%a')
-        if weekday_name == "Mon":
-            chaldean = ["Moon", "Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury"]
-        elif weekday_name == "Tue":
-            chaldean = ["Mars", "Sun", "Venus", "Mercury", "Moon", "Saturn", "Jupiter"]
-        elif weekday_name == "Wed":
-            chaldean = ["Mercury", "Moon", "Saturn", "Jupiter", "Mars", "Sun", "Venus"]
-        elif weekday_name == "Thu":
-            chaldean = ["Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon", "Saturn"]
-        elif weekday_name == "Fri":
-            chaldean = ["Venus", "Mercury", "Moon", "Saturn", "Jupiter", "Mars", "Sun"]
-        elif weekday_name == "Sat":
-            chaldean = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
-        elif weekday_name == "Sun":
-            chaldean = ["Sun", "Venus", "Mercury", "Moon", "Saturn", "Jupiter", "Mars"]
-        
-        # Create a 24-hour sequence by repeating the pattern
-        extended_sequence = []
-        current_idx = 0
-        for _ in range(24):
-            extended_sequence.append(chaldean[current_idx])
-            current_idx = (current_idx + 1) % 7
-            
-        return extended_sequence
-
-
+    def hora_timeline(self, days: int = 1) -> "HoraTimeline":
+        """Planetary hours for ``days`` consecutive days starting at this date"""
+        with stats.stage("hora.timeline"):
+            return HoraTimeline.build(self.latitude, self.longitude, self.date, days,
+                                      self.lmt_adjustment * 3600, self.sunrise_cache, self.zone)
 
     def calculate_horas(self) -> List[dict]:
         """Calculate Vedic planetary hours (horas) for the day"""
-        sunrise, sunset = self._calculate_sunrise_sunset()
-        
-        # Convert times to minutes since midnight
-        sunrise_minutes = sunrise.hour * 60 + sunrise.minute
-        sunset_minutes = sunset.hour * 60 + sunset.minute
-        
-        # Calculate length of daylight in minutes
-        day_length = sunset_minutes - sunrise_minutes
-        
-        # Calculate night length (until next sunrise)
-        next_sunrise = sunrise + timedelta(days=1)
-        night_minutes = ((24 * 60) - sunset_minutes) + (next_sunrise.hour * 60 + next_sunrise.minute)
-        
-        # Length of each planetary hour
-        day_hora_length = day_length / 12
-        night_hora_length = night_minutes / 12
-        
-        # Get hora sequence for this weekday
-        weekday = self.date.weekday()
-        hora_sequence = self._get_hora_sequence(weekday)
-        
-        planetary_hours = []
-        
-        # Calculate daytime hours
-        current_time = sunrise
-        for i in range(12):
-            end_time = current_time + timedelta(minutes=day_hora_length)
-            planet = hora_sequence[i]
-            planetary_hours.append({
-                'start': current_time,
-                'end': end_time,
-                'planet': planet,
-                'sanskrit': self.PLANET_INFO[planet]["sanskrit"],
-                'symbol': self.PLANET_INFO[planet]["symbol"],
-                'period': 'Day'
-            })
-            current_time = end_time
-
-        # Calculate nighttime hours
-        current_time = sunset
-        for i in range(12):
-            end_time = current_time + timedelta(minutes=night_hora_length)
-            planet = hora_sequence[i + 12]
-            planetary_hours.append({
-                'start': current_time,
-                'end': end_time,
-                'planet': planet,
-                'sanskrit': self.PLANET_INFO[planet]["sanskrit"],
-                'symbol': self.PLANET_INFO[planet]["symbol"],
-                'period': 'Night'
-            })
-            current_time = end_time
-
-        return planetary_hours
+        timeline = self.hora_timeline(days=1)
+        return [timeline.hora(i) for i in range(len(timeline))]
 
 
 
     def display_horas(self):
         """Display Vedic planetary hours in a formatted way"""
-        horas = self.calculate_horas()
-        
-        # Get current time using the appropriate method
-        now = self.get_current_time()
-        
+        timeline = self.hora_timeline(days=1)
+        current = timeline.index_at(time.time())
+        with stats.stage("hora.render"):
+            self._print_timeline(timeline, current)
+
+    def _print_timeline(self, timeline: "HoraTimeline", current: Optional[int]) -> None:
         print(f"\nVedic Planetary Hours (Hora) for {self.date.strftime('%A, %B %d, %Y')}")
         print(f"Timezone: {self.original_timezone}")
         print(f"Location: {self.latitude}°N, {self.longitude}°E")
@@ -221,9 +116,10 @@ class VedicPlanetaryHours:
         print(f"{'Time Period':<20} {'Planet':<10} {'Sanskrit':<10} {'Symbol':<8} {'Period':<8} {'Current':<8}")
         print("-" * 100)
         
-        for hora in horas:
+        for i in range(len(timeline)):
+            hora = timeline.hora(i)
             time_str = f"{hora['start'].strftime('%H:%M')} - {hora['end'].strftime('%H:%M')}"
-            is_current = hora['start'] <= now <= hora['end']
+            is_current = i == current
             current_indicator = "→ NOW ←" if is_current else ""
             
             print(f"{time_str:<20} {hora['planet']:<10} {hora['sanskrit']:<10} "
@@ -231,9 +127,137 @@ class VedicPlanetaryHours:
 
 
 
+class HoraTimeline:
+    """Planetary hours over any number of consecutive days
+
+    Hora ``i`` runs from ``boundaries[i]`` to ``boundaries[i + 1]`` (UTC POSIX
+    seconds) and is ruled by ``CHALDEAN_ORDER[planets[i]]``. Every day adds
+    12 day horas (sunrise to sunset) and 12 night horas (sunset to the next
+    sunrise). Local times for display are UTC plus the offset ``zone`` has
+    at that instant, so a run spanning a DST change switches offset with
+    the zone, plus a fixed ``local_offset`` in seconds (the local mean time
+    adjustment VedicPlanetaryHours applies).
+    """
+    CHALDEAN_ORDER = VedicPlanetaryHours.CHALDEAN_ORDER
+    PLANET_INFO = VedicPlanetaryHours.PLANET_INFO
+
+    def __init__(self, boundaries: array, planets: array, local_offset: float = 0.0,
+                 zone: Optional[ZoneTable] = None):
+        if len(boundaries) != len(planets) + 1:
+            raise ValueError("A timeline needs exactly one more boundary than horas")
+        self.boundaries = boundaries
+        self.planets = planets
+        self.local_offset = local_offset
+        self.zone = zone
+
+    @classmethod
+    def build(cls, latitude: float, longitude: float, start_date, days: int,
+              local_offset: float = 0.0,
+              sunrise_cache: Optional[SunriseCache] = None,
+              zone: Optional[ZoneTable] = None) -> "HoraTimeline":
+        """Timeline of ``days`` consecutive local dates starting at ``start_date``"""
+        if days < 1:
+            raise ValueError("days must be at least 1")
+        start = start_date.date() if isinstance(start_date, datetime) else start_date
+        dates = [start + timedelta(days=i) for i in range(days)]
+        with stats.stage("hora.sunrise"):
+            cycles = cls._local_sun_cycles(latitude, longitude, dates, sunrise_cache, zone)
+
+        order = cls.CHALDEAN_ORDER
+        boundaries = array('d')
+        planets = array('b')
+        for i in range(days):
+            sunrise, sunset, next_sunrise = cycles[i]
+            if i + 1 < days:
+                # The night ends where the next local date's first hora begins
+                next_sunrise = cycles[i + 1][0]
+            sunrise_ts = (sunrise - EPOCH).total_seconds()
+            sunset_ts = (sunset - EPOCH).total_seconds()
+            next_ts = (next_sunrise - EPOCH).total_seconds()
+            day_length = (sunset_ts - sunrise_ts) / 12
+            night_length = (next_ts - sunset_ts) / 12
+            for k in range(12):
+                boundaries.append(sunrise_ts + k * day_length)
+            for k in range(12):
+                boundaries.append(sunset_ts + k * night_length)
+
+            # DAY_RULERS counts from Sunday, date.weekday() from Monday
+            ruler = VedicPlanetaryHours.DAY_RULERS[(dates[i].weekday() + 1) % 7]
+            first = order.index(ruler)
+            planets.extend((first + k) % 7 for k in range(24))
+        boundaries.append((cycles[-1][2] - EPOCH).total_seconds())
+        return cls(boundaries, planets, local_offset, zone)
+
+    @staticmethod
+    def _local_sun_cycles(latitude: float, longitude: float, dates: List[date],
+                          sunrise_cache: Optional[SunriseCache],
+                          zone: Optional[ZoneTable]) -> List[SunCycle]:
+        """Sunrise, sunset and next sunrise (naive UTC) of each local date
+
+        A local date runs from its local midnight in ``zone`` (UTC without
+        one) to the next. Each date's cycle is searched from its own local
+        midnight, so the sunrise is that date's first and the sunset is the
+        one after it, wherever they fall against UTC dates. With a cache all
+        dates are read in one lookup.
+        """
+        midnights = [datetime.combine(day, datetime.min.time()) for day in dates]
+        midnights.append(midnights[-1] + timedelta(days=1))
+        if zone is not None:
+            midnights = [zone.to_utc(midnight) for midnight in midnights]
+        queries = [(latitude, longitude, midnight) for midnight in midnights[:-1]]
+        if sunrise_cache is not None:
+            cycles = compute_sun_cycle_batch(queries, cache=sunrise_cache, workers=1)
+        else:
+            cycles = [sun_cycle_after(*query) for query in queries]
+
+        for i, (sunrise, sunset, next_sunrise) in enumerate(cycles):
+            if (sunrise is None or sunset is None or next_sunrise is None
+                    or sunrise >= midnights[i + 1]):
+                raise ValueError(f"The sun does not both rise and set on {dates[i]} at this location")
+            if i + 1 < len(cycles) and abs(next_sunrise - cycles[i + 1][0]) > _SAME_EVENT:
+                raise ValueError(f"The sun rises more than once on {dates[i + 1]} at this location")
+        return cycles
+
+    def __len__(self) -> int:
+        return len(self.planets)
+
+    def index_at(self, t) -> Optional[int]:
+        """Index of the hora active at ``t`` (UTC datetime or POSIX seconds), None outside the timeline"""
+        if isinstance(t, datetime):
+            if t.tzinfo is not None:
+                t = t.astimezone(dt_timezone.utc).replace(tzinfo=None)
+            t = (t - EPOCH).total_seconds()
+        i = bisect_right(self.boundaries, t) - 1
+        if i < 0 or i >= len(self.planets):
+            return None
+        return i
+
+    def planet_at(self, t) -> Optional[str]:
+        i = self.index_at(t)
+        return None if i is None else self.CHALDEAN_ORDER[self.planets[i]]
+
+    def local_time(self, ts: float) -> datetime:
+        offset = self.local_offset
+        if self.zone is not None:
+            offset += self.zone.offset_at(ts)
+        return EPOCH + timedelta(seconds=ts + offset)
+
+    def hora(self, i: int) -> dict:
+        """Hora ``i`` in the format returned by VedicPlanetaryHours.calculate_horas"""
+        planet = self.CHALDEAN_ORDER[self.planets[i]]
+        return {
+            'start': self.local_time(self.boundaries[i]),
+            'end': self.local_time(self.boundaries[i + 1]),
+            'planet': planet,
+            'sanskrit': self.PLANET_INFO[planet]["sanskrit"],
+            'symbol': self.PLANET_INFO[planet]["symbol"],
+            'period': 'Day' if i % 24 < 12 else 'Night'
+        }
+
+
 def get_available_timezones():
     """Get list of available timezones and add UTC offset format examples"""
-    timezones = pytz.all_timezones
+    timezones = zone_names()
     # Add example UTC offset formats
     utc_examples = [
         "+00:00", "+01:00", "+02:00", "+03:00", "+03:30", "+04:00", "+04:30",
@@ -245,27 +269,12 @@ def get_available_timezones():
     return sorted(list(timezones) + utc_examples)
 
 def validate_timezone(tz: str) -> bool:
-    """Validate timezone string format"""
-    if tz in pytz.all_timezones:
-        return True
-    # Check for UTC offset format (+/-HH:MM)
-    if re.match(r'^[+-]\d{2}:?\d{2}$', tz):
-        try:
-            # Extract hours and minutes
-            sign = 1 if tz[0] == '+' else -1
-            hours = int(tz[1:3])
-            minutes = int(tz[-2:])
-            # Validate hours and minutes
-            if hours <= 14 and minutes < 60:
-                return True
-        except ValueError:
-            pass
-    return False
-
-def main():
+    """Validate a zone name or a [+/-]HH:MM offset"""
+    return is_valid_zone(tz)
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Calculate Vedic Planetary Hours (Hora)')
-    parser.add_argument('--date', help='Date in YYYY-MM-DD format (default: today)',
-                      default=datetime.now().strftime('%Y-%m-%d'))
+    parser.add_argument('--date', help='Date in YYYY-MM-DD format (default: today)')
     parser.add_argument('--lat', type=float, required=True,
                       help='Latitude in decimal degrees')
     parser.add_argument('--lon', type=float, required=True,
@@ -274,26 +283,36 @@ def main():
                       help='Timezone name (e.g., "Asia/Tehran") or offset (e.g., "+03:30")')
     parser.add_argument('--list-timezones', action='store_true',
                       help='List all available timezone names and offset formats')
+    parser.add_argument('--sunrise-cache', metavar='PATH',
+                      help='SQLite file caching sunrise/sunset per location grid cell and date')
+    parser.add_argument('--profile', action='store_true',
+                      help='Print stage timings and call counts to stderr')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.list_timezones:
         print("\nAvailable timezones and offset formats:")
         for tz in get_available_timezones():
             print(tz)
         return
+    if args.profile:
+        stats.enable()
 
     try:
         if not validate_timezone(args.tz):
             raise ValueError(f"Invalid timezone: {args.tz}. Use --list-timezones to see valid options.")
             
-        date = datetime.strptime(args.date, '%Y-%m-%d')
-        calculator = VedicPlanetaryHours(date, args.lat, args.lon, args.tz)
+        date = datetime.strptime(args.date or datetime.now().strftime('%Y-%m-%d'), '%Y-%m-%d')
+        sunrise_cache = SunriseCache(args.sunrise_cache) if args.sunrise_cache else None
+        calculator = VedicPlanetaryHours(date, args.lat, args.lon, args.tz, sunrise_cache)
         calculator.display_horas()
         
     except ValueError as e:
         print(f"Error: {str(e)}")
-        exit(1)
+        sys.exit(1)
+
+    if args.profile:
+        stats.print_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import ephem
+
+from instrumentation import stats
+
+
+SunTimes = Tuple[Optional[datetime], Optional[datetime]]
+# Sunrise, the sunset after it and the sunrise after that sunset
+SunCycle = Tuple[Optional[datetime], Optional[datetime], Optional[datetime]]
+
+
+class _SunriseObjects(threading.local):
+    """Observer and Sun reused by the current thread for rising/setting searches"""
+
+    def __init__(self):
+        self.observer = ephem.Observer()
+        self.observer.horizon = '-0:34'
+        self.observer.epoch = '2000'
+        self.sun = ephem.Sun()
+
+_sunrise_objects = _SunriseObjects()
+
+
+def _as_date(day) -> date:
+    return day.date() if isinstance(day, datetime) else day
+
+
+def _midnight(day) -> datetime:
+    return datetime.combine(_as_date(day), time())
+
+
+def sun_cycle_after(latitude: float, longitude: float, start: datetime) -> SunCycle:
+    """First sunrise after ``start`` (naive UTC), the sunset after it and the next sunrise
+
+    Each event is searched from the one before, so the three always follow
+    each other. When the sun does not rise, the sunset is searched from
+    ``start``. Returns naive UTC datetimes, with None for an event that does
+    not occur (polar day or night).
+    """
+    if stats.enabled:
+        stats.count("sunrise.solves")
+    observer = _sunrise_objects.observer
+    sun = _sunrise_objects.sun
+    observer.lat = str(latitude)
+    observer.lon = str(longitude)
+    observer.date = start
+    try:
+        sunrise = observer.next_rising(sun)
+        observer.date = sunrise
+    except ephem.CircumpolarError:
+        sunrise = None
+    try:
+        sunset = observer.next_setting(sun)
+        observer.date = sunset
+        next_sunrise = observer.next_rising(sun)
+    except ephem.CircumpolarError:
+        return (sunrise.datetime() if sunrise is not None else None), None, None
+    return (sunrise.datetime() if sunrise is not None else None), sunset.datetime(), next_sunrise.datetime()
+
+
+def sunrise_sunset_utc(latitude: float, longitude: float, day) -> SunTimes:
+    """First sunrise after 00:00 UTC of ``day`` at a location and the sunset after it
+
+    The sunset is the one that ends that sunrise's daylight, even when it
+    falls on the next UTC date, as it does for much of the Americas in
+    summer. Returns naive UTC datetimes, with None for an event that does
+    not occur (polar day or night).
+    """
+    return sun_cycle_after(latitude, longitude, _midnight(day))[:2]
+
+
+def sunrise_after_utc(latitude: float, longitude: float, start) -> Optional[datetime]:
+    """First sunrise after ``start`` (naive UTC datetime or ephem date), None if the sun does not rise"""
+    if stats.enabled:
+        stats.count("sunrise.solves")
+    observer = _sunrise_objects.observer
+    observer.lat = str(latitude)
+    observer.lon = str(longitude)
+    observer.date = start
+    try:
+        return observer.next_rising(_sunrise_objects.sun).datetime()
+    except ephem.CircumpolarError:
+        return None
+
+
+def _solve_chunk(items: List[Tuple[float, float, str]]) -> List[Tuple[Optional[float], ...]]:
+    """Worker entry point: sun cycle ephem dates for (lat, lon, ISO start instant) items"""
+    results = []
+    for latitude, longitude, start in items:
+        cycle = sun_cycle_after(latitude, longitude, datetime.fromisoformat(start))
+        results.append(tuple(float(ephem.Date(event)) if event else None for event in cycle))
+    return results
+
+
+def _to_datetime(value: Optional[float]) -> Optional[datetime]:
+    return ephem.Date(value).datetime() if value is not None else None
+
+
+class SunriseCache:
+    """On-disk sun cycle cache keyed by location grid cell and start instant
+
+    Each entry is a ``sun_cycle_after`` result: the first sunrise after a
+    UTC instant, the sunset after it and the following sunrise. Locations
+    are snapped to a grid of ``resolution`` degrees and the sun is
+    solved at the cell centre, so every user inside a cell shares one entry.
+    At the default 0.1 degrees the snapping moves sunrise by at most ~25
+    seconds at mid latitudes. The cache is a SQLite file; one instance can
+    be shared between threads.
+    """
+
+    def __init__(self, path: str, resolution: float = 0.1):
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.path = path
+        self.resolution = resolution
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Entries of the earlier per-UTC-date sun_times table are not reused:
+        # they held the first sunset after midnight, not the one after sunrise
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sun_cycles ("
+            " resolution REAL NOT NULL, cell_lat INTEGER NOT NULL, cell_lon INTEGER NOT NULL,"
+            " start TEXT NOT NULL, sunrise REAL, sunset REAL, next_sunrise REAL,"
+            " PRIMARY KEY (resolution, cell_lat, cell_lon, start))")
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "SunriseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return round(latitude / self.resolution), round(longitude / self.resolution)
+
+    def cell_center(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        return cell[0] * self.resolution, cell[1] * self.resolution
+
+    def lookup(self, keys: Iterable[Tuple[Tuple[int, int], str]]) -> Dict[Tuple[Tuple[int, int], str], Tuple]:
+        """Cached (sunrise, sunset, next sunrise) ephem dates for the keys that are present"""
+        found = {}
+        with self._lock:
+            for cell, start in keys:
+                row = self._db.execute(
+                    "SELECT sunrise, sunset, next_sunrise FROM sun_cycles"
+                    " WHERE resolution = ? AND cell_lat = ? AND cell_lon = ? AND start = ?",
+                    (self.resolution, cell[0], cell[1], start)).fetchone()
+                if row is not None:
+                    found[(cell, start)] = row
+        return found
+
+    def store(self, entries: Dict[Tuple[Tuple[int, int], str], Tuple]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sun_cycles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(self.resolution, cell[0], cell[1], start, *events)
+                 for (cell, start), events in entries.items()])
+            self._db.commit()
+
+    def get(self, latitude: float, longitude: float, day) -> SunTimes:
+        """Sunrise and sunset for one location, solving and storing it on a miss"""
+        return compute_sunrise_sunset_batch([(latitude, longitude, day)], cache=self, workers=1)[0]
+
+
+def compute_sunrise_sunset_batch(queries: Sequence[Tuple[float, float, object]],
+                                 cache: Optional[SunriseCache] = None,
+                                 workers: Optional[int] = None,
+                                 chunk_size: int = 256) -> List[SunTimes]:
+    """``sunrise_sunset_utc`` (naive UTC) for many (lat, lon, date) tuples
+
+    See ``compute_sun_cycle_batch`` for deduplication, caching and workers.
+    """
+    cycles = compute_sun_cycle_batch([(lat, lon, _midnight(day)) for lat, lon, day in queries],
+                                     cache=cache, workers=workers, chunk_size=chunk_size)
+    return [cycle[:2] for cycle in cycles]
+
+
+def compute_sun_cycle_batch(queries: Sequence[Tuple[float, float, datetime]],
+                            cache: Optional[SunriseCache] = None,
+                            workers: Optional[int] = None,
+                            chunk_size: int = 256) -> List[SunCycle]:
+    """``sun_cycle_after`` for many (lat, lon, naive UTC start) tuples
+
+    Duplicate queries are solved once. With a ``cache`` the queries are
+    snapped to its grid, cached cells are read back and only the misses are
+    solved and stored. Misses are spread across ``workers`` processes
+    (default: all cores); ``workers=1`` solves in this process.
+    """
+    if cache is not None:
+        keys = [(cache.cell(lat, lon), start.isoformat()) for lat, lon, start in queries]
+        found = cache.lookup(set(keys))
+        missing = sorted(set(keys) - found.keys())
+        points = [(*cache.cell_center(cell), start) for cell, start in missing]
+    else:
+        keys = [((lat, lon), start.isoformat()) for lat, lon, start in queries]
+        found = {}
+        missing = sorted(set(keys))
+        points = [(lat, lon, start) for (lat, lon), start in missing]
+
+    if points:
+        chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(chunks) == 1:
+            solved = [result for chunk in chunks for result in _solve_chunk(chunk)]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                solved = [result for chunk_results in executor.map(_solve_chunk, chunks)
+                          for result in chunk_results]
+        computed = dict(zip(missing, solved))
+        if cache is not None:
+            cache.store(computed)
+        found.update(computed)
+
+    return [tuple(_to_datetime(value) for value in found[key]) for key in keys]
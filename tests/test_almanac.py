@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+import almanac
+from almanac import Almanac, build_almanac
+from ephemeris import ChebyshevBackend
+from panchanga import EPHEM_EPOCH_JD, to_ephem_date
+from transitions import LimbTransitionFinder
+
+START, END = datetime(2025, 1, 1), datetime(2025, 1, 21)
+START_JD = to_ephem_date(START) + EPHEM_EPOCH_JD
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("almanac") / "almanac.db")
+    build_almanac(path, START, END, workers=1, chunk_days=7.0)
+    with Almanac(path) as built:
+        yield built
+
+
+@pytest.mark.parametrize("limb", ["tithi", "nakshatra", "yoga"])
+def test_stored_periods_match_the_finder(store, limb):
+    expected = LimbTransitionFinder().limb_periods(limb, START_JD + 1, START_JD + 15)
+    stored = store.limb_periods(limb, START_JD + 1, START_JD + 15)
+    assert [p.index for p in stored] == [p.index for p in expected]
+    for a, b in zip(stored[1:], expected[1:]):
+        assert abs(a.start_jd - b.start_jd) * 86400.0 < 2.0
+
+
+def test_chunk_finders_are_keyed_on_the_backend():
+    task = (START_JD, START_JD + 2, 1.0)
+    plain = almanac.limb_chunk(("tithi", *task, False))
+    fast = almanac.limb_chunk(("tithi", *task, True))
+    assert isinstance(almanac._finders[(1.0, True)].calculator.backend, ChebyshevBackend)
+    assert almanac._finders[(1.0, False)].calculator.backend is None
+    assert [p[0] for p in fast] == [p[0] for p in plain]
+    assert almanac.limb_chunk(("tithi", *task, False)) == plain
+
+
+def test_stitch_periods_joins_chunk_edges():
+    precision = 1.0 / 86400.0
+    chunks = [
+        [(1, 0.0, 1.0), (2, 1.0, 2.5)],
+        [(2, 2.0 - 0.5 * precision, 2.5), (3, 2.5, 3.0)],
+        [],
+        [(4, 3.0, 4.0)],
+    ]
+    assert list(almanac.stitch_periods(chunks, precision)) == [
+        (1, 0.0, 1.0), (2, 1.0, 2.5), (3, 2.5, 3.0), (4, 3.0, 4.0)]
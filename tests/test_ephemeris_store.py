@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import ephem
+import pytest
+
+from ephemeris_store import HEADER, MAGIC, MappedEphemeris, build_store
+from panchanga import PanchangaCalculator
+
+START = datetime(2025, 1, 1)
+END = datetime(2025, 1, 4)
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    path = tmp_path_factory.mktemp("store") / "eph.bin"
+    build_store(str(path), START, END, step_minutes=30.0)
+    with MappedEphemeris(str(path)) as mapped:
+        yield mapped
+
+
+def _angle(a, b):
+    return abs((a - b + 180.0) % 360.0 - 180.0)
+
+
+def test_interpolation_matches_live_positions(store):
+    live = PanchangaCalculator()
+    t = START + timedelta(minutes=7)
+    while t < END:
+        expected = live.sidereal_positions(ephem.Date(t))
+        actual = store.sidereal_positions(float(ephem.Date(t)))
+        assert _angle(actual[0], expected[0]) < 1e-3
+        assert _angle(actual[1], expected[1]) < 1e-3
+        assert actual[2] == pytest.approx(expected[2], abs=1e-3)
+        t += timedelta(minutes=97)
+
+
+def test_array_matches_scalar(store):
+    np = pytest.importorskip("numpy")
+    ds = float(ephem.Date(START)) + np.linspace(-1.0, 4.0, 61)
+    sun, moon, phase = store.sidereal_positions_array(ds)
+    for j, d in enumerate(ds):
+        expected = store.sidereal_positions(float(d))
+        assert _angle(sun[j], expected[0]) < 1e-4
+        assert _angle(moon[j], expected[1]) < 1e-4
+        assert phase[j] == pytest.approx(expected[2], abs=1e-4)
+
+
+def test_outside_range_uses_fallback(store):
+    d = float(ephem.Date(END + timedelta(days=10)))
+    assert store.sidereal_positions(d) == PanchangaCalculator().sidereal_positions(ephem.Date(d))
+
+
+@pytest.mark.parametrize("content", [b"", b"PNCH", MAGIC + b"\0" * 4])
+def test_short_file_is_rejected(tmp_path, content):
+    path = tmp_path / "short.bin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        MappedEphemeris(str(path))
+
+
+def test_truncated_and_foreign_files_are_rejected(tmp_path):
+    path = tmp_path / "bad.bin"
+    path.write_bytes(HEADER.pack(MAGIC, 1, 3, 0.0, 1.0, 100))
+    with pytest.raises(ValueError, match="truncated"):
+        MappedEphemeris(str(path))
+    path.write_bytes(HEADER.pack(b"OTHER\0\0\0", 1, 3, 0.0, 1.0, 0))
+    with pytest.raises(ValueError):
+        MappedEphemeris(str(path))
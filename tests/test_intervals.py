@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from intervals import IntervalSet
+
+
+def test_normalize_merges_touching_and_drops_empty():
+    s = IntervalSet([(3, 4), (0, 1), (1, 2), (5, 5), (6, 4), (0.5, 1.5)])
+    assert list(s) == [(0, 2), (3, 4)]
+
+
+def test_union_intersection_difference_edges():
+    a = IntervalSet([(0, 2), (4, 6)])
+    b = IntervalSet([(2, 4), (5, 7)])
+    assert list(a | b) == [(0, 7)]
+    # Half-open: touching intervals do not intersect
+    assert list(a & b) == [(5, 6)]
+    assert list(a - b) == [(0, 2), (4, 5)]
+    assert list(b - a) == [(2, 4), (6, 7)]
+
+
+def test_operations_with_empty_sets():
+    a = IntervalSet([(0, 1)])
+    empty = IntervalSet()
+    assert not empty
+    assert a | empty == a
+    assert not (a & empty)
+    assert a - empty == a
+    assert not (empty - a)
+
+
+def test_difference_splits_and_removes_whole_intervals():
+    a = IntervalSet([(0, 10)])
+    assert list(a - IntervalSet([(2, 3), (5, 6)])) == [(0, 2), (3, 5), (6, 10)]
+    assert not (a - IntervalSet([(-1, 11)]))
+    assert list(a - IntervalSet([(0, 10)])) == []
+
+
+def test_contains_is_half_open():
+    s = IntervalSet([(0, 1)])
+    assert 0 in s and 0.5 in s and 1 not in s
+
+
+def _points(s, grid):
+    return {x for x in grid if x in s}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_pointwise_set_operations(seed):
+    rng = random.Random(seed)
+    make = lambda: IntervalSet((a, a + rng.randint(0, 4)) for a in (rng.randint(0, 20) for _ in range(5)))
+    a, b = make(), make()
+    grid = [x / 2 for x in range(-2, 52)]
+    pa, pb = _points(a, grid), _points(b, grid)
+    assert _points(a | b, grid) == pa | pb
+    assert _points(a & b, grid) == pa & pb
+    assert _points(a - b, grid) == pa - pb
+    assert (a - b).total_length() == pytest.approx(a.total_length() - (a & b).total_length())
@@ -0,0 +1,76 @@
+import dataclasses
+import pickle
+from datetime import datetime
+
+import ephem
+import pytest
+
+from muhurtha_finder import MuhurthaFinder, MuhurthaTimeRange
+from panchanga import PanchangaCalculator
+
+START, END = datetime(2025, 1, 1), datetime(2025, 1, 15)
+
+
+class ShiftedMoonBackend:
+    """Live positions with the Moon moved ahead, so searches differ from the default"""
+
+    def __init__(self, degrees):
+        self.degrees = degrees
+
+    def sidereal_positions(self, d):
+        sun, moon, phase = PanchangaCalculator().sidereal_positions(ephem.Date(d))
+        return sun, (moon + self.degrees) % 360.0, phase
+
+
+@pytest.fixture(scope="module")
+def finder():
+    return MuhurthaFinder()
+
+
+@pytest.fixture(scope="module", params=["sample", "interval"])
+def ranges(request, finder):
+    found = finder.find_muhurtha(START, END, "marriage", mode=request.param)
+    assert found
+    return found
+
+
+def test_lazy_ranges_behave_like_dataclasses(finder, ranges):
+    first = ranges[0]
+    moved = dataclasses.replace(first, quality="Neutral")
+    assert (moved.start_time, moved.end_time, moved.quality) == (first.start_time, first.end_time, "Neutral")
+    assert moved.explanation == first.explanation
+    as_dict = dataclasses.asdict(ranges[-1])
+    assert as_dict["explanation"] == ranges[-1].explanation
+    assert as_dict["explanation"].startswith("This is a good time for marriage")
+
+
+def test_explanation_can_be_overwritten(finder):
+    found = finder.find_muhurtha(START, END, "meeting")
+    found[0].explanation = "custom"
+    assert found[0].explanation == "custom"
+    assert dataclasses.replace(found[0]).explanation == "custom"
+
+
+def test_lazy_ranges_equal_plain_ranges(ranges):
+    plain = [MuhurthaTimeRange(r.start_time, r.end_time, r.quality, r.explanation) for r in ranges]
+    assert ranges == plain
+    assert all(type(r) is MuhurthaTimeRange for r in ranges)
+    assert ranges[0] != dataclasses.replace(plain[0], explanation="other")
+
+
+def test_lazy_ranges_pickle_with_their_explanation(finder):
+    found = finder.find_muhurtha(START, END, "house_warming")
+    assert "explanation" not in vars(found[0])
+    restored = pickle.loads(pickle.dumps(found))
+    assert restored == found
+    assert all("_explain" not in vars(r) for r in restored)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_search_uses_the_finders_calculator(workers):
+    custom = MuhurthaFinder(PanchangaCalculator(backend=ShiftedMoonBackend(40.0), cache_size=64))
+    serial = custom.find_muhurtha(START, END, "marriage")
+    assert serial != MuhurthaFinder().find_muhurtha(START, END, "marriage")
+    parallel = list(custom.find_muhurtha_parallel(START, END, "marriage", workers=workers, shards=5))
+    assert parallel == serial
+    assert all(type(r) is MuhurthaTimeRange for r in parallel)
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import ephem
+import pytest
+
+from panchanga import EPHEM_EPOCH_JD, PanchangaCalculator, PanchangaData, to_ephem_date
+
+WHEN = datetime(2025, 1, 1, 7, 13)
+
+
+def _limbs(pdata):
+    return tuple(getattr(pdata, name) for name in PanchangaData.__slots__)
+
+
+@pytest.fixture(scope="module")
+def calculator():
+    return PanchangaCalculator()
+
+
+def test_to_ephem_date_conventions():
+    d = float(ephem.Date(WHEN))
+    assert to_ephem_date(WHEN) == d
+    assert to_ephem_date(ephem.Date(WHEN)) == d
+    assert to_ephem_date(d + EPHEM_EPOCH_JD) == pytest.approx(d, abs=1e-9)
+
+
+def test_scalar_floats_are_ephem_day_numbers(calculator):
+    d = float(ephem.Date(WHEN))
+    expected = _limbs(calculator.calculate_panchanga(WHEN))
+    assert _limbs(calculator.calculate_panchanga(d)) == expected
+    assert _limbs(calculator.calculate_panchanga(ephem.Date(WHEN))) == expected
+    assert _limbs(calculator.calculate_panchanga_ephem(d)) == expected
+
+
+def test_julian_dates_match_the_batch(calculator):
+    jd = float(ephem.Date(WHEN)) + EPHEM_EPOCH_JD
+    expected = _limbs(calculator.calculate_panchanga(WHEN))
+    assert _limbs(calculator.calculate_panchanga_jd(jd)) == expected
+    assert _limbs(calculator.calculate_panchanga_batch([jd])[0]) == expected
+    assert _limbs(calculator.calculate_panchanga_batch([WHEN])[0]) == expected
@@ -0,0 +1,107 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import ephem
+import pytest
+
+from panchanga import EPHEM_EPOCH_JD, PanchangaCache, PanchangaCalculator, PanchangaData
+from transitions import LimbTransitionFinder
+
+START = datetime(2025, 1, 1)
+
+
+def _limbs(pdata):
+    return tuple(getattr(pdata, name) for name in PanchangaData.__slots__)
+
+
+@pytest.fixture
+def plain():
+    return PanchangaCalculator()
+
+
+def test_cached_results_match_uncached_on_bucket_instants(plain):
+    cached = PanchangaCalculator(cache_size=256, cache_quantum=60.0)
+    for minute in range(0, 3 * 24 * 60, 37):
+        when = START + timedelta(minutes=minute)
+        assert _limbs(cached.calculate_panchanga(when)) == _limbs(plain.calculate_panchanga(when))
+
+
+def test_random_instants_match_uncached(plain):
+    cached = PanchangaCalculator(cache_size=4096, cache_quantum=3600.0)
+    rng = random.Random(7)
+    for _ in range(300):
+        d = float(ephem.Date(START)) + rng.uniform(0, 10)
+        assert _limbs(cached.calculate_panchanga_ephem(d)) == _limbs(plain.calculate_panchanga_ephem(d))
+
+
+@pytest.mark.parametrize("limb", ["tithi", "nakshatra", "karana"])
+def test_lookups_next_to_a_limb_change(plain, limb):
+    change = LimbTransitionFinder(plain).limb_periods(limb, START, START + timedelta(days=3))[1].start_jd
+    d = change - EPHEM_EPOCH_JD
+    cached = PanchangaCalculator(cache_size=64, cache_quantum=3600.0)
+    before, after = d - 5 / 86400.0, d + 5 / 86400.0
+    # Both sides of the change, in either lookup order
+    for instant in (after, before, after, before):
+        assert _limbs(cached.calculate_panchanga_ephem(instant)) == _limbs(plain.calculate_panchanga_ephem(instant))
+    assert getattr(plain.calculate_panchanga_ephem(before), f"{limb}_index") != \
+        getattr(plain.calculate_panchanga_ephem(after), f"{limb}_index")
+    assert cached.cache.get(cached.cache.key(d)) is PanchangaCache.STRADDLED
+
+
+def test_quiet_buckets_hold_their_limbs(plain):
+    cached = PanchangaCalculator(cache_size=64, cache_quantum=60.0)
+    d = float(ephem.Date(START))
+    cached.calculate_panchanga_ephem(d)
+    first, last = cached.cache.bounds(cached.cache.key(d))
+    assert first <= d <= last
+    assert cached.cache.get(cached.cache.key(d)) == plain.calculate_panchanga_ephem(d)
+
+
+def test_results_are_copies():
+    calculator = PanchangaCalculator(cache_size=16)
+    first = calculator.calculate_panchanga(START)
+    expected = _limbs(first)
+    first.tithi_index = (first.tithi_index + 1) % 30
+    assert _limbs(calculator.calculate_panchanga(START)) == expected
+
+
+def test_lru_eviction_and_stats():
+    calculator = PanchangaCalculator(cache_size=2, cache_quantum=60.0)
+    a, b, c = (START + timedelta(hours=h) for h in range(3))
+    calculator.calculate_panchanga(a)
+    calculator.calculate_panchanga(b)
+    calculator.calculate_panchanga(a)          # a is now the most recent entry
+    calculator.calculate_panchanga(c)          # evicts b
+    calculator.calculate_panchanga(a)
+    stats = calculator.cache_stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size, stats.maxsize) == (2, 3, 1, 2, 2)
+    calculator.calculate_panchanga(b)
+    assert calculator.cache_stats().misses == 4
+
+    calculator.cache.clear()
+    assert calculator.cache_stats().size == 0
+    assert calculator.cache_stats().hits == 0
+
+
+def test_disabled_cache_has_no_stats(plain):
+    assert plain.cache is None
+    assert plain.cache_stats() is None
+
+
+def test_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        PanchangaCache(maxsize=0)
+    with pytest.raises(ValueError):
+        PanchangaCache(quantum_seconds=0)
+
+
+def test_shared_between_threads(plain):
+    cached = PanchangaCalculator(cache_size=64, cache_quantum=60.0)
+    instants = [START + timedelta(minutes=10 * (i % 40)) for i in range(400)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda when: _limbs(cached.calculate_panchanga(when)), instants))
+    assert results == [_limbs(plain.calculate_panchanga(when)) for when in instants]
+    stats = cached.cache_stats()
+    assert stats.hits + stats.misses == len(instants)
+    assert stats.size == 40
@@ -0,0 +1,59 @@
+import os
+import socket
+
+import pytest
+
+from panchanga_daemon import forward, make_private_dir, trusted_socket
+
+
+@pytest.fixture
+def bound_socket(tmp_path):
+    directory = tmp_path / "run"
+    make_private_dir(str(directory))
+    path = str(directory / "daemon.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(previous_umask)
+    yield path
+    sock.close()
+
+
+def test_own_private_socket_is_trusted(bound_socket):
+    assert trusted_socket(bound_socket)
+
+
+def test_writable_socket_is_not_trusted(bound_socket):
+    os.chmod(bound_socket, 0o666)
+    assert not trusted_socket(bound_socket)
+
+
+def test_socket_in_a_shared_directory_is_not_trusted(bound_socket):
+    os.chmod(os.path.dirname(bound_socket), 0o777)
+    assert not trusted_socket(bound_socket)
+
+
+def test_regular_file_is_not_trusted(tmp_path):
+    path = tmp_path / "daemon.sock"
+    path.write_bytes(b"")
+    os.chmod(path, 0o600)
+    assert not trusted_socket(str(path))
+    assert not trusted_socket(str(tmp_path / "missing.sock"))
+
+
+def test_untrusted_socket_runs_locally(bound_socket, monkeypatch):
+    os.chmod(bound_socket, 0o666)
+    monkeypatch.setenv("PANCHANGA_SOCKET", bound_socket)
+    assert forward("daily_panchanga", []) is None
+
+
+def test_private_dir_rejects_open_directory(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir(mode=0o755)
+    os.chmod(directory, 0o755)
+    with pytest.raises(OSError):
+        make_private_dir(str(directory))
+    os.chmod(directory, 0o700)
+    make_private_dir(str(directory))
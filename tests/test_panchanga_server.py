@@ -0,0 +1,84 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from daily_panchanga import parse_local_datetime
+from panchanga import PanchangaCalculator
+from panchanga_server import PanchangaServer, panchanga_json
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _get(port, target):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+async def _with_server(scenario, **options):
+    server = PanchangaServer(port=0, **options)
+    await server.start()
+    try:
+        return await scenario(server)
+    finally:
+        await server.stop()
+
+
+def test_concurrent_requests_are_batched_and_match_the_scalar_path():
+    times = [f"{hour:02d}:{minute:02d}" for hour in range(0, 24, 2) for minute in (0, 30)]
+
+    async def scenario(server):
+        responses = await asyncio.gather(*(
+            _get(server.port, f"/panchanga?date=14/08/2025&time={t}&zone=%2B05:30") for t in times))
+        return responses, server.batcher.batches, server.batcher.requests
+
+    responses, batches, requests = _run(_with_server(scenario, batch_window=0.2))
+    assert requests == len(times)
+    assert batches < len(times)
+    calculator = PanchangaCalculator()
+    for t, (status, body) in zip(times, responses):
+        assert status == 200
+        utc_time = parse_local_datetime("14/08/2025", t, "+05:30")
+        assert body == {"utc": utc_time.isoformat(), **panchanga_json(calculator.calculate_panchanga(utc_time))}
+
+
+def test_errors_and_health():
+    async def scenario(server):
+        return [await _get(server.port, target) for target in (
+            "/health", "/nowhere", "/panchanga?date=14/08/2025", "/panchanga?date=xx&time=10:00&zone=%2B05:30")]
+
+    (health, body), (missing, _), (incomplete, _), (invalid, _) = _run(_with_server(scenario))
+    assert (health, body["status"]) == (200, "ok")
+    assert (missing, incomplete, invalid) == (404, 400, 400)
+
+
+def test_idle_clients_do_not_hold_slots():
+    async def scenario(server):
+        # Connections that never send a request take no slot while they wait
+        idle = [await asyncio.open_connection("127.0.0.1", server.port) for _ in range(3)]
+        status, _ = await asyncio.wait_for(_get(server.port, "/health"), timeout=2.0)
+        timed_out = await asyncio.wait_for(idle[0][0].read(), timeout=2.0)
+        for _, writer in idle:
+            writer.close()
+        return status, timed_out
+
+    status, timed_out = _run(_with_server(scenario, max_concurrency=1, header_timeout=0.3))
+    assert status == 200
+    assert timed_out.startswith(b"HTTP/1.1 408")
+
+
+def test_hora_endpoint_returns_a_day_of_horas():
+    async def scenario(server):
+        return await _get(server.port, "/hora?date=2025-08-14&lat=40.7&lon=-74.0&tz=America/New_York")
+
+    status, body = _run(_with_server(scenario))
+    assert status == 200
+    assert len(body["horas"]) == 24
+    starts = [datetime.fromisoformat(hora["start"]) for hora in body["horas"]]
+    assert all(b - a > timedelta(0) for a, b in zip(starts, starts[1:]))
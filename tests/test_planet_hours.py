@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from planet_hours import HoraTimeline, VedicPlanetaryHours
+from sunrise import SunriseCache
+from timezones import resolve_zone
+
+PLACES = [
+    ("Asia/Tehran", 35.6892, 51.3890),
+    ("Asia/Tokyo", 35.6762, 139.6503),
+    ("Australia/Sydney", -33.8688, 151.2093),
+    ("America/New_York", 40.7128, -74.0060),
+]
+
+
+def _local(zone, ts):
+    return zone.to_local(datetime.fromtimestamp(ts, timezone.utc))
+
+
+@pytest.mark.parametrize("tz,lat,lon", PLACES)
+def test_days_start_at_the_local_dates_sunrise(tz, lat, lon):
+    zone = resolve_zone(tz)
+    timeline = VedicPlanetaryHours(datetime(2025, 3, 20), lat, lon, tz).hora_timeline(days=3)
+    assert len(timeline) == 72
+    for day in range(3):
+        local_date = datetime(2025, 3, 20) + timedelta(days=day)
+        sunrise = _local(zone, timeline.boundaries[24 * day])
+        assert sunrise.date() == local_date.date()
+        assert 4 <= sunrise.hour < 8
+        ruler = VedicPlanetaryHours.DAY_RULERS[(local_date.weekday() + 1) % 7]
+        assert HoraTimeline.CHALDEAN_ORDER[timeline.planets[24 * day]] == ruler
+
+
+@pytest.mark.parametrize("tz,lat,lon", PLACES)
+def test_cached_sun_times_match_the_solver(tmp_path, tz, lat, lon):
+    zone = resolve_zone(tz)
+    cache = SunriseCache(str(tmp_path / "sun.db"))
+    # The cache solves at the centre of the grid cell
+    centre = cache.cell_center(cache.cell(lat, lon))
+    plain = HoraTimeline.build(*centre, datetime(2025, 6, 1), 2, zone=zone)
+    cached = HoraTimeline.build(lat, lon, datetime(2025, 6, 1), 2, sunrise_cache=cache, zone=zone)
+    # Cached times round-trip through ephem dates, good to a few microseconds
+    assert list(cached.boundaries) == pytest.approx(list(plain.boundaries), abs=1e-3)
+    assert list(cached.planets) == list(plain.planets)
+
+
+def test_aware_input_is_read_in_the_zone():
+    aware = datetime(2025, 3, 19, 20, 0, tzinfo=timezone.utc)
+    hours = VedicPlanetaryHours(aware, 35.6762, 139.6503, "Asia/Tokyo")
+    assert hours.date.date() == datetime(2025, 3, 20).date()
+
+
+def test_polar_night_is_rejected():
+    with pytest.raises(ValueError):
+        HoraTimeline.build(78.22, 15.65, datetime(2025, 12, 21), 1, zone=resolve_zone("Arctic/Longyearbyen"))
+
+
+def test_sunsets_at_the_utc_date_boundary():
+    # New York's August sunsets fall within a minute of 00:00 UTC
+    zone = resolve_zone("America/New_York")
+    timeline = VedicPlanetaryHours(datetime(2025, 8, 8), 40.7, -74.0, "America/New_York").hora_timeline(days=14)
+    boundaries = list(timeline.boundaries)
+    assert all(a < b for a, b in zip(boundaries, boundaries[1:]))
+    for day in range(14):
+        local_date = (datetime(2025, 8, 8) + timedelta(days=day)).date()
+        sunrise = _local(zone, boundaries[24 * day])
+        sunset = _local(zone, boundaries[24 * day + 12])
+        assert sunrise.date() == local_date and 5 <= sunrise.hour < 7
+        assert sunset.date() == local_date and 19 <= sunset.hour < 21
+
+
+def test_a_year_west_of_utc(tmp_path):
+    hours = VedicPlanetaryHours(datetime(2025, 1, 1), 40.7, -74.0, "America/New_York",
+                                SunriseCache(str(tmp_path / "sun.db")))
+    timeline = hours.hora_timeline(days=365)
+    assert len(timeline) == 365 * 24
+    boundaries = list(timeline.boundaries)
+    assert all(a < b for a, b in zip(boundaries, boundaries[1:]))
@@ -0,0 +1,64 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from sunrise import (SunriseCache, compute_sun_cycle_batch, compute_sunrise_sunset_batch,
+                     sun_cycle_after, sunrise_sunset_utc)
+
+NEW_YORK = (40.7, -74.0)
+# New York's sunsets cross 00:00 UTC around these dates
+AUGUST = [date(2025, 8, 1) + timedelta(days=i) for i in range(31)]
+
+
+@pytest.mark.parametrize("day", AUGUST)
+def test_sunset_follows_its_sunrise_across_midnight_utc(day):
+    sunrise, sunset = sunrise_sunset_utc(*NEW_YORK, day)
+    assert sunrise.date() == day
+    assert timedelta(hours=12) < sunset - sunrise < timedelta(hours=15)
+
+
+def test_every_sunset_of_a_month_is_reported():
+    sunsets = [sunset for _, sunset in compute_sunrise_sunset_batch([(*NEW_YORK, day) for day in AUGUST])]
+    # Consecutive sunsets are about a day apart; none is skipped or repeated
+    gaps = [b - a for a, b in zip(sunsets, sunsets[1:])]
+    assert all(timedelta(hours=23, minutes=50) < gap < timedelta(hours=24, minutes=10) for gap in gaps)
+    assert sunsets[12] == pytest.approx(datetime(2025, 8, 14, 0, 0, 37), abs=timedelta(seconds=5))
+    assert sunsets[13] == pytest.approx(datetime(2025, 8, 14, 23, 59, 14), abs=timedelta(seconds=5))
+
+
+def test_cycle_events_follow_each_other():
+    start = datetime(2025, 8, 14, 4, 0)
+    sunrise, sunset, next_sunrise = sun_cycle_after(*NEW_YORK, start)
+    assert start < sunrise < sunset < next_sunrise
+    assert sun_cycle_after(*NEW_YORK, sunset)[0] == pytest.approx(next_sunrise, abs=timedelta(seconds=1))
+
+
+def test_polar_night_and_day_have_no_events():
+    assert sun_cycle_after(78.22, 15.65, datetime(2025, 12, 21)) == (None, None, None)
+    assert sunrise_sunset_utc(78.22, 15.65, date(2025, 6, 21)) == (None, None)
+
+
+def test_cache_matches_the_solver_at_the_cell_centre(tmp_path):
+    queries = [(*NEW_YORK, datetime(2025, 8, 14, 4)), (*NEW_YORK, datetime(2025, 8, 15, 4)),
+               (40.71, -74.01, datetime(2025, 8, 14, 4))]
+    with SunriseCache(str(tmp_path / "sun.db")) as cache:
+        cold = compute_sun_cycle_batch(queries, cache=cache, workers=1)
+        warm = compute_sun_cycle_batch(queries, cache=cache, workers=1)
+        centre = cache.cell_center(cache.cell(*NEW_YORK))
+    expected = [sun_cycle_after(*centre, start) for _, _, start in queries]
+    for got in (cold, warm):
+        for events, want in zip(got, expected):
+            assert events == pytest.approx(want, abs=timedelta(milliseconds=1))
+
+
+def test_cache_ignores_per_date_entries_of_older_files(tmp_path):
+    path = str(tmp_path / "sun.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE sun_times (resolution REAL, cell_lat INTEGER, cell_lon INTEGER,"
+               " day TEXT, sunrise REAL, sunset REAL)")
+    db.execute("INSERT INTO sun_times VALUES (0.1, 407, -740, '2025-08-14', 1.0, 2.0)")
+    db.commit()
+    db.close()
+    with SunriseCache(path) as cache:
+        assert cache.get(*NEW_YORK, date(2025, 8, 14))[1].date() == date(2025, 8, 14)
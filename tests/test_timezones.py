@@ -0,0 +1,72 @@
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from timezones import ZoneTable, parse_offset, resolve_zone
+
+START, END = datetime(2020, 1, 1), datetime(2030, 1, 1)
+
+
+def _zoneinfo_transitions(name, start, end):
+    """Offset changes found by an hourly scan of zoneinfo, to the second"""
+    zone = ZoneInfo(name)
+    offset = lambda t: datetime.fromtimestamp(t, zone).utcoffset().total_seconds()
+    lo, hi = start.replace(tzinfo=timezone.utc).timestamp(), end.replace(tzinfo=timezone.utc).timestamp()
+    found, t = [], lo
+    while t < hi:
+        if offset(t + 3600) != offset(t):
+            a, b = t, t + 3600
+            while b - a > 1:
+                mid = (a + b) // 2
+                a, b = (mid, b) if offset(mid) == offset(t) else (a, mid)
+            found.append((datetime(1970, 1, 1) + timedelta(seconds=b), offset(b)))
+        t += 3600
+    return found
+
+
+def _assert_no_repeated_offsets(table):
+    _, offsets, _ = table._tables
+    assert all(a != b for a, b in zip(offsets, offsets[1:]))
+
+
+@pytest.mark.parametrize("name", ["Asia/Kolkata", "Asia/Tokyo", "Asia/Shanghai"])
+def test_zone_without_dst_has_no_transitions(name):
+    table = ZoneTable(name)
+    # Grow the table from the middle outwards, one block at a time
+    table.offset_at(datetime(2025, 6, 1).replace(tzinfo=timezone.utc).timestamp())
+    assert table.transitions(START, END) == []
+    _assert_no_repeated_offsets(table)
+
+
+@pytest.mark.parametrize("name", ["Europe/London", "America/New_York", "Australia/Sydney"])
+def test_transitions_match_zoneinfo(name):
+    table = ZoneTable(name)
+    table.offset_at(datetime(2025, 6, 1).replace(tzinfo=timezone.utc).timestamp())
+    assert table.transitions(START, END) == _zoneinfo_transitions(name, START, END)
+    _assert_no_repeated_offsets(table)
+
+
+@pytest.mark.parametrize("name", ["Europe/Berlin", "America/Santiago", "Asia/Kolkata"])
+def test_offsets_match_zoneinfo(name):
+    table, zone = ZoneTable(name), ZoneInfo(name)
+    rng = random.Random(3)
+    for _ in range(500):
+        ts = rng.uniform(946684800, 1893456000)
+        expected = datetime.fromtimestamp(ts, zone).utcoffset().total_seconds()
+        assert table.offset_at(ts) == expected
+        local = datetime(2000, 1, 1) + timedelta(seconds=rng.randrange(30 * 365 * 86400))
+        assert table.utcoffset(local) == local.replace(tzinfo=zone).utcoffset()
+
+
+def test_fixed_offsets():
+    assert parse_offset("+05:30") == 19800
+    assert parse_offset("-0430") == -16200
+    assert parse_offset("+5.5") == 19800
+    with pytest.raises(ValueError):
+        parse_offset("+15:00")
+    zone = resolve_zone("+03:30")
+    assert zone.is_fixed
+    assert zone.transitions(START, END) == []
+    assert zone.to_utc(datetime(2025, 1, 1, 3, 30)) == datetime(2025, 1, 1)
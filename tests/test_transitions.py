@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import ephem
+import pytest
+
+from panchanga import EPHEM_EPOCH_JD, PanchangaCalculator
+from transitions import LIMBS, LimbTransitionFinder, jd_to_datetime
+
+START = datetime(2025, 1, 1)
+END = datetime(2025, 1, 3)
+
+
+@pytest.fixture(scope="module")
+def finder():
+    return LimbTransitionFinder()
+
+
+def _index(calculator, limb, jd):
+    return getattr(calculator.calculate_panchanga(ephem.Date(jd - EPHEM_EPOCH_JD)), f"{limb}_index")
+
+
+@pytest.mark.parametrize("limb", LIMBS)
+def test_periods_tile_the_range(finder, limb):
+    periods = finder.limb_periods(limb, START, END)
+    assert periods[0].start_time <= START and periods[-1].end_time >= END
+    for before, after in zip(periods, periods[1:]):
+        assert before.end_jd == after.start_jd
+        assert before.index != after.index
+
+
+@pytest.mark.parametrize("limb", LIMBS)
+def test_transition_instants_bracket_the_index_change(finder, limb):
+    calculator = PanchangaCalculator()
+    precision = finder.precision
+    for period in finder.limb_periods(limb, START, END)[1:]:
+        assert _index(calculator, limb, period.start_jd + precision / 10) == period.index
+        assert _index(calculator, limb, period.start_jd - 1.5 * precision) != period.index
+
+
+@pytest.mark.parametrize("limb", ["tithi", "nakshatra", "karana"])
+def test_matches_brute_force_scan(finder, limb):
+    """Every 5-minute sample falls in a period with the index the scalar path gives"""
+    calculator = PanchangaCalculator()
+    periods = finder.limb_periods(limb, START, END)
+    t = START
+    i = 0
+    while t <= END:
+        jd = ephem.Date(t) + EPHEM_EPOCH_JD
+        while periods[i].end_jd <= jd:
+            i += 1
+        # Samples within the search precision of an edge may fall either side
+        if min(jd - periods[i].start_jd, periods[i].end_jd - jd) > finder.precision:
+            assert periods[i].index == getattr(calculator.calculate_panchanga(t), f"{limb}_index"), t
+        t += timedelta(minutes=5)
+
+
+def test_next_transition_honours_limit(finder):
+    first = finder.limb_periods("tithi", START, START)[0]
+    assert finder.next_transition("tithi", START, first.end_time - timedelta(seconds=10)) is None
+    found = finder.next_transition("tithi", START)
+    assert abs((found - jd_to_datetime(first.end_jd)).total_seconds()) <= 1.0
+
+
+def test_rejects_unknown_limb(finder):
+    with pytest.raises(ValueError):
+        finder.limb_periods("vara", START, END)
@@ -0,0 +1,270 @@
+import math
+import re
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple, Union
+
+EPOCH = datetime(1970, 1, 1)
+MAX_OFFSET_HOURS = 14
+
+# "+05:30", "-0430", "5:30", "+3" and decimal hours such as "+5.5"
+_OFFSET_PATTERN = re.compile(r'^([+-]?)(\d{1,2})(?::?(\d{2}))?$')
+_DECIMAL_PATTERN = re.compile(r'^([+-]?)(\d{1,2}\.\d+)$')
+
+# Named zones are scanned for transitions this many seconds (~1.06 years) at a time
+_BLOCK_SECONDS = 1 << 25
+# Offsets are sampled daily; real transitions are always further apart
+_SCAN_STEP = 86400
+
+
+def parse_offset(text: str) -> float:
+    """Parse a fixed ``[+/-]HH:MM`` (or ``HHMM``, ``H``, decimal hours) offset into seconds"""
+    text = text.strip()
+    match = _OFFSET_PATTERN.match(text)
+    if match:
+        sign, hours, minutes = match.groups()
+        hours, minutes = int(hours), int(minutes or 0)
+        if minutes >= 60:
+            raise ValueError(f"Invalid timezone offset: {text}")
+        seconds = hours * 3600 + minutes * 60
+    else:
+        match = _DECIMAL_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Invalid timezone offset: {text}. Use [+/-]hh:mm.")
+        sign, hours = match.groups()
+        seconds = round(float(hours) * 3600)
+    if seconds > MAX_OFFSET_HOURS * 3600:
+        raise ValueError(f"Timezone offset out of range: {text}")
+    return -seconds if sign == '-' else seconds
+
+
+def is_offset(text: str) -> bool:
+    return bool(_OFFSET_PATTERN.match(text.strip()) or _DECIMAL_PATTERN.match(text.strip()))
+
+
+class ZoneTable:
+    """UTC offset history of one zone as sorted transition tables
+
+    ``starts[i]`` is the UTC POSIX second from which ``offsets[i]`` (seconds
+    east of UTC) applies. Named zones are scanned lazily, one block of about
+    a year at a time, the first time an instant in that block is looked up;
+    fixed offsets are a single entry.
+
+    Local times are mapped back to UTC with a second table of local
+    thresholds. A local time that is repeated when clocks go back, or
+    skipped when they go forward, resolves with the offset in force before
+    the transition, as ``zoneinfo`` does for ``fold=0``.
+    """
+
+    def __init__(self, name: str, offset: float = None):
+        self.name = name
+        self._lock = threading.Lock()
+        self._arrays = None
+        if offset is not None:
+            self._zone = None
+            self._set_tables([-math.inf], [float(offset)])
+            self._lo, self._hi = -math.inf, math.inf
+        else:
+            from zoneinfo import ZoneInfo
+            self._zone = ZoneInfo(name)
+            self._tables = ([], [], [])
+            self._lo = self._hi = None
+
+    @property
+    def is_fixed(self) -> bool:
+        return self._zone is None
+
+    def __repr__(self) -> str:
+        return f"ZoneTable({self.name!r})"
+
+    # -- transition tables -------------------------------------------------
+
+    def _offset(self, ts: float) -> float:
+        return datetime.fromtimestamp(ts, self._zone).utcoffset().total_seconds()
+
+    def _scan(self, start: float, end: float) -> Tuple[List[float], List[float]]:
+        """Transitions in [start, end) found by daily sampling and bisection"""
+        starts, offsets = [start], [self._offset(start)]
+        t = start
+        while t < end:
+            step_end = min(t + _SCAN_STEP, end)
+            offset = self._offset(step_end) if step_end < end else offsets[-1]
+            if offset != offsets[-1]:
+                lo, hi = t, step_end
+                while hi - lo > 1:
+                    mid = math.floor((lo + hi) / 2)
+                    if self._offset(mid) == offsets[-1]:
+                        lo = mid
+                    else:
+                        hi = mid
+                starts.append(float(hi))
+                offsets.append(offset)
+            t = step_end
+        return starts, offsets
+
+    def _cover(self, lo: float, hi: float) -> None:
+        """Extend the tables so that [lo, hi] is covered"""
+        if self._lo is not None and self._lo <= lo and hi < self._hi:
+            return
+        with self._lock:
+            if self._lo is not None and self._lo <= lo and hi < self._hi:
+                return
+            block_lo = math.floor(lo / _BLOCK_SECONDS) * _BLOCK_SECONDS
+            block_hi = (math.floor(hi / _BLOCK_SECONDS) + 1) * _BLOCK_SECONDS
+            if self._lo is None:
+                starts, offsets = self._scan(block_lo, block_hi)
+            else:
+                starts, offsets, _ = self._tables
+                if block_lo < self._lo:
+                    starts, offsets = self._join(self._scan(block_lo, self._lo), (starts, offsets))
+                else:
+                    block_lo = self._lo
+                if block_hi > self._hi:
+                    starts, offsets = self._join((starts, offsets), self._scan(self._hi, block_hi))
+                else:
+                    block_hi = self._hi
+            self._set_tables(starts, offsets)
+            self._lo, self._hi = block_lo, block_hi
+
+    @staticmethod
+    def _join(head: Tuple[List[float], List[float]],
+              tail: Tuple[List[float], List[float]]) -> Tuple[List[float], List[float]]:
+        """Concatenate two adjacent scans
+
+        Every scan opens with an entry for the offset at its start; when that
+        offset continues the one before, it is not a transition and is dropped.
+        """
+        starts, offsets = tail
+        if offsets[0] == head[1][-1]:
+            starts, offsets = starts[1:], offsets[1:]
+        return head[0] + starts, head[1] + offsets
+
+    def _set_tables(self, starts: List[float], offsets: List[float]) -> None:
+        local_starts = [starts[0] + offsets[0]] + [
+            starts[i] + max(offsets[i - 1], offsets[i]) for i in range(1, len(starts))]
+        # Readers do not take the lock, so the tables are swapped in as one tuple
+        self._tables = (starts, offsets, local_starts)
+
+    def transitions(self, start: datetime, end: datetime) -> List[Tuple[datetime, float]]:
+        """(UTC instant, new offset in seconds) of each offset change between two UTC instants"""
+        lo, hi = _posix(start), _posix(end)
+        if not self.is_fixed:
+            self._cover(lo, hi)
+        starts, offsets, _ = self._tables
+        return [(EPOCH + timedelta(seconds=t), offset)
+                for t, offset in zip(starts[1:], offsets[1:]) if lo < t <= hi]
+
+    # -- scalar conversion -------------------------------------------------
+
+    def offset_at(self, ts: float) -> float:
+        """Offset in seconds in force at UTC POSIX second ``ts``"""
+        if not self.is_fixed:
+            self._cover(ts, ts)
+        starts, offsets, _ = self._tables
+        return offsets[bisect_right(starts, ts) - 1]
+
+    def local_offset_at(self, local_ts: float) -> float:
+        """Offset in seconds that applies to the local wall-clock second ``local_ts``"""
+        if not self.is_fixed:
+            self._cover(local_ts - 86400, local_ts + 86400)
+        _, offsets, local_starts = self._tables
+        return offsets[max(bisect_right(local_starts, local_ts) - 1, 0)]
+
+    def utcoffset(self, dt: datetime) -> timedelta:
+        """Offset of the naive local datetime ``dt``"""
+        return timedelta(seconds=self.local_offset_at(_posix(dt)))
+
+    def to_utc(self, dt: datetime) -> datetime:
+        """Naive UTC datetime for a local datetime (naive) or an aware datetime"""
+        if dt.tzinfo is not None:
+            return dt.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        return dt - self.utcoffset(dt)
+
+    def to_local(self, dt: datetime) -> datetime:
+        """Naive local datetime for a UTC datetime (naive UTC or aware)"""
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        return dt + timedelta(seconds=self.offset_at(_posix(dt)))
+
+    # -- vectorized conversion ---------------------------------------------
+
+    def _table_arrays(self):
+        import numpy as np
+        tables, cached = self._tables, self._arrays
+        if cached is None or cached[0] is not tables:
+            cached = self._arrays = (tables, tuple(np.array(table) for table in tables))
+        return cached[1]
+
+    def utc_to_local_array(self, ts):
+        """Local wall-clock POSIX seconds for an array of UTC POSIX seconds"""
+        import numpy as np
+        ts = np.asarray(ts, dtype=float)
+        if ts.size and not self.is_fixed:
+            self._cover(float(ts.min()), float(ts.max()))
+        starts, offsets, _ = self._table_arrays()
+        return ts + offsets[np.searchsorted(starts, ts, side='right') - 1]
+
+    def local_to_utc_array(self, local_ts):
+        """UTC POSIX seconds for an array of local wall-clock POSIX seconds"""
+        import numpy as np
+        local_ts = np.asarray(local_ts, dtype=float)
+        if local_ts.size and not self.is_fixed:
+            self._cover(float(local_ts.min()) - 86400, float(local_ts.max()) + 86400)
+        _, offsets, local_starts = self._table_arrays()
+        index = np.maximum(np.searchsorted(local_starts, local_ts, side='right') - 1, 0)
+        return local_ts - offsets[index]
+
+
+def _posix(dt: datetime) -> float:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return (dt - EPOCH).total_seconds()
+
+
+ZoneSpec = Union[str, float, int, ZoneTable]
+
+
+@lru_cache(maxsize=None)
+def _resolve(spec: str) -> ZoneTable:
+    if is_offset(spec):
+        seconds = parse_offset(spec)
+        sign = '-' if seconds < 0 else '+'
+        minutes = abs(int(seconds)) // 60
+        return ZoneTable(f"UTC{sign}{minutes // 60:02d}:{minutes % 60:02d}", seconds)
+    from zoneinfo import ZoneInfoNotFoundError
+    try:
+        return ZoneTable(spec)
+    except (ZoneInfoNotFoundError, ValueError, OSError):
+        raise ValueError(f"Unknown timezone: {spec}") from None
+
+
+def resolve_zone(spec: ZoneSpec) -> ZoneTable:
+    """Zone table for a zone name ("Asia/Tehran"), an offset string ("+03:30") or hours east of UTC
+
+    Tables are cached per spelling, so repeated lookups share their
+    transition tables.
+    """
+    if isinstance(spec, ZoneTable):
+        return spec
+    if isinstance(spec, (int, float)):
+        if abs(spec) > MAX_OFFSET_HOURS:
+            raise ValueError(f"Timezone offset out of range: {spec}")
+        return _resolve(f"{spec:+.6f}".rstrip('0').rstrip('.'))
+    return _resolve(spec.strip())
+
+
+def is_valid_zone(spec: str) -> bool:
+    try:
+        resolve_zone(spec)
+    except ValueError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def zone_names() -> FrozenSet[str]:
+    """Every zone name known to the system time zone database"""
+    from zoneinfo import available_timezones
+    return frozenset(available_timezones())
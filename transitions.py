@@ -0,0 +1,273 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import ephem
+
+from instrumentation import stats
+from panchanga import PanchangaCalculator, AstronomicalConstants, EPHEM_EPOCH_JD, to_ephem_date
+
+
+SECONDS_PER_DAY = 86400.0
+
+LIMBS = ("tithi", "nakshatra", "yoga", "karana", "rashi")
+
+
+@dataclass(frozen=True)
+class LimbSpec:
+    """How a limb is derived from the (sun, moon, phase) positions
+
+    ``quantity`` selects the continuous value the limb is a bin of: the
+    adjusted moon longitude, the yoga angle (moon + sun) or the moon phase.
+    ``rate`` is an upper bound on |d quantity / dt| in units per day, measured
+    over 1790-2120 with margin; it is what makes the stepping safe.
+    ``monotonic`` quantities always increase with time (the longitudes are
+    angles modulo 360), the moon phase rises and falls; for it
+    ``acceleration`` bounds |d2 quantity / dt2| in units per day squared.
+    """
+    quantity: str
+    width: float
+    rate: float
+    monotonic: bool
+    names: Tuple[str, ...]
+    acceleration: float = 0.0
+
+
+LIMB_SPECS = {
+    "tithi": LimbSpec("phase", 12.0, 13.0, False, tuple(AstronomicalConstants.TITHI), 4.0),
+    "nakshatra": LimbSpec("moon", 360.0 / 27, 400.0, True, tuple(AstronomicalConstants.NAKSHATRA)),
+    "yoga": LimbSpec("yoga", 360.0 / 27, 420.0, True, tuple(AstronomicalConstants.YOGA)),
+    "karana": LimbSpec("phase", 6.0, 13.0, False, tuple(AstronomicalConstants.KARAN), 4.0),
+    "rashi": LimbSpec("moon", 30.0, 400.0, True, tuple(AstronomicalConstants.RASHI)),
+}
+
+
+@dataclass
+class LimbPeriod:
+    """One uninterrupted period of a limb, bounded by Julian dates"""
+    limb: str
+    index: int
+    start_jd: float
+    end_jd: float
+
+    @property
+    def name(self) -> str:
+        return LIMB_SPECS[self.limb].names[self.index]
+
+    @property
+    def start_time(self) -> datetime:
+        return jd_to_datetime(self.start_jd)
+
+    @property
+    def end_time(self) -> datetime:
+        return jd_to_datetime(self.end_jd)
+
+
+def jd_to_datetime(jd: float) -> datetime:
+    """Convert a Julian date to a naive UTC datetime"""
+    return ephem.Date(jd - EPHEM_EPOCH_JD).datetime()
+
+
+class LimbTransitionFinder:
+    """Find the exact instants at which Panchanga limbs change
+
+    Each limb is a bin of a continuous quantity (see ``LIMB_SPECS``). Starting
+    from a known instant, the finder steps forward by the distance to the
+    nearest bin edge divided by the maximum rate of the quantity, which can
+    never jump over an edge, and once an edge is bracketed bisects it down to
+    ``precision_seconds``. The number of ephemeris evaluations therefore grows
+    with the number of transitions rather than with range / step.
+    """
+
+    def __init__(self, calculator: Optional[PanchangaCalculator] = None,
+                 precision_seconds: float = 1.0):
+        if precision_seconds <= 0:
+            raise ValueError("precision_seconds must be positive")
+        self.calculator = calculator or PanchangaCalculator()
+        self.precision = precision_seconds / SECONDS_PER_DAY
+
+    def _positions(self, d: float) -> Tuple[float, float, float]:
+        if stats.enabled:
+            stats.count("transitions.evaluations")
+        return self.calculator.sidereal_positions(ephem.Date(d))
+
+    @staticmethod
+    def _quantity(spec: LimbSpec, positions: Tuple[float, float, float]) -> float:
+        sun_long, moon_long, moon_phase = positions
+        if spec.quantity == "moon":
+            return moon_long
+        if spec.quantity == "yoga":
+            return PanchangaCalculator.normalize_degrees(moon_long + sun_long)
+        return moon_phase
+
+    @staticmethod
+    def limb_index(limb: str, positions: Tuple[float, float, float]) -> int:
+        """Index of ``limb`` for the given (sun, moon, phase) positions"""
+        sun_long, moon_long, moon_phase = positions
+        if limb == "tithi":
+            return PanchangaCalculator.tithi_index(moon_phase)
+        if limb == "nakshatra":
+            return PanchangaCalculator.nakshatra_index(moon_long)
+        if limb == "yoga":
+            return PanchangaCalculator.yoga_index(moon_long, sun_long)
+        if limb == "karana":
+            return PanchangaCalculator.karana_index(moon_phase)
+        if limb == "rashi":
+            return PanchangaCalculator.rashi_index(moon_long)
+        raise ValueError(f"Unknown limb: {limb}")
+
+    def _find_boundary(self, spec: LimbSpec, d: float, direction: int,
+                       limit: Optional[float] = None) -> Optional[float]:
+        """Ephem date of the first bin edge after (or before) ``d``
+
+        Forward searches return the first instant inside the new bin, backward
+        searches the first instant of the bin that contains ``d``. Returns
+        None if no edge is found before ``limit``.
+        """
+        value = self._quantity(spec, self._positions(d))
+        current_bin = math.floor(value / spec.width)
+        lower_edge = current_bin * spec.width
+        upper_edge = lower_edge + spec.width
+        accel = spec.acceleration
+        # Observed rate of change along the search direction and the step it
+        # was measured over; None until the first step has been taken
+        rate = None
+        step = 0.0
+
+        while True:
+            frac = value - lower_edge
+            if spec.monotonic:
+                # Aim just past the edge using the observed rate, but never
+                # further than one bin so no edge can be skipped
+                edge = upper_edge if direction > 0 else lower_edge
+                remaining = spec.width - frac if direction > 0 else frac
+                speed = spec.rate / 2 if rate is None else max(abs(rate), spec.rate / 8)
+                step = min(1.1 * remaining / speed + self.precision, spec.width / spec.rate)
+            else:
+                edge = None
+                distance = min(frac, spec.width - frac)
+                safe_step = distance / spec.rate
+                if rate is not None:
+                    rate_bound = min(abs(rate) + accel * step, spec.rate)
+                    rate_floor = abs(rate) - accel * step
+                    edge = upper_edge if rate > 0 else lower_edge
+                    remaining = spec.width - frac if rate > 0 else frac
+                    secant_step = 1.1 * remaining / abs(rate) + self.precision
+                    change_bound = rate_bound * secant_step + accel * secant_step ** 2 / 2
+                    if rate_floor > accel * secant_step and change_bound < remaining + spec.width:
+                        # The quantity stays monotonic over the secant step and
+                        # cannot reach a second edge, so jump past this one
+                        safe_step = secant_step
+                    else:
+                        # Curvature-bounded extrapolation that cannot overshoot
+                        edge = None
+                        safe_step = max(safe_step, (math.sqrt(rate_bound ** 2 + 2 * accel * distance)
+                                                    - rate_bound) / accel)
+                step = max(safe_step, self.precision)
+
+            probe = d + direction * step
+            if limit is not None and (probe - limit) * direction > 0:
+                probe = limit
+                step = abs(probe - d)
+            probe_value = self._quantity(spec, self._positions(probe))
+
+            if math.floor(probe_value / spec.width) != current_bin:
+                inside, outside = d, probe
+                if edge is not None:
+                    inside, outside = self._refine(spec, current_bin, edge,
+                                                   inside, value, outside, probe_value)
+                while abs(outside - inside) > self.precision:
+                    mid = (inside + outside) / 2
+                    mid_value = self._quantity(spec, self._positions(mid))
+                    if math.floor(mid_value / spec.width) == current_bin:
+                        inside = mid
+                    else:
+                        outside = mid
+                return outside if direction > 0 else inside
+
+            if probe == limit or step == 0:
+                return None
+            change = self._distance(probe_value, value) if spec.monotonic else probe_value - value
+            rate = change / step
+            d, value = probe, probe_value
+
+    @staticmethod
+    def _distance(value: float, edge: float) -> float:
+        """Signed angular distance from ``edge`` to ``value`` in (-180, 180]"""
+        return -((edge - value + 180.0) % 360.0 - 180.0)
+
+    def _refine(self, spec: LimbSpec, current_bin: int, edge: float,
+                inside: float, inside_value: float,
+                outside: float, outside_value: float) -> Tuple[float, float]:
+        """Shrink a bracket around ``edge`` by Illinois false position"""
+        f_in = self._distance(inside_value, edge)
+        f_out = self._distance(outside_value, edge)
+        last = 0
+        for _ in range(20):
+            if abs(outside - inside) <= self.precision or f_in == f_out:
+                break
+            x = outside - f_out * (outside - inside) / (f_out - f_in)
+            # Keep the probe away from the ends so the bracket keeps shrinking
+            lo, hi = min(inside, outside), max(inside, outside)
+            margin = self.precision / 2
+            x = min(max(x, lo + margin), hi - margin)
+            x_value = self._quantity(spec, self._positions(x))
+            f_x = self._distance(x_value, edge)
+            if math.floor(x_value / spec.width) == current_bin:
+                inside, f_in = x, f_x
+                if last < 0:
+                    f_out /= 2
+                last = -1
+            else:
+                outside, f_out = x, f_x
+                if last > 0:
+                    f_in /= 2
+                last = 1
+        return inside, outside
+
+    def next_transition(self, limb: str, date, limit=None) -> Optional[datetime]:
+        """Time of the next change of ``limb`` after ``date``, or None before ``limit``"""
+        spec = LIMB_SPECS[limb]
+        end = to_ephem_date(limit) if limit is not None else None
+        d = self._find_boundary(spec, to_ephem_date(date), 1, end)
+        return None if d is None else jd_to_datetime(d + EPHEM_EPOCH_JD)
+
+    def limb_periods(self, limb: str, start, end) -> List[LimbPeriod]:
+        """All periods of ``limb`` overlapping [start, end]
+
+        ``start`` and ``end`` are UTC datetimes, ``ephem.Date`` values or
+        Julian dates. The first and last period are reported with their full
+        extent, so the first may begin before ``start`` and the last may end
+        after ``end``.
+        """
+        if limb not in LIMB_SPECS:
+            raise ValueError(f"Unknown limb: {limb}")
+        spec = LIMB_SPECS[limb]
+        d_start = to_ephem_date(start)
+        d_end = to_ephem_date(end)
+        if d_end < d_start:
+            raise ValueError("end must not be before start")
+        with stats.stage(f"transitions.{limb}"):
+            return self._limb_periods(limb, spec, d_start, d_end)
+
+    def _limb_periods(self, limb: str, spec: LimbSpec, d_start: float, d_end: float) -> List[LimbPeriod]:
+        period_start = self._find_boundary(spec, d_start, -1)
+        periods = []
+        while period_start <= d_end:
+            period_end = self._find_boundary(spec, max(period_start, d_start), 1)
+            mid = (period_start + period_end) / 2
+            index = self.limb_index(limb, self._positions(mid))
+            if periods and periods[-1].index == index:
+                periods[-1].end_jd = period_end + EPHEM_EPOCH_JD
+            else:
+                periods.append(LimbPeriod(limb, index,
+                                          period_start + EPHEM_EPOCH_JD,
+                                          period_end + EPHEM_EPOCH_JD))
+            period_start = period_end
+        return periods
+
+    def all_limb_periods(self, start, end,
+                         limbs: Iterable[str] = LIMBS) -> Dict[str, List[LimbPeriod]]:
+        """Periods of several limbs over [start, end], keyed by limb name"""
+        return {limb: self.limb_periods(limb, start, end) for limb in limbs}
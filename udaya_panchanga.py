@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Sequence, TextIO, Tuple
+
+from instrumentation import stats
+from panchanga import EPHEM_EPOCH_JD, PanchangaCalculator, PanchangaData, to_ephem_date
+from sunrise import sunrise_after_utc
+from timezones import EPOCH, resolve_zone
+
+CITY_FIELDS = ("name", "lat", "lon", "zone")
+RESULT_FIELDS = ("tithi", "paksha", "nakshatra", "yoga", "karana", "rashi")
+UNIX_EPOCH_JD = 2440587.5
+
+_calculator: Optional[PanchangaCalculator] = None
+
+
+@dataclass
+class City:
+    name: str
+    latitude: float
+    longitude: float
+    zone: str
+
+
+@dataclass
+class UdayaPanchanga:
+    """Limbs in force at local sunrise of one city and date
+
+    ``sunrise`` is local wall-clock time in the city's zone. Both fields are
+    None when the sun does not rise on that local date (polar day or night).
+    """
+    city: City
+    date: date
+    sunrise: Optional[datetime]
+    panchanga: Optional[PanchangaData]
+
+
+def load_cities(source: TextIO) -> List[City]:
+    """Read a CSV city table with ``name``, ``lat``, ``lon`` and ``zone`` columns"""
+    reader = csv.DictReader(source)
+    missing = [name for name in CITY_FIELDS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"City table header is missing column(s): {', '.join(missing)}")
+    cities = []
+    for line, row in enumerate(reader, start=2):
+        try:
+            city = City(row["name"], float(row["lat"]), float(row["lon"]), row["zone"].strip())
+            resolve_zone(city.zone)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"City table line {line}: {e}") from None
+        cities.append(city)
+    return cities
+
+
+def _sunrise_chunk(items: List[Tuple[float, float, float]]) -> List[Optional[float]]:
+    """Worker entry point: first sunrise (ephem date) after each (lat, lon, ephem date)"""
+    results = []
+    for latitude, longitude, start in items:
+        sunrise = sunrise_after_utc(latitude, longitude, start)
+        results.append(to_ephem_date(sunrise) if sunrise is not None else None)
+    return results
+
+
+def _panchanga_chunk(jds: List[float]) -> List[Tuple[int, bool, int, int, int, int]]:
+    """Worker entry point: limb indices for Julian dates, evaluated as one batch"""
+    import numpy as np
+    global _calculator
+    if _calculator is None:
+        _calculator = PanchangaCalculator()
+    batch = _calculator.calculate_panchanga_batch(np.array(jds))
+    return [batch[i].indices() for i in range(len(batch))]
+
+
+def _fan_out(function: Callable[[list], list], items: list, executor, chunk_size: int) -> list:
+    """``function`` over ``items`` in chunks, in order, on ``executor`` when there is one"""
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if executor is None or len(chunks) < 2:
+        return [result for chunk in chunks for result in function(chunk)]
+    return [result for chunk_results in executor.map(function, chunks) for result in chunk_results]
+
+
+def calculate_udaya_panchanga(cities: Sequence[City], start: date, end: date,
+                              workers: Optional[int] = None,
+                              chunk_size: int = 256) -> List[UdayaPanchanga]:
+    """Panchanga at local sunrise for every city and every date from ``start`` through ``end``
+
+    Each city's local midnights are converted to UTC through its zone table,
+    the first sunrise after each midnight is solved, and the Panchanga is
+    evaluated at the sunrises. Both stages are spread over ``workers``
+    processes (default: all cores; ``workers=1`` stays in this process).
+    Repeated locations are solved once and sunrises falling in the same
+    second share one Sun/Moon evaluation. Results are ordered by city, then
+    date.
+    """
+    import numpy as np
+    if end < start:
+        raise ValueError("end must not be before start")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    first_midnight = (datetime.combine(start, datetime.min.time()) - EPOCH).total_seconds()
+    local_midnights = first_midnight + 86400.0 * np.arange(len(days))
+
+    # One sunrise search per distinct (location, UTC midnight)
+    zones, queries = [], {}
+    with stats.stage("udaya.midnights"):
+        for city in cities:
+            zone = resolve_zone(city.zone)
+            zones.append(zone)
+            utc_midnights = zone.local_to_utc_array(local_midnights)
+            for midnight in utc_midnights:
+                queries.setdefault((city.latitude, city.longitude, float(midnight)), len(queries))
+
+    workers = workers or os.cpu_count() or 1
+    executor = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with stats.stage("udaya.sunrise"):
+            items = [(lat, lon, midnight / 86400.0 + UNIX_EPOCH_JD - EPHEM_EPOCH_JD)
+                     for lat, lon, midnight in queries]
+            sunrises = _fan_out(_sunrise_chunk, items, executor, chunk_size)
+
+        # Sunrises in the same second share one evaluation
+        seconds = sorted({round((s + EPHEM_EPOCH_JD - UNIX_EPOCH_JD) * 86400.0)
+                          for s in sunrises if s is not None})
+        with stats.stage("udaya.panchanga"):
+            jds = [second / 86400.0 + UNIX_EPOCH_JD for second in seconds]
+            limbs = dict(zip(seconds, _fan_out(_panchanga_chunk, jds, executor, chunk_size)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    results = []
+    for city, zone in zip(cities, zones):
+        utc_midnights = zone.local_to_utc_array(local_midnights)
+        for day, midnight in zip(days, utc_midnights):
+            sunrise = sunrises[queries[(city.latitude, city.longitude, float(midnight))]]
+            local_sunrise, pdata = None, None
+            if sunrise is not None:
+                second = round((sunrise + EPHEM_EPOCH_JD - UNIX_EPOCH_JD) * 86400.0)
+                local_sunrise = zone.to_local(EPOCH + timedelta(seconds=second))
+                if local_sunrise.date() == day:
+                    pdata = PanchangaData(*limbs[second])
+                else:
+                    # The next sunrise is on a later local date
+                    local_sunrise = None
+            results.append(UdayaPanchanga(city, day, local_sunrise, pdata))
+    return results
+
+
+def result_record(result: UdayaPanchanga) -> dict:
+    record = {"city": result.city.name, "date": result.date.isoformat(),
+              "sunrise": result.sunrise.isoformat(timespec="seconds") if result.sunrise else ""}
+    for name in RESULT_FIELDS:
+        record[name] = getattr(result.panchanga, name) if result.panchanga else ""
+    return record
+
+
+def write_results(results: Sequence[UdayaPanchanga], output: TextIO, fmt: str = "csv") -> None:
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=("city", "date", "sunrise") + RESULT_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result_record(result))
+    elif fmt == "jsonl":
+        for result in results:
+            output.write(json.dumps(result_record(result), ensure_ascii=False) + "\n")
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculate the Panchanga at local sunrise for a table of cities')
+    parser.add_argument('--cities', required=True, metavar='PATH',
+                        help='CSV file with name,lat,lon,zone columns (zone: name or [+/-]HH:MM)')
+    parser.add_argument('--start', required=True, help='First date in YYYY-MM-DD format')
+    parser.add_argument('--end', help='Last date in YYYY-MM-DD format (default: the start date)')
+    parser.add_argument('--format', default='csv', choices=['csv', 'jsonl'], help='Output format')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='Sunrises or instants per worker task')
+    parser.add_argument('--profile', action='store_true', help='Print stage timings and call counts to stderr')
+
+    args = parser.parse_args(argv)
+    if args.profile:
+        stats.enable()
+
+    try:
+        start = datetime.strptime(args.start, '%Y-%m-%d').date()
+        end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else start
+        with open(args.cities, newline='', encoding='utf-8') as source:
+            cities = load_cities(source)
+        results = calculate_udaya_panchanga(cities, start, end, args.workers, args.chunk_size)
+        write_results(results, sys.stdout, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.profile:
+        stats.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,10 @@ def parse_time(time_str: str) -> float:
         raise ValueError("Invalid time format. Use hh:mm.")
 
 def parse_timezone(zone_str: str) -> float:
-    """Parse timezone string into decimal hours"""
-    try:
-        z_hr_str, z_mn_str = zone_str.split(':')
-        z_hr = float(z_hr_str) + float(z_mn_str) / 60.0
-        return -z_hr if zone_str.startswith('-') else z_hr
-    except ValueError:
-        raise ValueError("Invalid timezone format. Use [+/-]hh:mm.")
+    """Parse a fixed [+/-]hh:mm timezone offset into decimal hours
+
+    Zone names such as "Asia/Tehran" have no single offset; resolve them
+    with ``timezones.resolve_zone`` instead.
+    """
+    from timezones import parse_offset
+    return parse_offset(zone_str) / 3600.0